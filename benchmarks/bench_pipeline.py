@@ -0,0 +1,263 @@
+# benchmarks/bench_pipeline.py
+"""
+Benchmark del proceso de resoluciones con PDFs sintéticos y el backend SQLite
+(modules/backend_db.py) en lugar de sql01.
+
+Genera un corpus de <Letra>-<Actuacion>-<Ejercicio>.pdf, ejecuta copy_files,
+process_files, extract_text_from_pdf, insert_and_update_db y
+clean_and_move_files sobre directorios locales y reporta, por etapa,
+throughput y latencias p50/p95 en JSON.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_pipeline --archivos 500 --paginas 5 --repeticiones 3
+    python -m benchmarks.bench_pipeline --config-extra '{"extraction_workers": 4}' --salida bench.json
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import main  # noqa: E402
+from modules.logs import configurar_logging, detener_logging  # noqa: E402
+from modules.metricas import percentil  # noqa: E402
+
+PALABRAS = (
+    "resolucion directorio presidencia jubilacion expediente articulo visto considerando "
+    "beneficio haber liquidacion instituto afiliado aporte reconocimiento servicios "
+    "disposicion notifiquese registrese archivese pension retiro"
+).split()
+
+
+def generar_pdf(ruta, paginas, palabras_por_pagina, rnd):
+    """Escribe un PDF mínimo con texto extraíble (una fuente Type1 y un flujo de texto por página)."""
+    objetos = ["<< /Type /Catalog /Pages 2 0 R >>"]
+    kids = " ".join(f"{3 + i * 2} 0 R" for i in range(paginas))
+    objetos.append(f"<< /Type /Pages /Kids [{kids}] /Count {paginas} >>")
+    fuente = 3 + paginas * 2
+    for _ in range(paginas):
+        lineas = []
+        palabras = [rnd.choice(PALABRAS) for _ in range(palabras_por_pagina)]
+        for inicio in range(0, len(palabras), 12):
+            lineas.append(f"({' '.join(palabras[inicio:inicio + 12])}) Tj 0 -14 Td")
+        flujo = "BT /F1 10 Tf 50 780 Td " + " ".join(lineas) + " ET"
+        objetos.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents {len(objetos) + 2} 0 R "
+            f"/Resources << /Font << /F1 {fuente} 0 R >> >> >>"
+        )
+        objetos.append(f"<< /Length {len(flujo)} >>\nstream\n{flujo}\nendstream")
+    objetos.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    salida = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for numero, objeto in enumerate(objetos, 1):
+        offsets.append(len(salida))
+        salida += f"{numero} 0 obj\n{objeto}\nendobj\n".encode("latin-1")
+    xref = len(salida)
+    salida += f"xref\n0 {len(objetos) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        salida += f"{offset:010d} 00000 n \n".encode()
+    salida += f"trailer\n<< /Size {len(objetos) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(ruta, "wb") as f:
+        f.write(salida)
+
+
+def generar_corpus(directorio, archivos, paginas, palabras_por_pagina, proporcion_invalidos, subdirectorios, semilla):
+    """Genera el corpus sintético. Devuelve la cantidad de archivos y bytes escritos."""
+    rnd = random.Random(semilla)
+    os.makedirs(directorio, exist_ok=True)
+    total_bytes = 0
+    for i in range(archivos):
+        letra = str(1 + i % 3)
+        ejercicio = str(2020 + i % 5)
+        nombre = f"{letra}-{i + 1:06d}-{ejercicio}.pdf"
+        if rnd.random() < proporcion_invalidos:
+            nombre = f"{letra}-{i + 1:05d}-{ejercicio}.pdf"  # actuación de 5 dígitos: nomenclatura inválida
+        carpeta = directorio / f"lote_{i % subdirectorios:02d}" if subdirectorios > 1 else directorio
+        os.makedirs(carpeta, exist_ok=True)
+        ruta = carpeta / nombre
+        generar_pdf(ruta, paginas, palabras_por_pagina, rnd)
+        total_bytes += ruta.stat().st_size
+    return archivos, total_bytes
+
+
+# Con menos muestras el p95 es simplemente el máximo: no se informa
+MIN_MUESTRAS_P95 = 20
+
+
+def distribucion(valores, escala=1):
+    """Mínimo, mediana (p50) y máximo de las muestras; p95 solo si hay al menos MIN_MUESTRAS_P95."""
+    ordenados = sorted(valor * escala for valor in valores)
+    datos = {"min": ordenados[0], "p50": percentil(ordenados, 50), "max": ordenados[-1]}
+    if len(ordenados) >= MIN_MUESTRAS_P95:
+        datos["p95"] = percentil(ordenados, 95)
+    return datos
+
+
+def resumir(segundos, archivos, total_bytes):
+    mediana = percentil(sorted(segundos), 50)
+    return {
+        "muestras": len(segundos),
+        "segundos": distribucion(segundos),
+        "archivos_por_segundo": archivos / mediana if mediana else None,
+        "mb_por_segundo": total_bytes / 1024 / 1024 / mediana if mediana else None,
+    }
+
+
+def cargar_maestro(conexion, cantidad, ejercicio=2000):
+    """Precarga Maestro con expedientes ajenos al lote para simular el tamaño de producción."""
+    conexion.executemany(
+        "INSERT INTO Maestro (Boca, letra, actuacion, ejercicio, apeynom, extracto, fech_alta, estado, folio, origen_nomenc, Subtramite) "
+        "VALUES (2, ?, ?, ?, 'RESOLUCION DE PRESIDENCIA', 'Reconocimiento optico de caracteres: texto previo', CURRENT_TIMESTAMP, 'N', 1, 100180, 900999)",
+        ((str(1 + i % 3), f"{i % 1000000:06d}", str(ejercicio - i // 1000000)) for i in range(cantidad))
+    )
+    conexion.commit()
+
+
+def contar_maestro(config):
+    conexion = main.get_db_connection(config)
+    try:
+        return conexion.execute("SELECT COUNT(*) FROM Maestro").fetchone()[0]
+    finally:
+        conexion.close()
+
+
+def preparar_repeticion(trabajo, corpus, config_extra, maestro_existentes):
+    """Deja los directorios de trabajo y la réplica de Gestion como al inicio de una corrida real."""
+    for nombre in ("origen", "temp", "procesados", "destino"):
+        shutil.rmtree(trabajo / nombre, ignore_errors=True)
+    for sufijo in ("", "-wal", "-shm"):
+        (trabajo / f"gestion.sqlite3{sufijo}").unlink(missing_ok=True)
+    shutil.copytree(corpus, trabajo / "origen")
+    config = dict(main.load_config())
+    config.update({
+        "source_dir": str(trabajo / "origen"),
+        "temp_dir": str(trabajo / "temp"),
+        "processed_dir": str(trabajo / "procesados"),
+        "backup_dir": str(trabajo / "procesados" / "PDFs_BK"),
+        "target_dir": str(trabajo / "destino"),
+        "extraction_cache": False,
+        "db_backend": "sqlite",
+        "db_sqlite_path": str(trabajo / "gestion.sqlite3"),
+    })
+    config.update(config_extra)
+
+    conexion = main.get_db_connection(config)
+    try:
+        cargar_maestro(conexion, maestro_existentes)
+    finally:
+        conexion.close()
+    return config
+
+
+def medir(etapas, nombre, funcion, *args):
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    etapas.setdefault(nombre, []).append(time.perf_counter() - inicio)
+    return resultado
+
+
+def ejecutar(args):
+    config_extra = json.loads(args.config_extra) if args.config_extra else {}
+    # Sin --verbose solo se muestran errores: el costo del logging no entra en la medición
+    configurar_logging({"log_level": "INFO" if args.verbose else "ERROR"})
+    trabajo = Path(args.directorio or tempfile.mkdtemp(prefix="bench_resoluciones_"))
+    corpus = trabajo / "corpus"
+    shutil.rmtree(corpus, ignore_errors=True)
+    archivos, total_bytes = generar_corpus(
+        corpus, args.archivos, args.paginas, args.palabras, args.invalidos, args.subdirectorios, args.semilla
+    )
+
+    etapas = {}
+    latencias_extraccion = []
+    paginas_extraidas = 0
+
+    for _ in range(args.repeticiones):
+        config = preparar_repeticion(trabajo, corpus, config_extra, args.maestro_existentes)
+
+        medir(etapas, "copy_files", main.copy_files, config)
+        manifiesto = main.load_manifest(config)
+        processed_files, invalid_files = medir(etapas, "process_files", main.process_files, manifiesto, config)
+
+        # Latencia por archivo de la extracción en serie (sin pool ni caché)
+        temp_dir = Path(config["temp_dir"])
+        for _, _, _, file in processed_files:
+            inicio = time.perf_counter()
+            main.extract_text_from_pdf(temp_dir / file)
+            latencias_extraccion.append(time.perf_counter() - inicio)
+            paginas_extraidas += args.paginas
+
+        medir(etapas, "insert_and_update_db", main.insert_and_update_db, processed_files, config)
+        medir(etapas, "clean_and_move_files", main.clean_and_move_files, processed_files, invalid_files, config)
+
+    validos = len(processed_files)
+    resultado = {
+        "corpus": {
+            "archivos": archivos,
+            "validos": validos,
+            "invalidos": len(invalid_files),
+            "paginas_por_archivo": args.paginas,
+            "mb": total_bytes / 1024 / 1024,
+            "maestro_existentes": args.maestro_existentes,
+        },
+        "config": config_extra,
+        "etapas": {
+            "copy_files": resumir(etapas["copy_files"], archivos, total_bytes),
+            "process_files": resumir(etapas["process_files"], archivos, total_bytes),
+            "insert_and_update_db": resumir(etapas["insert_and_update_db"], validos, total_bytes),
+            "clean_and_move_files": resumir(etapas["clean_and_move_files"], validos, total_bytes),
+        },
+        "extract_text_from_pdf": {
+            "muestras": len(latencias_extraccion),
+            "latencia_ms": distribucion(latencias_extraccion, 1000) if latencias_extraccion else None,
+            "archivos_por_segundo": len(latencias_extraccion) / sum(latencias_extraccion) if latencias_extraccion else None,
+            "paginas_por_segundo": paginas_extraidas / sum(latencias_extraccion) if latencias_extraccion else None,
+        },
+        "maestro_filas": contar_maestro(config),
+    }
+
+    detener_logging()
+    if not args.directorio and not args.conservar:
+        shutil.rmtree(trabajo, ignore_errors=True)
+    return resultado
+
+
+def entero_positivo(valor):
+    numero = int(valor)
+    if numero < 1:
+        raise argparse.ArgumentTypeError(f"debe ser al menos 1: {valor}")
+    return numero
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del procesador de resoluciones")
+    parser.add_argument("--archivos", type=int, default=200, help="cantidad de PDFs sintéticos")
+    parser.add_argument("--paginas", type=int, default=3, help="páginas por PDF")
+    parser.add_argument("--palabras", type=int, default=300, help="palabras por página")
+    parser.add_argument("--invalidos", type=float, default=0.02, help="proporción de nombres inválidos")
+    parser.add_argument("--subdirectorios", type=int, default=4, help="subcarpetas en el origen")
+    parser.add_argument("--maestro-existentes", type=int, default=10000, help="filas previas en Maestro")
+    parser.add_argument("--repeticiones", type=entero_positivo, default=3, help="corridas completas a medir (al menos 1)")
+    parser.add_argument("--semilla", type=int, default=1234)
+    parser.add_argument("--config-extra", help="JSON con claves de config.json a sobrescribir")
+    parser.add_argument("--directorio", help="directorio de trabajo (por defecto uno temporal)")
+    parser.add_argument("--conservar", action="store_true", help="no borrar el directorio temporal")
+    parser.add_argument("--salida", help="archivo JSON de salida (por defecto stdout)")
+    parser.add_argument("--verbose", action="store_true", help="mostrar la salida del proceso")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    resultado = ejecutar(args)
+    texto = json.dumps(resultado, indent=4, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto)
+    print(texto)
@@ -4,6 +4,14 @@ setlocal
 set APP_NAME=Procesador de Resoluciones
 set DIST_PATH=C:\My Software Folder
 set EXE_PATH=%DIST_PATH%\%APP_NAME%.exe
+set MODO=--onefile
+
+:: "build.bat onedir" genera una carpeta en lugar de un unico .exe: arranca mas rapido
+:: porque no descomprime todo en un directorio temporal en cada inicio
+if /i "%~1"=="onedir" (
+    set MODO=--onedir
+    set EXE_PATH=%DIST_PATH%\%APP_NAME%\%APP_NAME%.exe
+)
 
 echo ============================================================
 echo  BUILD: %APP_NAME%
@@ -30,7 +38,7 @@ if exist "dist"  rmdir /s /q "dist"
 
 :: Ejecutar PyInstaller
 echo Compilando...
-pyinstaller --onefile --windowed ^
+pyinstaller %MODO% --windowed --noconfirm ^
     --name "%APP_NAME%" ^
     --distpath "%DIST_PATH%" ^
     --icon="assets/icon.ico" ^
@@ -0,0 +1,186 @@
+# cli.py
+"""
+Procesador de resoluciones por línea de comandos, sin interfaz gráfica.
+
+Uso (desde la raíz del proyecto):
+    python cli.py                                   # una ejecución con config.json
+    python cli.py --config otra.json --modo streaming --extraction-workers 4
+    python cli.py --dry-run --json                  # qué se procesaría, sin modificar nada
+    python cli.py --vigilar                         # procesa los PDFs nuevos a medida que llegan
+    python cli.py --reanudar                        # retoma la última ejecución que quedó cortada
+    python cli.py buscar "haber jubilatorio" --frase --ejercicio 2024   # busca en el texto ya procesado
+
+Código de salida: 0 si la ejecución terminó sin errores (aunque no hubiera
+archivos para procesar), 1 si hubo un error en el proceso.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import signal
+import sys
+
+import main
+from modules.logs import NIVELES, configurar_logging, detener_logging, get_logger
+from modules.metricas import metricas
+from modules.vigilante import MODOS as MODOS_VIGILANCIA, VigilanteOrigen
+
+log = get_logger("cli")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Procesador de resoluciones (sin interfaz gráfica)")
+    parser.add_argument("--config", help="archivo de configuración (por defecto config.json junto a main.py)")
+    parser.add_argument("--modo", choices=("etapas", "streaming", "asyncio"), help="pipeline_mode para esta ejecución")
+    parser.add_argument("--copy-workers", type=int, help="hilos de copia (copy_workers)")
+    parser.add_argument("--extraction-workers", type=int, help="procesos de extracción (extraction_workers, 0 = uno por núcleo)")
+    parser.add_argument("--log-level", choices=NIVELES, help="detalle del log en consola")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="escanear y validar el origen sin copiar, escribir en la base de datos ni mover nada")
+    parser.add_argument("--json", action="store_true",
+                        help="resultado en JSON por stdout (un objeto por ejecución); el log pasa a stderr")
+    parser.add_argument("--reanudar", action="store_true",
+                        help="retomar la última ejecución cortada: cada archivo saltea los pasos que ya tenía hechos")
+    parser.add_argument("--vigilar", action="store_true",
+                        help="quedar en ejecución y procesar en microlotes los PDFs nuevos de source_dir a medida que llegan")
+    parser.add_argument("--vigilancia", choices=MODOS_VIGILANCIA, help="cómo detectar archivos nuevos (watch_mode)")
+    parser.add_argument("--intervalo", type=float, help="segundos entre revisiones de source_dir (watch_interval_seconds)")
+    parser.add_argument("--ciclos", type=int, default=0, help="con --vigilar, microlotes antes de salir (0 = sin límite)")
+
+    comandos = parser.add_subparsers(dest="comando", metavar="comando")
+    buscar_parser = comandos.add_parser("buscar", help="buscar en el texto de las resoluciones ya procesadas (índice local)")
+    buscar_parser.add_argument("consulta", help='palabras, "frases", OR, NOT o prefijo* (sintaxis FTS5 de SQLite)')
+    buscar_parser.add_argument("--frase", action="store_true", help="tomar la consulta literal, como frase exacta")
+    buscar_parser.add_argument("--ejercicio", help="solo resoluciones de ese ejercicio (año)")
+    buscar_parser.add_argument("--letra", help="solo resoluciones de esa letra")
+    buscar_parser.add_argument("--limite", type=int, default=20, help="cantidad máxima de resultados (por defecto 20)")
+    # SUPPRESS: sin esto los valores por defecto del subcomando pisan los dados antes de "buscar"
+    buscar_parser.add_argument("--config", default=argparse.SUPPRESS, help="archivo de configuración")
+    buscar_parser.add_argument("--json", action="store_true", default=argparse.SUPPRESS, help="resultados en JSON por stdout")
+    args = parser.parse_args(argv)
+    if args.config and not os.path.isfile(args.config):
+        parser.error(f"no existe el archivo de configuración: {args.config}")
+    return args
+
+
+def armar_config(args):
+    """Configuración del archivo con los valores de la línea de comandos encima."""
+    config = dict(main.load_config(args.config))
+    for clave, valor in (
+        ("pipeline_mode", args.modo),
+        ("copy_workers", args.copy_workers),
+        ("extraction_workers", args.extraction_workers),
+        ("log_level", args.log_level),
+        ("watch_mode", args.vigilancia),
+        ("watch_interval_seconds", args.intervalo),
+    ):
+        if valor is not None:
+            config[clave] = valor
+    return config
+
+
+def ejecutar_una_vez(config, reanudar=None):
+    """Corre el proceso completo. Devuelve (código de salida, resultado para la salida JSON)."""
+    exito, registro_path, log_path, cleanup_log, deleted_count, _ = main.ejecutar_proceso_completo(config, reanudar)
+    resumen = metricas.resumen()
+    codigo = 1 if resumen["contadores"].get("ejecuciones_con_error") else 0
+    return codigo, {
+        "exito": exito,
+        "codigo_salida": codigo,
+        "registro": registro_path,
+        "log_invalidos": log_path,
+        "log_limpieza": cleanup_log,
+        "temporales_eliminados": deleted_count,
+        "metricas": resumen,
+    }
+
+
+def buscar(config, args):
+    """Busca en el índice local de texto (modules/indice_texto.py) y muestra los resultados por stdout."""
+    try:
+        resultados = main.buscar_resoluciones(
+            args.consulta, config, limite=args.limite, ejercicio=args.ejercicio, letra=args.letra, frase=args.frase
+        )
+    except ValueError as e:
+        log.error(f"{e}. Para buscar el texto literal usar --frase.")
+        return 1
+    if args.json:
+        print(json.dumps(resultados, indent=4, ensure_ascii=False))
+        return 0
+    for resultado in resultados:
+        print(f"{resultado['archivo']}  (relevancia {resultado['puntaje']:.2f})")
+        print(f"    {' '.join(resultado['fragmento'].split())}")
+    # Con el índice vacío o recién habilitado, "sin resultados" no dice nada de Maestro
+    indexados = main.contar_resoluciones_indexadas(config)
+    cantidad = {0: "Sin resultados", 1: "1 resultado"}.get(len(resultados), f"{len(resultados)} resultados")
+    print(f"{cantidad} entre {indexados} expedientes indexados.")
+    return 0
+
+
+def vigilar(config, args, vigilante):
+    """
+    Procesa cada microlote de PDFs estables que entrega el vigilante de
+    source_dir (modules/vigilante.py) con main.procesar_lote.
+    """
+    ciclos = 0
+    codigo = 0
+    for lote in vigilante.lotes():
+        exito, registro_path, log_path, cleanup_log, deleted_count, _ = main.procesar_lote(lote, config)
+        resumen = metricas.resumen()
+        codigo = 1 if resumen["contadores"].get("ejecuciones_con_error") else 0
+        if codigo:
+            # Los PDFs válidos siguen en el origen: se vuelven a entregar en lugar de esperar a que cambien
+            vigilante.reintentar(lote)
+        if args.json:
+            resultado = {
+                "exito": exito,
+                "codigo_salida": codigo,
+                "archivos": lote,
+                "registro": registro_path,
+                "log_invalidos": log_path,
+                "metricas": resumen,
+            }
+            print(json.dumps(resultado, ensure_ascii=False, default=str), flush=True)
+        ciclos += 1
+        if args.ciclos and ciclos >= args.ciclos:
+            break
+    return codigo
+
+
+def ejecutar(argv=None):
+    args = parse_args(argv)
+    config = armar_config(args)
+    # Con --json stdout queda reservado para el resultado
+    configurar_logging(config, consola=sys.stderr if args.json else None)
+
+    try:
+        if args.comando == "buscar":
+            return buscar(config, args)
+        if args.dry_run:
+            resultado = main.simular_proceso(config)
+            if args.json:
+                print(json.dumps(resultado, indent=4, ensure_ascii=False))
+            return 0
+        if args.vigilar:
+            # En vigilancia una señal no corta el microlote en curso: se sale al terminarlo
+            vigilante = VigilanteOrigen.desde_config(config)
+            def al_recibir_senal(signum, _frame):
+                log.info("Señal de finalización recibida: se termina al completar el microlote en curso.")
+                vigilante.detener()
+            for nombre in ("SIGINT", "SIGTERM", "SIGBREAK"):
+                if hasattr(signal, nombre):
+                    signal.signal(getattr(signal, nombre), al_recibir_senal)
+            return vigilar(config, args, vigilante)
+        codigo, resultado = ejecutar_una_vez(config, reanudar=args.reanudar or None)
+        if args.json:
+            print(json.dumps(resultado, indent=4, ensure_ascii=False, default=str))
+        return codigo
+    finally:
+        main.cerrar_conexiones()
+        detener_logging()
+
+
+if __name__ == "__main__":
+    # Necesario para que el pool de extracción funcione en un ejecutable de PyInstaller
+    multiprocessing.freeze_support()
+    sys.exit(ejecutar())
@@ -0,0 +1,143 @@
+# gui/log_view.py
+
+import html
+import logging
+import os
+import re
+import time
+from datetime import datetime
+
+from PyQt6.QtWidgets import QPlainTextEdit
+from PyQt6.QtCore import QTimer
+from PyQt6.QtGui import QFont
+
+from modules.logs import get_logger
+
+log = get_logger("log_view")
+
+# Una sola expresión para clasificar cada línea. Las alternativas se prueban en
+# orden desde el comienzo de la línea, así se respeta la prioridad de colores:
+# error > éxito > advertencia > archivo > base de datos.
+PATRON_CLASE = re.compile(
+    r"^(?:"
+    r"(?=.*(?:error|excepción|inválido))(?P<error>)"
+    r"|(?=.*(?:éxito|completado|correctamente))(?P<exito>)"
+    r"|(?=.*(?:advertencia|warning|atención))(?P<advertencia>)"
+    r"|(?=.*(?:archivo|\.pdf|copiando))(?P<archivo>)"
+    r"|(?=.*(?:base de datos|tabla|sql))(?P<base_datos>)"
+    r")",
+    re.IGNORECASE
+)
+
+COLORES = {
+    "error": "#ff6b6b",        # rojo
+    "exito": "#6bff8c",        # verde
+    "advertencia": "#ffd76b",  # amarillo
+    "archivo": "#6bddff",      # azul claro
+    "base_datos": "#d16bff",   # violeta
+    None: "#e0e0e0",           # normal
+}
+
+# Tamaño a partir del cual el historial se rota al abrir la ventana
+MAX_HISTORIAL_BYTES = 10 * 1024 * 1024
+
+
+def clasificar(linea, nivel=None):
+    """Clase de color de una línea; el nivel de logging, si se conoce, tiene prioridad."""
+    if nivel is not None:
+        if nivel >= logging.ERROR:
+            return "error"
+        if nivel >= logging.WARNING:
+            return "advertencia"
+    coincidencia = PATRON_CLASE.match(linea)
+    return coincidencia.lastgroup if coincidencia else None
+
+
+class VistaLog(QPlainTextEdit):
+    """
+    Área de log de la ventana principal. Las líneas se acumulan y se vuelcan
+    juntas cada intervalo_ms milisegundos (un solo appendHtml por lote), el
+    documento conserva como máximo max_bloques líneas y el historial completo se
+    escribe en ruta_historial. fuente, si se indica, es un ManejadorEnLotes
+    (modules/logs.py) del que se toman los mensajes del proceso en cada volcado.
+    Cada lote se ordena por la hora de creación de los mensajes: los del
+    proceso (que llegan por la cola de logging) y los agregados directamente
+    desde la ventana se muestran en el orden en que ocurrieron.
+    """
+
+    def __init__(self, fuente=None, max_bloques=5000, intervalo_ms=100, ruta_historial=None, parent=None):
+        super().__init__(parent)
+        self.fuente = fuente
+        self._pendientes = []
+        self._historial = self._abrir_historial(ruta_historial)
+
+        self.setReadOnly(True)
+        self.setFont(QFont("Consolas", 10))
+        self.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)  # No envolver líneas
+        # Asegurar colores correctos independientemente del tema
+        self.setStyleSheet("color: #e0e0e0; background-color: #1e1e1e;")
+        # Las líneas más viejas se descartan del widget (siguen en el historial)
+        self.setMaximumBlockCount(max(100, int(max_bloques)))
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.volcar)
+        self.timer.start(max(20, int(intervalo_ms)))
+
+    @staticmethod
+    def _abrir_historial(ruta):
+        if not ruta:
+            return None
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+            if os.path.exists(ruta) and os.path.getsize(ruta) > MAX_HISTORIAL_BYTES:
+                os.replace(ruta, f"{ruta}.1")
+            return open(ruta, 'a', encoding='utf-8')
+        except OSError as e:
+            log.warning(f"Advertencia: no se pudo abrir el historial del log {ruta}: {e}")
+            return None
+
+    def agregar(self, mensaje, nivel=None):
+        """Encola un mensaje (puede tener varias líneas) con la hora actual; se muestra en el próximo volcado."""
+        creado = time.time()
+        timestamp = datetime.fromtimestamp(creado).strftime('%H:%M:%S')
+        for linea in mensaje.split('\n'):
+            if linea.strip():  # Omitir líneas vacías
+                self._pendientes.append((creado, nivel, f"[{timestamp}] {linea}"))
+
+    def volcar(self):
+        """Muestra de una vez todas las líneas acumuladas desde el último volcado."""
+        lote = self._pendientes
+        self._pendientes = []
+        if self.fuente is not None:
+            for creado, nivel, texto in self.fuente.vaciar():
+                lote.extend((creado, nivel, linea) for linea in texto.split('\n') if linea.strip())
+        if not lote:
+            return
+        # Orden estable: las líneas de un mismo mensaje (misma hora) quedan juntas y en su orden
+        lote.sort(key=lambda entrada: entrada[0])
+
+        if self._historial is not None:
+            self._historial.write('\n'.join(linea for _, _, linea in lote) + '\n')
+            self._historial.flush()
+
+        # Solo las líneas que el widget va a conservar; cada párrafo es un bloque del documento
+        lote = lote[-self.maximumBlockCount():]
+        html_lote = ''.join(
+            f"<p><span style='color:{COLORES[clasificar(linea, nivel)]};'>{html.escape(linea, quote=False)}</span></p>"
+            for _, nivel, linea in lote
+        )
+
+        scrollbar = self.verticalScrollBar()
+        # Seguir el final solo si el usuario no subió a leer líneas anteriores
+        al_final = scrollbar.value() >= scrollbar.maximum() - 2
+        self.appendHtml(html_lote)
+        if al_final:
+            scrollbar.setValue(scrollbar.maximum())
+
+    def cerrar(self):
+        """Vuelca lo pendiente y cierra el historial."""
+        self.timer.stop()
+        self.volcar()
+        if self._historial is not None:
+            self._historial.close()
+            self._historial = None
@@ -77,8 +77,8 @@ QProgressBar::chunk {
     border: 1px solid #007BFF;
     }
     
-    /* QTextEdit para el área de log */
-    QTextEdit {
+    /* QTextEdit / QPlainTextEdit para el área de log */
+    QTextEdit, QPlainTextEdit {
         background-color: #1e1e1e;
         color: #e0e0e0;
         border: 1px solid #444;
@@ -88,7 +88,7 @@ QProgressBar::chunk {
         selection-color: #ffffff;
     }
     
-    /* Scrollbars para QTextEdit */
+    /* Scrollbars para el área de log */
     QScrollBar:vertical {
         background: #2c2c2c;
         width: 12px;
@@ -1,111 +1,75 @@
 # launcher.py
+import time
+
+# Antes de importar PyQt6, para medir el arranque completo con --tiempos-inicio
+_INICIO = time.perf_counter()
 
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QPushButton, QVBoxLayout, QProgressBar, QMessageBox,
-    QTextEdit, QHBoxLayout, QFileDialog, QLabel, QSplitter, QFrame
+    QHBoxLayout, QFileDialog, QLabel, QSplitter, QFrame
 )
-from PyQt6.QtCore import QThread, pyqtSignal, Qt, QSize, QObject, pyqtSlot
+from PyQt6.QtCore import QThread, QTimer, pyqtSignal, Qt, QSize
 from PyQt6.QtGui import QIcon, QPixmap, QFont
 
 import sys
 import os
-import json
-import io
-from datetime import datetime
+import logging
+import multiprocessing
 
-# Importamos la función principal de procesamiento
-from main import ejecutar_proceso_completo, load_config
+# El proceso (main.py, PyPDF2, pyodbc) no se importa acá: se precarga en segundo plano con la ventana visible
+from modules.configuracion import load_config
+from modules.logs import ManejadorEnLotes, configurar_logging, detener_logging, get_logger
+from modules.progreso import EstimadorProgreso, progreso
 
 # Importa ResourceManager para cargar íconos
 from modules.resource_manager import ResourceManager
 
 # Importa la función para aplicar estilo (opcional)
 from gui.style import apply_stylesheet
+from gui.log_view import VistaLog
 
+log = get_logger("launcher")
 
-# Clase para redireccionar la salida estándar y capturarla para el log
-class OutputRedirector(QObject):
-    output_written = pyqtSignal(str)
-    
-    def __init__(self):
-        super().__init__()
-        self.buffer = io.StringIO()
-        
-    def write(self, text):
-        if text and not text.isspace():
-            self.output_written.emit(text.rstrip())
-            # También escribimos a stdout original para que aparezca en la consola
-            if sys.__stdout__:
-                sys.__stdout__.write(text)
-        
-    def flush(self):
-        if sys.__stdout__:
-            sys.__stdout__.flush()
+MEDIR_INICIO = "--tiempos-inicio" in sys.argv
+
+
+class PrecargaThread(QThread):
+    """Importa el proceso y sus dependencias pesadas mientras la ventana ya responde."""
+    lista = pyqtSignal(float)
+
+    def run(self):
+        inicio = time.perf_counter()
+        import main  # noqa: F401
+        import PyPDF2  # noqa: F401
+        try:
+            import pyodbc  # noqa: F401
+        except ImportError:
+            pass  # sin el driver solo funciona el backend sqlite; el error se informa al conectar
+        self.lista.emit(time.perf_counter() - inicio)
 
 
 class ProcesoThread(QThread):
-    progreso = pyqtSignal(int)
     terminado = pyqtSignal(bool, str, str, str, int, str)
     log_update = pyqtSignal(str)
 
-    def __init__(self):
-        super().__init__()
-        # Crear redireccionador para capturar salida estándar
-        self.stdout_redirector = OutputRedirector()
-        self.stdout_redirector.output_written.connect(self.capturar_salida)
-        
-    @pyqtSlot(str)
-    def capturar_salida(self, texto):
-        """Recibe texto de la salida estándar y lo envía al log"""
-        self.log_update.emit(texto)
-        
     def run(self):
-        # Redirigir stdout durante la ejecución del hilo
-        original_stdout = sys.stdout
-        sys.stdout = self.stdout_redirector
+        # Los mensajes del proceso llegan a la ventana por el logging (ManejadorEnLotes), no por stdout,
+        # y el avance por los eventos de modules/progreso.py
+        self.log_update.emit("Iniciando proceso de carga de resoluciones...")
+
+        # Ejecutamos el proceso completo (si la precarga no terminó, el import espera a que termine)
+        from main import ejecutar_proceso_completo
+        exito, registro_path, log_path, cleanup_log, deleted_count, resumen = ejecutar_proceso_completo()
+
+        if deleted_count > 0:
+            self.log_update.emit(f"Se eliminaron {deleted_count} archivos temporales antiguos.")
         
-        try:
-            config = load_config()
-            progress_steps = config.get("progress_steps", [25, 50, 75, 100])
-            
-            # Primer paso: inicio
-            self.log_update.emit("Iniciando proceso de carga de resoluciones...")
-            self.progreso.emit(progress_steps[0] if len(progress_steps) > 0 else 25)
-            
-            # Segundo paso: copia de archivos
-            self.log_update.emit("Copiando archivos...")
-            if len(progress_steps) > 1:
-                self.progreso.emit(progress_steps[1])
-                
-            # Tercer paso: procesamiento
-            self.log_update.emit("Procesando archivos...")
-            if len(progress_steps) > 2:
-                self.progreso.emit(progress_steps[2])
-                
-            # Cuarto paso: base de datos
-            self.log_update.emit("Actualizando base de datos...")
-            if len(progress_steps) > 3:
-                self.progreso.emit(progress_steps[3])
-            
-            # Ejecutamos el proceso completo
-            exito, registro_path, log_path, cleanup_log, deleted_count, resumen = ejecutar_proceso_completo()
-            
-            # Paso final
-            self.progreso.emit(100)
-            
-            if deleted_count > 0:
-                self.log_update.emit(f"Se eliminaron {deleted_count} archivos temporales antiguos.")
+        if exito:
+            self.log_update.emit("¡Proceso finalizado con éxito!")
+        else:
+            self.log_update.emit("No se encontraron archivos válidos para procesar.")
             
-            if exito:
-                self.log_update.emit("¡Proceso finalizado con éxito!")
-            else:
-                self.log_update.emit("No se encontraron archivos válidos para procesar.")
-                
-            self.terminado.emit(exito, registro_path or '', log_path or '', cleanup_log or '', deleted_count, resumen or '')
-        
-        finally:
-            # Restaurar stdout original
-            sys.stdout = original_stdout
+        self.terminado.emit(exito, registro_path or '', log_path or '', cleanup_log or '', deleted_count, resumen or '')
 
 
 class MainWindow(QWidget):
@@ -138,16 +102,26 @@ class MainWindow(QWidget):
         self.barra = QProgressBar()
         self.barra.setValue(0)
         self.barra.setMinimumHeight(30)
+
+        # Avance real: el estimador recibe los eventos del proceso y la ventana lo consulta con un temporizador
+        self.estimador = EstimadorProgreso()
+        self.etiqueta_progreso = QLabel("")
+        self.timer_progreso = QTimer(self)
+        self.timer_progreso.timeout.connect(self.actualizar_progreso)
         
+        # Los registros del proceso se acumulan en el manejador y el área de log los vuelca de a lotes
+        self.manejador_log = ManejadorEnLotes()
+        self.manejador_log.setFormatter(logging.Formatter("[%(asctime)s] %(message)s", "%H:%M:%S"))
+        configurar_logging(self.config, manejadores_extra=[self.manejador_log])
+
         # Área de log
-        self.log_area = QTextEdit()
-        self.log_area.setReadOnly(True)
-        self.log_area.setFont(QFont("Consolas", 10))
-        self.log_area.setLineWrapMode(QTextEdit.LineWrapMode.NoWrap)  # No envolver líneas
-        # Asegurar colores correctos independientemente del tema
-        self.log_area.setStyleSheet("color: #e0e0e0; background-color: #1e1e1e;")
-        # Habilitar interpretación de HTML
-        self.log_area.setAcceptRichText(True)
+        processed_dir = self.config.get("processed_dir", "C:\\Temp\\Procesados")
+        self.log_area = VistaLog(
+            fuente=self.manejador_log,
+            max_bloques=self.config.get("gui_log_max_blocks", 5000),
+            intervalo_ms=self.config.get("gui_log_interval_ms", 100),
+            ruta_historial=self.config.get("gui_log_history_file") or os.path.join(processed_dir, "historial_log.txt")
+        )
         
         # Crear un splitter para dividir la interfaz
         splitter = QSplitter(Qt.Orientation.Vertical)
@@ -163,6 +137,7 @@ class MainWindow(QWidget):
         
         top_layout.addLayout(buttons_layout)
         top_layout.addWidget(self.barra)
+        top_layout.addWidget(self.etiqueta_progreso)
         
         # Panel inferior para el log
         bottom_panel = QFrame()
@@ -192,12 +167,25 @@ class MainWindow(QWidget):
 
         # Configurar el hilo
         self.hilo = ProcesoThread()
-        self.hilo.progreso.connect(self.barra.setValue)
         self.hilo.terminado.connect(self.mostrar_mensaje)
         self.hilo.log_update.connect(self.agregar_log)
         
         # Log inicial
         self.agregar_log("Aplicación inicializada. Esperando instrucciones...")
+
+        # La precarga arranca con el primer ciclo de eventos, cuando la ventana ya se pintó
+        self.precarga = PrecargaThread()
+        self.precarga.lista.connect(self.precarga_lista)
+        QTimer.singleShot(0, self.precarga.start)
+
+    def precarga_lista(self, segundos):
+        if MEDIR_INICIO:
+            log.info(f"Inicio: proceso precargado en {segundos * 1000:.0f} ms "
+                     f"({(time.perf_counter() - _INICIO) * 1000:.0f} ms desde el arranque)")
+
+    def ventana_visible(self):
+        if MEDIR_INICIO:
+            log.info(f"Inicio: ventana visible en {(time.perf_counter() - _INICIO) * 1000:.0f} ms")
         
     def limpiar_log(self):
         """Limpia el área de log"""
@@ -205,47 +193,31 @@ class MainWindow(QWidget):
         self.agregar_log("Log limpiado.")
         
     def agregar_log(self, mensaje):
-        """Añade una entrada al área de log con marca de tiempo y formato adecuado"""
-        timestamp = datetime.now().strftime('%H:%M:%S')
-        
-        # Si el mensaje tiene múltiples líneas, procesarlas individualmente
-        for linea in mensaje.split('\n'):
-            if not linea.strip():  # Omitir líneas vacías
-                continue
-                
-            # Aplicar formatos según el contenido del mensaje
-            formato_html = ""
-            
-            # Mensajes de error en rojo
-            if "error" in linea.lower() or "excepción" in linea.lower() or "inválido" in linea.lower():
-                formato_html = f"<span style='color:#ff6b6b;'>[{timestamp}] {linea}</span>"
-            
-            # Mensajes de éxito en verde
-            elif "éxito" in linea.lower() or "completado" in linea.lower() or "correctamente" in linea.lower():
-                formato_html = f"<span style='color:#6bff8c;'>[{timestamp}] {linea}</span>"
-            
-            # Mensajes de advertencia en amarillo
-            elif "advertencia" in linea.lower() or "warning" in linea.lower() or "atención" in linea.lower():
-                formato_html = f"<span style='color:#ffd76b;'>[{timestamp}] {linea}</span>"
-                
-            # Mensajes relacionados con archivos en azul claro
-            elif "archivo" in linea.lower() or ".pdf" in linea.lower() or "copiando" in linea.lower():
-                formato_html = f"<span style='color:#6bddff;'>[{timestamp}] {linea}</span>"
-                
-            # Mensajes de base de datos en violeta
-            elif "base de datos" in linea.lower() or "tabla" in linea.lower() or "sql" in linea.lower():
-                formato_html = f"<span style='color:#d16bff;'>[{timestamp}] {linea}</span>"
-                
-            # Mensaje normal
-            else:
-                formato_html = f"<span style='color:#e0e0e0;'>[{timestamp}] {linea}</span>"
-            
-            self.log_area.append(formato_html)
-                
-        # Desplazar al final
-        scrollbar = self.log_area.verticalScrollBar()
-        if scrollbar:
-            scrollbar.setValue(scrollbar.maximum())
+        """Añade una entrada al área de log con marca de tiempo; se muestra en el próximo volcado"""
+        self.log_area.agregar(mensaje)
+
+    @staticmethod
+    def _formato_duracion(segundos):
+        if segundos is None:
+            return "--:--"
+        minutos, segundos = divmod(int(round(segundos)), 60)
+        horas, minutos = divmod(minutos, 60)
+        return f"{horas}:{minutos:02d}:{segundos:02d}" if horas else f"{minutos:02d}:{segundos:02d}"
+
+    def actualizar_progreso(self):
+        """Muestra porcentaje, archivos terminados, velocidad y tiempo restante según los eventos recibidos"""
+        estado = self.estimador.estado()
+        if not estado["descubiertos"]:
+            self.etiqueta_progreso.setText("Buscando archivos en origen...")
+            return
+        self.barra.setValue(int(estado["porcentaje"]))
+        self.etiqueta_progreso.setText(
+            f"{estado['terminados']}/{estado['descubiertos']} archivos · "
+            f"{estado['archivos_por_segundo']:.1f} archivos/s · "
+            f"{estado['mb_por_segundo']:.1f} MB/s · "
+            f"transcurrido {self._formato_duracion(estado['transcurrido_segundos'])} · "
+            f"restante {self._formato_duracion(estado['eta_segundos'])}"
+        )
 
     def iniciar_proceso(self):
         # Creamos un QMessageBox manual para la pregunta
@@ -273,6 +245,9 @@ class MainWindow(QWidget):
         if respuesta == QMessageBox.StandardButton.Yes:
             self.boton_procesar.setEnabled(False)
             self.barra.setValue(0)
+            self.estimador.reiniciar()
+            progreso.suscribir(self.estimador)
+            self.timer_progreso.start(max(50, int(self.config.get("gui_progress_interval_ms", 250))))
             self.agregar_log("Iniciando proceso...")
             self.hilo.start()
             
@@ -289,6 +264,11 @@ class MainWindow(QWidget):
 
     def mostrar_mensaje(self, exito, registro_path, log_path, cleanup_log, deleted_count, resumen):
         self.boton_procesar.setEnabled(True)
+        self.timer_progreso.stop()
+        progreso.desuscribir(self.estimador)
+        self.actualizar_progreso()
+        self.barra.setValue(100)
+        self.log_area.volcar()
         
         # Añadir detalles de archivos al log
         if registro_path and os.path.exists(registro_path):
@@ -329,8 +309,17 @@ class MainWindow(QWidget):
 
 
 if __name__ == "__main__":
+    # Necesario para que el pool de extracción funcione en el ejecutable de PyInstaller
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     apply_stylesheet(app)  # opcional
     window = MainWindow()
     window.show()
-    sys.exit(app.exec())
+    QTimer.singleShot(0, window.ventana_visible)
+    codigo = app.exec()
+    # main se importa en segundo plano: si llegó a cargarse, se cierran sus conexiones con sql01
+    if "main" in sys.modules:
+        sys.modules["main"].cerrar_conexiones()
+    detener_logging()
+    window.log_area.cerrar()
+    sys.exit(codigo)
@@ -2,55 +2,113 @@
 import os
 import shutil
 import json
+import mmap
 import time
+import queue
+import asyncio
+import sqlite3
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
 from datetime import timedelta, datetime
 from pathlib import Path
-import pyodbc
-import PyPDF2
-
-def get_db_connection():
-    server = 'sql01'
-    database = 'Gestion'
-    drivers = [
-        "SQL Server Native Client 11.0",
-        "SQL Server",
-        "SQL Server Native Client 10.0"
-    ]
-    for driver in drivers:
-        try:
-            conn = pyodbc.connect(
-                f'DRIVER={{{driver}}};'
-                f'SERVER={server};'
-f'DATABASE={database};'
-                f'Trusted_Connection=yes;'
+
+from modules.backend_db import BACKENDS, BackendSqlite, BackendSqlServer
+from modules.cache_extraccion import CacheExtraccion
+from modules.configuracion import load_config
+from modules.copiador import copiar_con_reintentos, copiar_en_paralelo
+from modules.diario import DiarioEjecucion
+from modules.indice_origen import IndiceOrigen
+from modules.indice_texto import IndiceTexto, consulta_frase
+from modules.listado_destinos import ListadoDestinos
+from modules.logs import configurar_logging, get_logger, logging_configurado
+from modules.metricas import metricas
+from modules.ocr import PoolOcr, disponible as ocr_disponible
+from modules.progreso import progreso
+
+OCR_PREFIX = "Reconocimiento optico de caracteres:"
+
+log = get_logger("main")
+
+_db_pools = {}      # (servidor, base) -> PoolConexiones
+_db_backends = {}   # (tipo, destino) -> backend
+_db_pool_lock = threading.Lock()
+
+def get_db_pool(config=None):
+    """
+    Pool de conexiones (modules/db_conexion.py) de db_server/db_database,
+    creado en el primer uso y compartido por las ejecuciones del proceso.
+    """
+    if config is None:
+        config = load_config()
+    clave = (config.get("db_server", "sql01"), config.get("db_database", "Gestion"))
+    with _db_pool_lock:
+        if clave not in _db_pools:
+            # pyodbc se importa recién acá: con el backend sqlite o sin procesar nada no se carga
+            from modules.db_conexion import PoolConexiones
+            _db_pools[clave] = PoolConexiones(
+                server=clave[0],
+                database=clave[1],
+                ruta_cache_driver=Path(config["processed_dir"]) / "cache" / "driver_odbc.json",
+                tamano=config.get("db_pool_size", 4),
+                segundos_salud=config.get("db_health_check_seconds", 30)
             )
-            print(f"Conexión exitosa con el driver: {driver}")
-            return conn
-        except pyodbc.Error:
-            print(f"No se pudo conectar con el driver: {driver}. Intentando con el siguiente...")
-            continue
-    raise Exception("No se pudo conectar a la base de datos con ninguno de los drivers disponibles.")
+        return _db_pools[clave]
 
-def load_config():
-    """Carga la configuración desde el archivo JSON"""
-    try:
-        config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.json')
-        with open(config_path, 'r') as f:
-            return json.load(f)
-    except Exception as e:
-        # Si hay un error, devuelve la configuración predeterminada
-        print(f"Error al cargar la configuración: {e}")
-        return {
-            "temp_dir": "C:\\Temp",
-            "processed_dir": "C:\\Temp\\Procesados",
-            "backup_dir": "C:\\Temp\\Procesados\\PDFs_BK",
-            "source_dir": "\\\\fs01\\Resoluciones_Temp",
-            "target_dir": "\\\\fs01\\Resoluciones",
-            "cleanup_days": 60,
-            "progress_steps": [10, 25, 50, 75, 100]
-        }
-
-def copy_files(config=None):
+def cerrar_conexiones():
+    """
+    Cierra las conexiones ociosas de los pools creados en el proceso. Se llama
+    al terminar la CLI o la interfaz; un uso posterior vuelve a conectar.
+    """
+    with _db_pool_lock:
+        pools = list(_db_pools.values())
+    for pool in pools:
+        pool.cerrar_todas()
+    if pools:
+        log.debug("Conexiones ociosas de %d pool(s) cerradas", len(pools))
+
+def get_sqlite_path(config):
+    """
+    Archivo de la réplica con db_backend "sqlite" (db_sqlite_path, por defecto
+    processed_dir/replica/gestion_local.sqlite3). Va en una subcarpeta, como la
+    caché y el índice: cleanup_old_files borra los archivos viejos de
+    processed_dir pero no entra en sus subcarpetas.
+    """
+    return config.get("db_sqlite_path") or Path(config["processed_dir"]) / "replica" / "gestion_local.sqlite3"
+
+def get_db_backend(config=None):
+    """
+    Backend de base de datos elegido con "db_backend" (modules/backend_db.py):
+    "sqlserver" para Gestion en sql01 o "sqlite" para una réplica local en
+    db_sqlite_path. Se crea en el primer uso de cada servidor o archivo, así
+    una configuración distinta en el mismo proceso usa su propio backend.
+    """
+    if config is None:
+        config = load_config()
+    tipo = config.get("db_backend", "sqlserver")
+    if tipo == "sqlserver":
+        clave = (tipo, config.get("db_server", "sql01"), config.get("db_database", "Gestion"))
+    elif tipo == "sqlite":
+        ruta = get_sqlite_path(config)
+        clave = (tipo, os.path.normcase(os.path.abspath(ruta)))
+    else:
+        raise ValueError(f"Backend de base de datos desconocido: '{tipo}' (opciones: {', '.join(BACKENDS)})")
+    with _db_pool_lock:
+        backend = _db_backends.get(clave)
+    if backend is None:
+        backend = BackendSqlServer(get_db_pool(config)) if tipo == "sqlserver" else BackendSqlite(ruta)
+        with _db_pool_lock:
+            backend = _db_backends.setdefault(clave, backend)
+    return backend
+
+def get_db_connection(config=None):
+    """
+    Conexión del backend configurado. Con SQL Server se presta del pool y al
+    llamar a close() vuelve al pool para la próxima ejecución.
+    """
+    return get_db_backend(config).conectar()
+
+@metricas.etapa("copia")
+def copy_files(config=None, excluir=()):
     if config is None:
         config = load_config()
     
@@ -59,35 +117,108 @@ def copy_files(config=None):
     processed_dir = Path(config["processed_dir"])
 
     os.makedirs(dest_dir, exist_ok=True)
-    print(f"Directorio temporal asegurado: {dest_dir}")
+    log.debug("Directorio temporal asegurado: %s", dest_dir)
     os.makedirs(processed_dir, exist_ok=True)
-    print(f"Directorio de procesados asegurado: {processed_dir}")
+    log.debug("Directorio de procesados asegurado: %s", processed_dir)
 
-    print(f"Buscando archivos PDF en: {source_dir}")
-    copied_files = []
-    
+    log.info("Buscando archivos PDF en: %s", source_dir)
     if not source_dir.exists():
-        print(f"Advertencia: El directorio de origen no existe: {source_dir}")
+        log.warning("Advertencia: El directorio de origen no existe: %s", source_dir)
         return []
 
-    for file_path in source_dir.rglob('*.pdf'):
-        if file_path.is_file():
-            try:
-                dest_file = dest_dir / file_path.name
-                print(f"Copiando: {file_path} -> {dest_file}")
-                shutil.copy2(file_path, dest_file)
-                copied_files.append(str(dest_file.resolve()))
-            except Exception as e:
-                print(f"Error al copiar el archivo {file_path}: {e}")
+    copied_files = [str(dest_file.resolve()) for dest_file in iter_copied_files(config, excluir=excluir)]
 
     manifest_path = processed_dir / "last_run_manifest.json"
-    print(f"Guardando manifiesto en: {manifest_path}")
+    log.info("Guardando manifiesto en: %s", manifest_path)
     with open(manifest_path, 'w', encoding='utf-8') as f:
         json.dump(copied_files, f, indent=4)
 
-    print(f"Total de archivos copiados y registrados en manifiesto: {len(copied_files)}")
+    log.info("Total de archivos copiados y registrados en manifiesto: %d", len(copied_files))
     return copied_files
 
+def iter_copied_files(config, rutas_origen=None, excluir=()):
+    """
+    Escanea source_dir y copia a temp_dir los PDFs nuevos o modificados.
+    Genera la ruta temporal de cada archivo a medida que está disponible: primero
+    los que no cambiaron desde la última copia y luego cada copia al terminar.
+    Con rutas_origen se trabaja solo con esos archivos, sin recorrer source_dir;
+    los nombres en excluir se omiten (archivos que ya llegaron a destino). El índice de origen se guarda al agotar el generador.
+    """
+    source_dir = Path(config["source_dir"])
+    dest_dir = Path(config["temp_dir"])
+
+    indice = get_source_index(config)
+    entradas = indice.escanear(source_dir) if rutas_origen is None else _stat_rutas(rutas_origen)
+    copiados = 0
+    sin_cambios = []
+    pendientes = {}
+    for ruta, tamano, mtime_ns in entradas:
+        dest_file = dest_dir / Path(ruta).name
+        if dest_file.name in excluir:
+            continue
+        if indice.sin_cambios(ruta, tamano, mtime_ns, dest_file):
+            sin_cambios.append(dest_file)
+        else:
+            pendientes[ruta] = (tamano, mtime_ns)
+
+    # Si dos archivos de origen tienen el mismo nombre solo se copia el último, como con copias en serie
+    por_destino = {dest_dir / Path(ruta).name: ruta for ruta in pendientes}
+    progreso.publicar(
+        "descubierto", len(sin_cambios) + len(por_destino), sum(pendientes[ruta][0] for ruta in por_destino.values())
+    )
+
+    reutilizados = len(sin_cambios)
+    for dest_file in sin_cambios:
+        log.info("Sin cambios desde la última copia, se reutiliza: %s", dest_file)
+        metricas.sumar("archivos_reutilizados")
+        progreso.publicar("copiado", archivos=(dest_file.name,))
+        yield dest_file
+
+    log.info("Copiando %d archivos con %s hilos...", len(por_destino), config.get('copy_workers', 8))
+    try:
+        for ruta, dest_file, sha256, error in copiar_en_paralelo(
+                [(ruta, dest_file) for dest_file, ruta in por_destino.items()], **get_copy_options(config)):
+            if error is not None:
+                log.error("Error al copiar el archivo %s: %s", ruta, error)
+                progreso.publicar("error_copia", archivos=(dest_file.name,))
+                continue
+            log.info("Copiado: %s -> %s", ruta, dest_file)
+            tamano, mtime_ns = pendientes[ruta]
+            indice.registrar(ruta, tamano, mtime_ns, dest_file, sha256)
+            copiados += 1
+            metricas.sumar("archivos_copiados")
+            metricas.sumar("bytes_copiados", tamano)
+            progreso.publicar("copiado", bytes_=tamano, archivos=(dest_file.name,))
+            yield dest_file
+    finally:
+        indice.guardar()
+    log.info("Archivos nuevos o modificados copiados: %s, sin cambios: %s", copiados, reutilizados)
+
+def _stat_rutas(rutas):
+    """(ruta, tamano, mtime_ns) de cada archivo que todavía existe, como IndiceOrigen.escanear."""
+    entradas = []
+    for ruta in rutas:
+        try:
+            st = os.stat(ruta)
+        except OSError as e:
+            log.warning("Advertencia: no se pudo leer el archivo de origen %s: %s", ruta, e)
+            continue
+        entradas.append((str(ruta), st.st_size, st.st_mtime_ns))
+    return entradas
+
+def get_copy_options(config):
+    """Parámetros del motor de copias (modules/copiador.py) tomados de la configuración."""
+    return {
+        "workers": config.get("copy_workers", 8),
+        "buffer_kb": config.get("copy_buffer_kb", 1024),
+        "verificacion": config.get("copy_verify", "tamano"),
+        "reintentos": config.get("copy_retries", 3),
+    }
+
+def get_source_index(config):
+    """Índice persistente del último escaneo de source_dir (en processed_dir)."""
+    return IndiceOrigen(Path(config["processed_dir"]) / "indice_origen.json")
+
 def load_manifest(config=None):
     """Carga la lista de archivos desde el manifiesto."""
     if config is None:
@@ -97,34 +228,533 @@ def load_manifest(config=None):
     manifest_path = processed_dir / "last_run_manifest.json"
     
     if not manifest_path.exists():
-        print("No se encontró el archivo de manifiesto. No hay archivos para procesar.")
+        log.info("No se encontró el archivo de manifiesto. No hay archivos para procesar.")
         return []
         
     with open(manifest_path, 'r', encoding='utf-8') as f:
         file_paths_str = json.load(f)
         return [Path(p) for p in file_paths_str]
 
-def extract_text_from_pdf(pdf_path):
+def _pdf_reader(contenido):
+    """PdfReader de PyPDF2; el módulo se importa en la primera extracción, no al cargar main."""
+    import PyPDF2
+    return PyPDF2.PdfReader(contenido)
+
+def iter_pdf_pages(pdf_path):
+    """
+    Genera (numero_pagina, total_paginas, texto) página por página. El archivo se
+    abre con mmap, así el sistema operativo pagina el contenido bajo demanda en
+    lugar de cargar el PDF entero en memoria.
+    """
+    with open(pdf_path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as contenido:
+        reader = _pdf_reader(contenido)
+        total_pages = len(reader.pages)
+        for i in range(total_pages):
+            yield i + 1, total_pages, reader.pages[i].extract_text() or ''
+
+def extract_text_from_pdf(pdf_path, max_chars=0, ocr=None):
+    """
+    Extrae el texto de un PDF acumulando las páginas en una lista (sin concatenar
+    strings en cada página). Con max_chars > 0 deja de leer páginas en cuanto
+    alcanza ese largo y devuelve el texto recortado. Con ocr (un PoolOcr) las
+    páginas sin capa de texto se reconocen con Tesseract en ese pool.
+    """
+    inicio = time.perf_counter()
+    partes = _extract_pages(pdf_path, max_chars)
+    _record_extraction(len(partes), time.perf_counter() - inicio)
+    if ocr is not None:
+        futuros = _enviar_paginas_a_ocr(ocr, pdf_path, partes)
+        _aplicar_ocr(pdf_path, partes, futuros)
+    return _unir_paginas(partes, max_chars)
+
+def _extract_text_measured(pdf_path, max_chars=0, por_pagina=False):
+    """
+    Versión de extract_text_from_pdf para el pool de procesos: devuelve
+    (texto, paginas_leidas, segundos) para registrar las métricas en el proceso
+    principal. Con por_pagina el texto es la lista de textos de cada página.
+    """
+    inicio = time.perf_counter()
+    partes = _extract_pages(pdf_path, max_chars)
+    texto = partes if por_pagina else _unir_paginas(partes, max_chars)
+    return texto, len(partes), time.perf_counter() - inicio
+
+def _unir_paginas(partes, max_chars=0):
+    text = ''.join(partes).strip()
+    if max_chars:
+        text = text[:max_chars]
+    log.debug("Extracción completada: %d caracteres totales", len(text))
+    return text
+
+def _paginas_hasta_maximo(paginas, max_chars=0):
+    """
+    Toma páginas de paginas (un iterable de textos) hasta que el texto acumulado
+    alcanza max_chars (0 = todas). La extracción secuencial deja de leer ahí y
+    la repartida por rangos descarta lo que sigue antes del OCR y de unirlas.
+    """
+    partes = []
+    acumulados = 0
+    for texto in paginas:
+        partes.append(texto)
+        acumulados += len(texto)
+        if max_chars and acumulados >= max_chars:
+            log.debug("Se alcanzó el máximo de %d caracteres; se descartan las páginas restantes", max_chars)
+            break
+    return partes
+
+def _extract_pages(pdf_path, max_chars=0):
+    """Textos de cada página leída (la capa de texto, vacía en las páginas escaneadas)."""
+    def paginas():
+        for numero, total_pages, page_text in iter_pdf_pages(pdf_path):
+            if numero == 1:
+                log.debug("El PDF tiene %d páginas", total_pages)
+            log.debug("Página %d/%d: %d caracteres extraídos", numero, total_pages, len(page_text))
+            yield page_text
+
     try:
-        print(f"Extrayendo texto del PDF: {pdf_path}")
-        with open(pdf_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            text = ''
-            total_pages = len(reader.pages)
-            print(f"El PDF tiene {total_pages} páginas")
-            
-            for i, page in enumerate(reader.pages):
-                page_text = page.extract_text() or ''
-                text += page_text
-                print(f"Página {i+1}/{total_pages}: {len(page_text)} caracteres extraídos")
-                
-        text_length = len(text.strip())
-        print(f"Extracción completada: {text_length} caracteres totales")
-        return text.strip()
+        log.debug("Extrayendo texto del PDF: %s", pdf_path)
+        return _paginas_hasta_maximo(paginas(), max_chars)
     except Exception as e:
-        print(f"Error al leer el archivo PDF {pdf_path}: {e}")
+        log.error("Error al leer el archivo PDF %s: %s", pdf_path, e)
         raise Exception(f"Error al leer el archivo PDF {pdf_path}: {e}")
 
+def _record_extraction(paginas, segundos):
+    metricas.sumar("pdfs_extraidos")
+    metricas.sumar("paginas_extraidas", paginas)
+    metricas.observar("extraccion_pdf", segundos)
+
+def extract_page_range(pdf_path, inicio, fin, por_pagina=False):
+    """
+    Extrae el texto de las páginas [inicio, fin) de un PDF (una porción de un
+    documento grande). Con por_pagina devuelve la lista de textos de cada página.
+    """
+    try:
+        with open(pdf_path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as contenido:
+            reader = _pdf_reader(contenido)
+            partes = [reader.pages[i].extract_text() or '' for i in range(inicio, fin)]
+        log.debug("Páginas %d-%d de %s: %d caracteres extraídos", inicio + 1, fin, Path(pdf_path).name, sum(len(p) for p in partes))
+        return partes if por_pagina else ''.join(partes)
+    except Exception as e:
+        log.error("Error al leer las páginas %s-%s del PDF %s: %s", inicio + 1, fin, pdf_path, e)
+        raise Exception(f"Error al leer las páginas {inicio + 1}-{fin} del PDF {pdf_path}: {e}")
+
+def get_page_split(pdf_path, config, workers):
+    """
+    Decide si un PDF es candidato a repartirse por páginas entre varios
+    procesos: devuelve (page_split_threshold, workers) para archivos de al
+    menos page_split_min_mb, o None si se extrae entero. Solo mira el tamaño;
+    las páginas las cuenta un proceso del pool (submit_pdf_extraction), no el
+    proceso principal.
+    """
+    umbral = int(config.get("page_split_threshold", 200) or 0)
+    if not umbral or workers <= 1:
+        return None
+    try:
+        if os.path.getsize(pdf_path) < float(config.get("page_split_min_mb", 1)) * 1024 * 1024:
+            return None
+    except OSError:
+        # Si no se puede leer, la extracción normal informará el error
+        return None
+    return umbral, workers
+
+def count_pdf_pages(pdf_path):
+    """Cantidad de páginas de un PDF. Corre en un proceso del pool de extracción."""
+    with open(pdf_path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as contenido:
+        return len(_pdf_reader(contenido).pages)
+
+def _page_ranges(pdf_path, total_pages, umbral, workers):
+    """Rangos (inicio, fin) en que se reparte un PDF de total_pages páginas, o None si no supera el umbral."""
+    if total_pages <= umbral:
+        return None
+    paginas_por_parte = -(-total_pages // workers)
+    rangos = [(inicio, min(inicio + paginas_por_parte, total_pages)) for inicio in range(0, total_pages, paginas_por_parte)]
+    log.info("%s tiene %s páginas: se reparte en %d partes", Path(pdf_path).name, total_pages, len(rangos))
+    return rangos
+
+def submit_pdf_extraction(executor, pdf_path, max_chars=0, reparto=None, ocr=None):
+    """
+    Envía la extracción de un PDF al pool. Sin reparto (ver get_page_split) es
+    un solo trabajo. Con reparto, un proceso del pool cuenta las páginas y, si
+    superan el umbral, se envía una porción por rango; el futuro devuelto se
+    resuelve con el texto reensamblado en orden cuando terminan todas. Con ocr
+    (un PoolOcr) las páginas que vuelven sin capa de texto se envían a ese pool
+    y el futuro se resuelve cuando terminan; el resto de los PDFs sigue sin
+    esperarlas. Las métricas de la extracción se registran aquí, en el proceso
+    principal.
+    """
+    enviado = time.perf_counter()
+    if not reparto:
+        return _submit_ranges(executor, pdf_path, max_chars, None, ocr, enviado)
+
+    combinado = Future()
+    combinado.set_running_or_notify_cancel()
+    conteo = executor.submit(count_pdf_pages, pdf_path)
+
+    def al_contar(_):
+        try:
+            rangos = _page_ranges(pdf_path, conteo.result(), *reparto)
+        except Exception:
+            # Si no se puede contar, la extracción del PDF entero informará el error
+            rangos = None
+        try:
+            extraccion = _submit_ranges(executor, pdf_path, max_chars, rangos, ocr, enviado)
+        except Exception as e:
+            # Por ejemplo, el pool ya se cerró tras un error en otra etapa
+            combinado.set_exception(e)
+            return
+        extraccion.add_done_callback(al_extraer)
+
+    def al_extraer(extraccion):
+        if extraccion.exception() is not None:
+            combinado.set_exception(extraccion.exception())
+        else:
+            combinado.set_result(extraccion.result())
+
+    conteo.add_done_callback(al_contar)
+    return combinado
+
+def _submit_ranges(executor, pdf_path, max_chars, rangos, ocr, enviado):
+    """
+    Envía la extracción de un PDF entero o de sus rangos de páginas (ver
+    submit_pdf_extraction). Los rangos se extraen por página y, al unirlos,
+    se aplica max_chars igual que en la extracción secuencial: las páginas
+    posteriores al máximo no pasan por OCR ni llegan al texto.
+    """
+    por_pagina = ocr is not None
+    if not rangos:
+        partes = [executor.submit(_extract_text_measured, pdf_path, max_chars, por_pagina)]
+    else:
+        partes = [executor.submit(extract_page_range, pdf_path, inicio, fin, True) for inicio, fin in rangos]
+    combinado = Future()
+    # En ejecución desde ya: cancelar la espera (p. ej. un timeout de asyncio) no deja el resultado a medio asignar
+    combinado.set_running_or_notify_cancel()
+
+    def al_terminar_extraccion():
+        try:
+            if not rangos:
+                texto, paginas, segundos = partes[0].result()
+            else:
+                resultados = [parte.result() for parte in partes]
+                texto = _paginas_hasta_maximo((pagina for resultado in resultados for pagina in resultado), max_chars)
+                if not por_pagina:
+                    texto = _unir_paginas(texto, max_chars)
+                paginas = sum(fin - inicio for inicio, fin in rangos)
+                segundos = time.perf_counter() - enviado
+        except Exception as e:
+            combinado.set_exception(e)
+            return
+        _record_extraction(paginas, segundos)
+        if not por_pagina:
+            # Sin rangos, _extract_text_measured ya devuelve el texto unido y recortado
+            combinado.set_result(texto)
+            return
+
+        futuros = _enviar_paginas_a_ocr(ocr, pdf_path, texto)
+
+        def al_terminar_ocr():
+            _aplicar_ocr(pdf_path, texto, futuros)
+            combinado.set_result(_unir_paginas(texto, max_chars))
+        _al_terminar_todos(list(futuros.values()), al_terminar_ocr)
+
+    _al_terminar_todos(partes, al_terminar_extraccion)
+    return combinado
+
+def _al_terminar_todos(futuros, callback):
+    """Llama a callback() una sola vez, cuando terminaron todos los futuros (en el hilo del último)."""
+    if not futuros:
+        callback()
+        return
+    pendientes = [len(futuros)]
+    lock = threading.Lock()
+
+    def al_terminar(_):
+        with lock:
+            pendientes[0] -= 1
+            if pendientes[0]:
+                return
+        callback()
+
+    for futuro in futuros:
+        futuro.add_done_callback(al_terminar)
+
+def _enviar_paginas_a_ocr(ocr, pdf_path, partes):
+    """Envía al pool de OCR solo las páginas sin capa de texto. Devuelve {índice de página: futuro}."""
+    futuros = {}
+    for indice, texto in enumerate(partes):
+        if texto.strip():
+            continue
+        try:
+            futuros[indice] = ocr.enviar(pdf_path, indice)
+        except RuntimeError as e:
+            # Pool ya cerrado (ejecución cancelada): la página queda con la capa de texto vacía
+            log.warning("Advertencia: no se pudo enviar a OCR la página %s de %s: %s", indice + 1, Path(pdf_path).name, e)
+            break
+    if futuros:
+        log.info("%s: %d páginas sin capa de texto se envían a OCR", Path(pdf_path).name, len(futuros))
+    return futuros
+
+def _aplicar_ocr(pdf_path, partes, futuros):
+    """
+    Completa en partes el texto reconocido de cada página enviada a OCR. Un
+    error de OCR deja la página vacía, sin hacer fallar al PDF entero.
+    """
+    for indice, futuro in futuros.items():
+        try:
+            texto, segundos, omitida = futuro.result()
+        except Exception as e:
+            log.warning("Advertencia: falló el OCR de la página %s de %s: %s", indice + 1, Path(pdf_path).name, e)
+            metricas.sumar("paginas_ocr_con_error")
+            continue
+        if omitida:
+            log.warning("Advertencia: la página %d de %s no tiene imágenes que se puedan decodificar "
+                        "(CCITT/JBIG2); se omite del OCR. Instale pypdfium2 para renderizarla.",
+                        indice + 1, Path(pdf_path).name)
+            metricas.sumar("paginas_ocr_omitidas")
+            continue
+        # Tesseract devuelve el texto sin saltos en los bordes: la página reconocida va en
+        # sus propias líneas para no pegar palabras con la anterior ni con la siguiente
+        partes[indice] = f"\n{texto}\n" if texto else texto
+        metricas.sumar("paginas_ocr")
+        metricas.observar("ocr_pagina", segundos)
+        log.debug("OCR de la página %d de %s: %d caracteres", indice + 1, Path(pdf_path).name, len(texto))
+
+def get_extract_max_chars(config):
+    """
+    Largo máximo del texto extraído (0 = sin límite). extracto_max_chars es el
+    tamaño de la columna Maestro.extracto, que también guarda el prefijo de OCR.
+    """
+    max_chars = int(config.get("extracto_max_chars", 0) or 0)
+    if not max_chars:
+        return 0
+    return max(1, max_chars - len(OCR_PREFIX) - 1)
+
+def get_extraction_workers(config):
+    """Cantidad de procesos para la extracción de texto (0 o ausente = uno por núcleo)."""
+    workers = config.get("extraction_workers", 0) or os.cpu_count() or 1
+    return max(1, int(workers))
+
+def ocr_enabled(config):
+    """OCR de páginas escaneadas: ocr_enabled en true y Tesseract disponible (ver modules/ocr.py)."""
+    return bool(config.get("ocr_enabled", True)) and ocr_disponible()
+
+def open_ocr_pool(config):
+    """
+    Pool de OCR para las páginas sin capa de texto, con ocr_workers procesos y
+    la caché de páginas en processed_dir/cache/paginas, o None si el OCR no
+    está habilitado o disponible.
+    """
+    if not ocr_enabled(config):
+        return None
+    dir_cache = Path(config["processed_dir"]) / "cache" / "paginas" if config.get("ocr_page_cache", True) else None
+    return PoolOcr(config.get("ocr_workers", 2), config.get("ocr_language", "spa"), dir_cache)
+
+def open_extraction_cache(config):
+    """Abre la caché de textos extraídos en processed_dir, o devuelve None si está deshabilitada."""
+    if not config.get("extraction_cache", True):
+        return None
+    ruta_db = Path(config["processed_dir"]) / "cache" / "extraccion.sqlite3"
+    # Un texto recortado solo sirve para el mismo límite de caracteres, y uno sin OCR no sirve con OCR
+    variante = ":".join(filter(None, (str(get_extract_max_chars(config) or ""), "ocr" if ocr_enabled(config) else "")))
+    return CacheExtraccion(
+        ruta_db,
+        dias_retencion=config.get("cleanup_days", 60),
+        max_mb=config.get("extraction_cache_max_mb", 512),
+        variante=variante or None
+    )
+
+def open_text_index(config):
+    """
+    Abre el índice de búsqueda de texto (search_index_path, por defecto
+    processed_dir/indice/resoluciones.sqlite3), o devuelve None si está
+    deshabilitado o si este SQLite no tiene FTS5.
+    """
+    if not config.get("search_index", True):
+        return None
+    ruta_db = config.get("search_index_path") or Path(config["processed_dir"]) / "indice" / "resoluciones.sqlite3"
+    try:
+        return IndiceTexto(ruta_db)
+    except sqlite3.Error as e:
+        log.warning("Advertencia: no se pudo abrir el índice de búsqueda %s: %s", ruta_db, e)
+        return None
+
+def update_text_index(registros, config):
+    """
+    Agrega al índice de búsqueda los textos (letra, actuacion, ejercicio, texto)
+    recién escritos en Maestro. Un error en el índice no frena el proceso: el
+    expediente se vuelve a indexar la próxima vez que se procese.
+    """
+    indice = open_text_index(config)
+    if indice is None or not registros:
+        return
+    try:
+        with indice, metricas.etapa("indice_busqueda"):
+            indexados = indice.actualizar(registros)
+        metricas.sumar("textos_indexados", indexados)
+        log.debug("Índice de búsqueda: %d textos nuevos o modificados", indexados)
+    except sqlite3.Error as e:
+        log.warning("Advertencia: no se pudo actualizar el índice de búsqueda: %s", e)
+
+def buscar_resoluciones(consulta, config=None, limite=20, ejercicio=None, letra=None, frase=False):
+    """
+    Busca en el índice local el texto de las resoluciones ya procesadas (ver
+    IndiceTexto.buscar). Con frase=True la consulta se toma literal, como frase
+    exacta. Devuelve la lista de resultados, vacía si el índice no existe.
+    """
+    if config is None:
+        config = load_config()
+    indice = open_text_index(config)
+    if indice is None:
+        return []
+    with indice:
+        return indice.buscar(consulta_frase(consulta) if frase else consulta, limite, ejercicio, letra)
+
+def contar_resoluciones_indexadas(config=None):
+    """Cantidad de expedientes en el índice local de búsqueda (0 si está deshabilitado)."""
+    if config is None:
+        config = load_config()
+    indice = open_text_index(config)
+    if indice is None:
+        return 0
+    with indice:
+        return indice.cantidad()
+
+def extract_texts_in_parallel(pdf_paths, config=None):
+    """
+    Extrae el texto de varios PDFs repartiendo el trabajo en un pool de procesos.
+    Genera tuplas (pdf_path, texto, error) a medida que cada archivo termina;
+    un error en un PDF no interrumpe la extracción del resto. Los PDFs cuyo
+    contenido ya está en la caché de extracción se devuelven sin pasar por PyPDF2.
+    """
+    if config is None:
+        config = load_config()
+
+    cache = open_extraction_cache(config)
+    try:
+        pendientes = {}
+        for pdf_path in pdf_paths:
+            try:
+                sha256, texto = _resolver_desde_cache(cache, pdf_path)
+            except OSError as e:
+                yield pdf_path, None, e
+                continue
+            if texto is not None:
+                yield pdf_path, texto, None
+            else:
+                pendientes[pdf_path] = sha256
+
+        for pdf_path, texto, error in _extract_texts_with_pool(list(pendientes), config):
+            _guardar_en_cache(cache, pendientes[pdf_path], texto)
+            yield pdf_path, texto, error
+    finally:
+        if cache is not None:
+            cache.cerrar()
+
+def _resolver_desde_cache(cache, pdf_path):
+    """
+    Busca el texto de un PDF en la caché de extracción (común a los tres modos).
+    Devuelve (sha256, texto): texto es None si no está o no hay caché, y sha256
+    sirve para guardarlo después con _guardar_en_cache. Un error al leer el
+    archivo se propaga.
+    """
+    if cache is None:
+        return None, None
+    sha256 = CacheExtraccion.hash_archivo(pdf_path)
+    texto = cache.obtener(sha256)
+    if texto is not None:
+        log.info("Texto obtenido de la caché de extracción: %s", Path(pdf_path).name)
+        metricas.sumar("extraccion_cache_aciertos")
+    return sha256, texto
+
+def _guardar_en_cache(cache, sha256, texto):
+    """Guarda en la caché de extracción un texto recién extraído (sin caché, sin hash o sin texto no hace nada)."""
+    if cache is not None and sha256 and texto is not None:
+        cache.guardar(sha256, texto)
+
+def _extract_texts_with_pool(pdf_paths, config):
+    """Extrae el texto de los PDFs en un ProcessPoolExecutor (o en serie si hay un solo proceso)."""
+    max_chars = get_extract_max_chars(config)
+    # Con un solo PDF el pool igual se usa si hay que repartirlo por páginas
+    workers = get_extraction_workers(config)
+
+    if not pdf_paths:
+        return
+    ocr = open_ocr_pool(config)
+    try:
+        if workers <= 1:
+            for pdf_path in pdf_paths:
+                try:
+                    yield pdf_path, extract_text_from_pdf(pdf_path, max_chars, ocr), None
+                except Exception as e:
+                    yield pdf_path, None, e
+            return
+
+        log.info("Extrayendo texto de %d PDFs con %s procesos en paralelo...", len(pdf_paths), workers)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                submit_pdf_extraction(executor, pdf_path, max_chars, get_page_split(pdf_path, config, workers), ocr): pdf_path
+                for pdf_path in pdf_paths
+            }
+            for future in as_completed(futures):
+                pdf_path = futures[future]
+                try:
+                    yield pdf_path, future.result(), None
+                except Exception as e:
+                    yield pdf_path, None, e
+    finally:
+        if ocr is not None:
+            ocr.cerrar()
+
+def validate_file(file_path, backup_dir, current_year=None):
+    """
+    Valida la nomenclatura <Letra>-<Actuacion>-<Ejercicio>.pdf de un archivo.
+    Devuelve (registro, razon): registro es la tupla (letra, actuacion, ejercicio, file)
+    si el archivo es válido y razon el motivo si no lo es. Los archivos que están
+    dentro del backup se omiten y devuelven (None, None).
+    """
+    if current_year is None:
+        current_year = datetime.now().year
+    file = file_path.name
+    log.debug("Analizando archivo: %s", file)
+
+    # Assert defensivo para excluir archivos del backup
+    if backup_dir in file_path.parents:
+        log.warning("Advertencia: Se omitió el archivo '%s' porque está en el directorio de backup.", file)
+        progreso.publicar("invalido", archivos=(file,))
+        return None, None
+
+    file_without_extension = file_path.stem
+    parts = file_without_extension.split('-')
+    if len(parts) != 3:
+        razon = f"formato incorrecto, se esperaban 3 partes separadas por '-' pero se encontraron {len(parts)} ('{file_without_extension}')"
+        log.warning("[NOMENCLATURA INVÁLIDA] Archivo ignorado: '%s' — %s", file, razon)
+        metricas.sumar("archivos_invalidos")
+        progreso.publicar("invalido", archivos=(file,))
+        return None, razon
+
+    letra, actuacion, ejercicio = parts
+
+    # Validar letra: debe ser un único dígito numérico
+    if not (len(letra) == 1 and letra.isdigit()):
+        razon = f"letra inválida ('{letra}') — debe ser un único dígito numérico (ej: 1, 2, 3)"
+    # Validar ejercicio
+    elif not (ejercicio.isdigit() and int(ejercicio) <= current_year):
+        razon = f"ejercicio inválido ('{ejercicio}' no es un año válido)"
+    # Validar actuacion: debe ser numérico y tener exactamente 6 dígitos
+    elif not actuacion.isdigit():
+        razon = f"número de actuación no es numérico ('{actuacion}')"
+    elif len(actuacion) != 6:
+        razon = f"número de actuación tiene {len(actuacion)} dígitos en lugar de 6 ('{actuacion}') — ¿falta un cero?"
+    else:
+        log.info("Archivo válido: Letra=%s, Actuación=%s, Ejercicio=%s", letra, actuacion, ejercicio)
+        metricas.sumar("archivos_validos")
+        progreso.publicar("validado", archivos=(file,))
+        return (letra, actuacion, ejercicio, file), None
+
+    log.warning("[NOMENCLATURA INVÁLIDA] Archivo ignorado: '%s' — %s", file, razon)
+    metricas.sumar("archivos_invalidos")
+    progreso.publicar("invalido", archivos=(file,))
+    return None, razon
+
+@metricas.etapa("validacion")
 def process_files(files_to_process, config=None):
     if config is None:
         config = load_config()
@@ -134,168 +764,104 @@ def process_files(files_to_process, config=None):
     invalid_files = []
     current_year = datetime.now().year
     
-    print(f"Procesando {len(files_to_process)} archivos desde el manifiesto.")
+    log.info("Procesando %d archivos desde el manifiesto.", len(files_to_process))
     
     for file_path in files_to_process:
-        file = file_path.name
-        print(f"Analizando archivo: {file}")
-
-        # Assert defensivo para excluir archivos del backup
-        if backup_dir in file_path.parents:
-            print(f"Advertencia: Se omitió el archivo '{file}' porque está en el directorio de backup.")
-            continue
-
-        file_without_extension = file_path.stem
-        parts = file_without_extension.split('-')
-        if len(parts) == 3:
-            letra, actuacion, ejercicio = parts
+        registro, razon = validate_file(file_path, backup_dir, current_year)
+        if registro is not None:
+            processed_files.append(registro)
+        elif razon is not None:
+            invalid_files.append((file_path.name, razon))
 
-            # Validar letra: debe ser un único dígito numérico
-            if not (len(letra) == 1 and letra.isdigit()):
-                razon = f"letra inválida ('{letra}') — debe ser un único dígito numérico (ej: 1, 2, 3)"
-                print(f"[NOMENCLATURA INVÁLIDA] Archivo ignorado: '{file}' — {razon}")
-                invalid_files.append((file, razon))
-                continue
-
-            # Validar ejercicio
-            if not (ejercicio.isdigit() and int(ejercicio) <= current_year):
-                razon = f"ejercicio inválido ('{ejercicio}' no es un año válido)"
-                print(f"[NOMENCLATURA INVÁLIDA] Archivo ignorado: '{file}' — {razon}")
-                invalid_files.append((file, razon))
-                continue
-
-            # Validar actuacion: debe ser numérico y tener exactamente 6 dígitos
-            if not actuacion.isdigit():
-                razon = f"número de actuación no es numérico ('{actuacion}')"
-                print(f"[NOMENCLATURA INVÁLIDA] Archivo ignorado: '{file}' — {razon}")
-                invalid_files.append((file, razon))
-                continue
-            if len(actuacion) != 6:
-                razon = f"número de actuación tiene {len(actuacion)} dígitos en lugar de 6 ('{actuacion}') — ¿falta un cero?"
-                print(f"[NOMENCLATURA INVÁLIDA] Archivo ignorado: '{file}' — {razon}")
-                invalid_files.append((file, razon))
-                continue
-
-            print(f"Archivo válido: Letra={letra}, Actuación={actuacion}, Ejercicio={ejercicio}")
-            processed_files.append((letra, actuacion, ejercicio, file))
-        else:
-            razon = f"formato incorrecto, se esperaban 3 partes separadas por '-' pero se encontraron {len(parts)} ('{file_without_extension}')"
-            print(f"[NOMENCLATURA INVÁLIDA] Archivo ignorado: '{file}' — {razon}")
-            invalid_files.append((file, razon))
-
-    print(f"Total archivos válidos: {len(processed_files)}")
-    print(f"Total archivos inválidos: {len(invalid_files)}")
+    log.info("Total archivos válidos: %d", len(processed_files))
+    log.info("Total archivos inválidos: %d", len(invalid_files))
     
     return processed_files, invalid_files
 
+def get_db_batch_size(config):
+    """Cantidad de filas por lote en las cargas masivas con fast_executemany."""
+    return max(1, int(config.get("db_batch_size", 1000)))
+
 def insert_and_update_db(processed_files, config=None):
     if config is None:
         config = load_config()
         
-    print("Iniciando conexión con la base de datos...")
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    print("Limpiando tablas temporales...")
-    cursor.execute("TRUNCATE TABLE gestion..Wilson")
-    cursor.execute("TRUNCATE TABLE gestion..Wilson2")
-    conn.commit()
-    print("Tablas temporales limpiadas correctamente.")
-
-    print("Insertando registros en tabla Wilson...")
-    for letra, actuacion, ejercicio, file in processed_files:
-        archivo = f'{letra}-{actuacion}-{ejercicio}.pdf'
-        print(f"Insertando archivo: {archivo}")
-        cursor.execute("INSERT INTO gestion..Wilson (archivo) VALUES (?)", (archivo,))
-    conn.commit()
-    print("Registros insertados en tabla Wilson correctamente.")
-
-    print("Procesando datos para tabla Wilson2...")
-    cursor.execute("""
-        INSERT INTO Wilson2 (Letra, actuacion, ejercicio)
-        SELECT 
-            SUBSTRING(archivo, 1, 1),
-            SUBSTRING(archivo, 3, 6),
-            SUBSTRING(archivo, 10, 4)
-        FROM Wilson
-    """)
-    conn.commit()
-    print("Datos procesados y almacenados en tabla Wilson2 correctamente.")
-
-    print("Actualizando tabla Maestro con nuevos registros...")
-    cursor.execute("""
-        INSERT INTO [Gestion].[dbo].[Maestro]
-        ([Boca],[letra],[actuacion],[ejercicio],[apeynom],[extracto],[fech_alta],[estado],[folio],[origen_nomenc],[Subtramite])
-        SELECT 
-            2, a.Letra, a.Actuacion, a.Ejercicio,
-            CASE 
-                WHEN a.Letra = '1' THEN 'RESOLUCION DE PRESIDENCIA' 
-                WHEN a.Letra = '2' THEN 'RESOLUCION DE DIRECTORIO' 
-                ELSE 'DISPOSICION DE JUBILACIONES' 
-            END,
-            'Reconocimiento optico de caracteres: ', GETDATE(), 'N', 1, 100180, 900999
-        FROM Wilson2 a
-        WHERE NOT EXISTS (
-            SELECT 1 FROM gestion..Maestro b
-            WHERE b.letra = a.letra AND b.actuacion = a.actuacion AND b.ejercicio = a.ejercicio
-        )
-    """)
-    conn.commit()
-    print("Tabla Maestro actualizada correctamente.")
+    log.info("Iniciando conexión con la base de datos...")
+    conn = get_db_connection(config)
+    batch_size = get_db_batch_size(config)
 
-    print("Extrayendo texto de los PDFs y actualizando registros...")
-    total_actualizados = 0
-    temp_dir = Path(config["temp_dir"])
-    for letra, actuacion, ejercicio, file in processed_files:
-        pdf_path = temp_dir / file
-        print(f"Procesando texto del PDF: {pdf_path}")
-        try:
-            extracted_text = extract_text_from_pdf(pdf_path)
-            print(f"Texto extraído correctamente. Actualizando registro...")
-            updated = update_record(letra, actuacion, ejercicio, extracted_text, conn)
-            if updated:
-                total_actualizados += 1
-        except Exception as e:
-            print(f"Error al procesar {pdf_path}: {e}")
-    
-    print(f"Proceso de extracción y actualización completado. Total actualizados: {total_actualizados}")
-    cursor.close()
-    conn.close()
-    print("Conexión con la base de datos cerrada.")
-
-def update_record(letra, actuacion, ejercicio, extracted_text, connection):
-    cursor = connection.cursor()
-    print(f"Buscando registro para actualizar: letra={letra}, actuacion={actuacion}, ejercicio={ejercicio}")
-    
-    cursor.execute("""
-        SELECT extracto FROM Maestro
-        WHERE letra = ? AND actuacion = ? AND ejercicio = ?
-    """, letra, actuacion, ejercicio)
-
-    rows = cursor.fetchall()
-    if rows:
-        print(f"Se encontraron {len(rows)} registros para actualizar")
-        actualizados = 0
-        for row in rows:
-            extracto = row[0] or ''
-            if 'Reconocimiento optico de caracteres:' in extracto:
-                new_extracto = f"{extracto.strip()} {extracted_text}"
-            else:
-                new_extracto = f"Reconocimiento optico de caracteres: {extracted_text}"
-
-            print(f"Actualizando extracto del registro...")
-            cursor.execute("""
-                UPDATE Maestro SET extracto = ?
-                WHERE letra = ? AND actuacion = ? AND ejercicio = ?
-            """, new_extracto, letra, actuacion, ejercicio)
-            connection.commit()
-            actualizados += 1
-        
-        print(f"Total de registros actualizados: {actualizados}")
-        return actualizados > 0
-    else:
-        print(f"No se encontraron registros para actualizar")
-        return False
+    try:
+        log.info("Extrayendo texto de los PDFs...")
+        temp_dir = Path(config["temp_dir"])
+        registro_por_pdf = {temp_dir / registro[3]: registro for registro in processed_files}
+        textos = {}
+        with metricas.etapa("extraccion"):
+            for pdf_path, extracted_text, error in extract_texts_in_parallel(registro_por_pdf, config):
+                if error is not None:
+                    log.error("Error al procesar %s: %s", pdf_path, error)
+                    progreso.publicar("error_extraccion", archivos=(pdf_path.name,))
+                    continue
+                progreso.publicar("extraido", archivos=(pdf_path.name,))
+                log.info("Texto extraído correctamente de %s", pdf_path.name)
+                textos[pdf_path] = extracted_text
+
+        # Los archivos sin texto se dan de alta igual: su extracto queda como estaba
+        lote = [(registro, textos.get(pdf_path)) for pdf_path, registro in registro_por_pdf.items()]
+        total_actualizados = _escribir_microlote(lote, conn, batch_size, config)
+    finally:
+        conn.close()
+        log.info("Conexión con la base de datos cerrada.")
+
+    log.info("Proceso de extracción y actualización completado. Total actualizados: %s", total_actualizados)
+
+def _escribir_microlote(lote, conn, batch_size, config):
+    """
+    Escritura en Maestro común a los tres modos para una lista de (registro,
+    texto): alta en Wilson, Wilson2 y Maestro de todos y actualización del
+    extracto de los que tienen texto (None = la extracción falló). Publica
+    "escrito", que también lo anota en el diario de la ejecución, solo para
+    los archivos cuyo extracto se escribió; el resto recibe "error_escritura"
+    y al reanudar se vuelve a extraer. Devuelve la cantidad de extractos
+    actualizados.
+    """
+    log.info("Escribiendo microlote de %d archivos en Maestro...", len(lote))
+    register_in_maestro([registro for registro, _ in lote], conn, batch_size, config)
+    con_texto = [registro for registro, texto in lote if texto is not None]
+    sin_texto = [registro[3] for registro, texto in lote if texto is None]
+    actualizados = update_records_bulk(
+        [(*registro[:3], texto) for registro, texto in lote if texto is not None], conn, batch_size, config
+    )
+    if con_texto:
+        progreso.publicar("escrito", len(con_texto), archivos=[registro[3] for registro in con_texto])
+    if sin_texto:
+        log.warning("Advertencia: %d archivos sin texto extraído; su extracto en Maestro no se actualizó.", len(sin_texto))
+        progreso.publicar("error_escritura", len(sin_texto), archivos=sin_texto)
+    return actualizados
+
+def register_in_maestro(processed_files, connection, batch_size=1000, config=None):
+    """
+    Carga los archivos en Wilson y Wilson2 y da de alta en Maestro los expedientes
+    que todavía no existen, en una única transacción del backend configurado.
+    """
+    with metricas.etapa("base_de_datos"):
+        altas = get_db_backend(config).registrar_en_maestro(connection, processed_files, batch_size)
+    metricas.sumar("filas_wilson_insertadas", len(processed_files))
+    metricas.sumar("filas_maestro_insertadas", max(0, altas or 0))
+    return altas
+
+def update_records_bulk(registros, connection, batch_size=1000, config=None):
+    """
+    Actualiza el extracto de Maestro para una lista de tuplas
+    (letra, actuacion, ejercicio, texto) en una única transacción del backend
+    configurado y, con config, los agrega al índice de búsqueda local.
+    Devuelve la cantidad de filas actualizadas.
+    """
+    with metricas.etapa("base_de_datos"):
+        actualizados = get_db_backend(config).actualizar_extractos(connection, registros, batch_size)
+    metricas.sumar("filas_maestro_actualizadas", max(0, actualizados or 0))
+    if config is not None:
+        update_text_index(registros, config)
+    return actualizados
 
 def get_alternative_path(destination_path):
     """Genera un nombre de archivo alternativo si el destino ya existe."""
@@ -311,103 +877,169 @@ def get_alternative_path(destination_path):
         new_stem = f"{stem}_{counter}"
         new_path = parent / f"{new_stem}{ext}"
         if not new_path.exists():
-            print(f"Destino ocupado → usando nombre alternativo para el archivo nuevo: {new_path.name}")
+            log.warning("Destino ocupado → usando nombre alternativo para el archivo nuevo: %s", new_path.name)
             return new_path
         counter += 1
 
-def clean_and_move_files(processed_files, invalid_files=None, config=None):
+@metricas.etapa("movimiento")
+def clean_and_move_files(processed_files, invalid_files=None, config=None, rutas_origen=None, ya_movidos=()):
+    """
+    Mueve a backup y copia a destino final los archivos procesados, de a
+    copy_workers a la vez, y limpia temp_dir y el origen (_cerrar_movimientos).
+    Devuelve la ruta del registro de movimientos.
+    """
     if config is None:
         config = load_config()
     if invalid_files is None:
         invalid_files = []
-        
-    target_dir = Path(config["target_dir"])
-    processed_dir = Path(config["processed_dir"])
-    backup_dir = Path(config["backup_dir"])
-    temp_dir = Path(config["temp_dir"])
-    
-    print(f"Preparando directorios para mover archivos procesados...")
-    os.makedirs(processed_dir, exist_ok=True)
-    os.makedirs(backup_dir, exist_ok=True)
-    print(f"Directorios creados: {processed_dir}, {backup_dir}")
+    opciones = get_copy_options(config)
+    destinos = ListadoDestinos()
+    os.makedirs(config["processed_dir"], exist_ok=True)
+    os.makedirs(config["backup_dir"], exist_ok=True)
 
-    timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
-    registro_path = processed_dir / f'registro_{timestamp}.txt'
-    print(f"Creando archivo de registro: {registro_path}")
+    log.info("Moviendo %d archivos procesados a backup y destino final...", len(processed_files))
+    with ThreadPoolExecutor(max_workers=max(1, int(opciones["workers"]))) as executor:
+        movidos = list(executor.map(lambda registro: _mover_procesado(registro, config, destinos, opciones), processed_files))
+    return _cerrar_movimientos(movidos, invalid_files, config, rutas_origen, ya_movidos)
 
-    with open(registro_path, 'w', encoding='utf-8') as registro_file:
-        registro_file.write(f"Proceso ejecutado el: {timestamp}\nArchivos procesados:\n")
-        print(f"Moviendo {len(processed_files)} archivos procesados...")
+def _mover_procesado(registro, config, destinos, opciones):
+    """
+    Movimiento común a los tres modos de un archivo ya escrito en Maestro: al
+    backup local y de ahí a target_dir/<ejercicio>. Publica "movido" o
+    "error_movimiento" y devuelve (archivo, ruta_backup, ruta_destino, error)
+    para _cerrar_movimientos; un error no se propaga.
+    """
+    file, ejercicio = registro[3], registro[2]
+    buffer_bytes = max(64, int(opciones["buffer_kb"])) * 1024
+    try:
+        dest_backup_path, dest_path_year = move_to_backup(file, ejercicio, config, destinos)
+        copiar_con_reintentos(dest_backup_path, dest_path_year, buffer_bytes, opciones["verificacion"], opciones["reintentos"])
+    except Exception as e:
+        log.error("Error al mover %s a backup/destino final: %s", file, e)
+        progreso.publicar("error_movimiento", archivos=(file,))
+        return file, None, None, e
+    log.info("Copiado a destino final: %s -> %s", dest_backup_path, dest_path_year)
+    progreso.publicar("movido", archivos=(file,))
+    return file, dest_backup_path, dest_path_year, None
 
-        for (letra, actuacion, ejercicio, file) in processed_files:
-            src_path = temp_dir / file
-            
-            # Mover a backup local
-            dest_backup_path = get_alternative_path(backup_dir / file)
-            print(f"Moviendo archivo a backup local: {src_path} -> {dest_backup_path}")
-            shutil.move(str(src_path), str(dest_backup_path))
-
-            # Copiar a destino final en red
-            year_dir = target_dir / ejercicio
-            os.makedirs(year_dir, exist_ok=True)
-            
-            dest_path_year = get_alternative_path(year_dir / file)
-            
-            print(f"Copiando archivo a destino final: {dest_backup_path} -> {dest_path_year}")
-            shutil.copy2(str(dest_backup_path), str(dest_path_year))
-            
-            registro_file.write(f"{file} movido a BK -> {dest_backup_path.name} y copiado a {dest_path_year}\n")
+def _cerrar_movimientos(movidos, invalid_files, config, rutas_origen=None, ya_movidos=()):
+    """
+    Cierre común a los tres modos: escribe el registro de movimientos, borra
+    las copias temporales de los inválidos (que se conservan en el origen) y
+    elimina del origen solo los archivos que llegaron a destino final, más, al
+    reanudar, los que ya habían llegado en la ejecución cortada. Si la copia a
+    destino falló, el original queda en el origen para reintentar.
+    Devuelve la ruta del registro o None.
+    """
+    registro_path = _write_movement_log(movidos, config)
+    remove_invalid_temp_copies({item[0] if isinstance(item, tuple) else item for item in invalid_files}, config)
+    clean_source_files({file for file, _, _, error in movidos if error is None} | set(ya_movidos), config, rutas_origen)
+    return registro_path
+
+def move_to_backup(file, ejercicio, config, destinos=None):
+    """
+    Mueve un PDF procesado de temp_dir al backup local y prepara su carpeta de
+    destino final (target_dir/<ejercicio>). Devuelve (ruta_backup, ruta_destino);
+    la copia a destino la hace quien llama. Con destinos (ListadoDestinos de la
+    ejecución) las carpetas se crean y se listan una sola vez y los nombres
+    ocupados se resuelven sin consultar el recurso de red por cada archivo.
+    """
+    src_path = Path(config["temp_dir"]) / file
+    year_dir = Path(config["target_dir"]) / ejercicio
+    if destinos is None:
+        dest_backup_path = get_alternative_path(Path(config["backup_dir"]) / file)
+        os.makedirs(year_dir, exist_ok=True)
+        dest_path_year = get_alternative_path(year_dir / file)
+    else:
+        dest_backup_path = destinos.ruta_libre(Path(config["backup_dir"]) / file)
+        dest_path_year = destinos.ruta_libre(year_dir / file)
 
-    # Nombres de archivos válidamente procesados (los únicos que se pueden borrar del origen)
-    nombres_procesados = {file for (_, _, _, file) in processed_files}
-    # Nombres de archivos inválidos (hay que conservarlos en origen y limpiar solo su copia temporal)
-    nombres_invalidos = set()
-    for item in invalid_files:
-        archivo = item[0] if isinstance(item, tuple) else item
-        nombres_invalidos.add(archivo)
+    # Mover a backup local
+    log.info("Moviendo archivo a backup local: %s -> %s", src_path, dest_backup_path)
+    shutil.move(str(src_path), str(dest_backup_path))
+    metricas.sumar("archivos_movidos")
 
-    # Eliminar copias temporales de archivos inválidos (fueron copiados a temp pero no procesados)
+    return dest_backup_path, dest_path_year
+
+def remove_invalid_temp_copies(nombres_invalidos, config):
+    """Elimina las copias temporales de archivos inválidos (fueron copiados a temp pero no procesados)."""
+    temp_dir = Path(config["temp_dir"])
     for nombre in nombres_invalidos:
         tmp_path = temp_dir / nombre
         if tmp_path.exists():
             try:
-                print(f"Eliminando copia temporal de archivo inválido: {tmp_path}")
+                log.info("Eliminando copia temporal de archivo inválido: %s", tmp_path)
                 os.unlink(tmp_path)
             except Exception as e:
-                print(f"Error al eliminar copia temporal {tmp_path}: {e}")
+                log.error("Error al eliminar copia temporal %s: %s", tmp_path, e)
 
-    print(f"Limpiando archivos originales en directorio fuente: {config['source_dir']}")
+@metricas.etapa("limpieza_origen")
+def clean_source_files(nombres_procesados, config, rutas_origen=None):
+    """
+    Elimina del origen los PDFs procesados (los demás se conservan para su
+    corrección) y luego los directorios que quedaron vacíos. Con rutas_origen
+    (un microlote) solo se consideran esas rutas: un archivo homónimo que llegó
+    después al origen no se toca. Devuelve la cantidad de archivos eliminados.
+    """
+    log.info("Limpiando archivos originales en directorio fuente: %s", config['source_dir'])
     archivos_eliminados = 0
     archivos_conservados = 0
     source_dir = Path(config["source_dir"])
     if source_dir.exists():
-        for file_path in source_dir.rglob('*.pdf'):
-            if file_path.is_file():
-                if file_path.name in nombres_procesados:
-                    try:
-                        print(f"Eliminando archivo original procesado: {file_path}")
-                        os.unlink(file_path)
-                        archivos_eliminados += 1
-                    except Exception as e:
-                        print(f"Error al eliminar {file_path}: {e}")
-                else:
-                    print(f"Conservando archivo en origen (no procesado): {file_path.name}")
-                    archivos_conservados += 1
+        # Se reutiliza el escaneo hecho por copy_files en lugar de recorrer de nuevo el recurso de red
+        indice = get_source_index(config)
+        if rutas_origen is not None:
+            archivos_origen = [Path(ruta) for ruta in rutas_origen]
+            directorios_candidatos = set()
+        elif indice.fecha_escaneo is not None:
+            archivos_origen = [Path(ruta) for ruta in indice.rutas()]
+            directorios_candidatos = {Path(d) for d in indice.directorios_vacios}
+        else:
+            archivos_origen = [p for p in source_dir.rglob('*.pdf') if p.is_file()]
+            directorios_candidatos = set()
+
+        for file_path in archivos_origen:
+            if file_path.name in nombres_procesados:
+                try:
+                    log.info("Eliminando archivo original procesado: %s", file_path)
+                    os.unlink(file_path)
+                    archivos_eliminados += 1
+                    directorios_candidatos.add(file_path.parent)
+                except FileNotFoundError:
+                    pass
+                except Exception as e:
+                    log.error("Error al eliminar %s: %s", file_path, e)
+            else:
+                log.info("Conservando archivo en origen (no procesado): %s", file_path.name)
+                archivos_conservados += 1
         
         if archivos_conservados > 0:
-            print(f"Se conservaron {archivos_conservados} archivo/s en origen pendientes de corrección.")
+            log.info("Se conservaron %s archivo/s en origen pendientes de corrección.", archivos_conservados)
 
-        # Limpiar solo directorios vacíos (no tocar los que tienen archivos pendientes)
-        for dirpath, _, _ in os.walk(source_dir, topdown=False):
-            if not os.listdir(dirpath):
-                try:
-                    print(f"Eliminando directorio vacío: {dirpath}")
+        # Limpiar solo directorios vacíos (no tocar los que tienen archivos pendientes).
+        # Se revisan los directorios de los archivos eliminados y sus ancestros, del más profundo al más cercano al origen.
+        for dirpath in sorted(_directorios_hasta(directorios_candidatos, source_dir), key=lambda p: len(p.parts), reverse=True):
+            try:
+                if not os.listdir(dirpath):
+                    log.info("Eliminando directorio vacío: %s", dirpath)
                     os.rmdir(dirpath)
-                except Exception as e:
-                    print(f"Error al eliminar directorio {dirpath}: {e}")
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                log.error("Error al eliminar directorio %s: %s", dirpath, e)
 
-    print(f"Total de archivos originales eliminados: {archivos_eliminados}")            
-    return str(registro_path)
+    log.info("Total de archivos originales eliminados: %s", archivos_eliminados)
+    metricas.sumar("archivos_eliminados_origen", archivos_eliminados)
+    return archivos_eliminados
+
+def _directorios_hasta(directorios, source_dir):
+    """Devuelve los directorios dados y sus ancestros dentro de source_dir (sin incluirlo)."""
+    resultado = set()
+    for directorio in directorios:
+        while directorio != source_dir and source_dir in directorio.parents:
+            resultado.add(directorio)
+            directorio = directorio.parent
+    return resultado
 
 def generate_invalid_files_log(invalid_files, config=None):
     if config is None:
@@ -418,10 +1050,10 @@ def generate_invalid_files_log(invalid_files, config=None):
     log_path = log_dir / 'log_errores.txt'
     timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
     
-    print(f"Generando log de archivos inválidos: {log_path}")
-    print(f"{'='*60}")
-    print(f"  ARCHIVOS CON NOMENCLATURA INVÁLIDA ({len(invalid_files)} archivo/s)")
-    print(f"{'='*60}")
+    log.info("Generando log de archivos inválidos: %s", log_path)
+    log.warning('=' * 60)
+    log.warning("  ARCHIVOS CON NOMENCLATURA INVÁLIDA (%d archivo/s)", len(invalid_files))
+    log.warning('=' * 60)
     with open(log_path, 'a', encoding='utf-8') as log_file:
         log_file.write(f"\nErrores de nomenclatura encontrados el: {timestamp}\n")
         log_file.write(f"{'='*60}\n")
@@ -432,13 +1064,14 @@ def generate_invalid_files_log(invalid_files, config=None):
                 file, razon = item, "motivo no especificado"
             linea = f"  - {file}: {razon}"
             log_file.write(f"{linea}\n")
-            print(linea)
+            log.warning(linea)
         log_file.write(f"{'='*60}\n")
-    print(f"{'='*60}")
+    log.warning('=' * 60)
     
-    print(f"Log de errores guardado en: {log_path}")
+    log.info("Log de errores guardado en: %s", log_path)
     return str(log_path)
 
+@metricas.etapa("limpieza")
 def cleanup_old_files(config=None):
     """Elimina archivos temporales más antiguos que el número de días especificado"""
     if config is None:
@@ -453,9 +1086,9 @@ def cleanup_old_files(config=None):
     os.makedirs(processed_dir, exist_ok=True)
     os.makedirs(backup_dir, exist_ok=True)
 
-    print(f"Iniciando limpieza de archivos antiguos (más de {cleanup_days} días)...")
+    log.info("Iniciando limpieza de archivos antiguos (más de %s días)...", cleanup_days)
     cutoff_date = datetime.now() - timedelta(days=cleanup_days)
-    print(f"Fecha límite para limpieza: {cutoff_date.strftime('%Y-%m-%d')}")
+    log.info("Fecha límite para limpieza: %s", cutoff_date.strftime('%Y-%m-%d'))
     
     deleted_files = []
     
@@ -463,48 +1096,527 @@ def cleanup_old_files(config=None):
     def delete_old_files_in_dir(directory):
         local_deleted = []
         if directory.exists():
-            print(f"Analizando directorio: {directory}")
+            log.debug("Analizando directorio: %s", directory)
             for file_path in directory.iterdir():
                 if file_path.is_file():
                     try:
                         file_mod_time = datetime.fromtimestamp(file_path.stat().st_mtime)
                         if file_mod_time < cutoff_date:
-                            print(f"Eliminando archivo antiguo: {file_path} (modificado: {file_mod_time.strftime('%Y-%m-%d')})")
+                            log.info("Eliminando archivo antiguo: %s (modificado: %s)", file_path, file_mod_time.strftime('%Y-%m-%d'))
                             os.unlink(file_path)
                             local_deleted.append(str(file_path))
                     except Exception as e:
-                        print(f"No se pudo procesar o eliminar {file_path}: {e}")
+                        log.error("No se pudo procesar o eliminar %s: %s", file_path, e)
         return local_deleted
     
     # Eliminar archivos antiguos en carpetas temporales
-    print("Limpiando archivos en directorio temporal...")
+    log.info("Limpiando archivos en directorio temporal...")
     deleted_files.extend(delete_old_files_in_dir(temp_dir))
     
-    print("Limpiando archivos en directorio de backup...")
+    log.info("Limpiando archivos en directorio de backup...")
     deleted_files.extend(delete_old_files_in_dir(backup_dir))
     
     # Eliminar logs y registros antiguos
-    print("Limpiando logs y registros antiguos...")
+    log.info("Limpiando logs y registros antiguos...")
     deleted_files.extend(delete_old_files_in_dir(processed_dir))
+    deleted_files.extend(delete_old_files_in_dir(get_journal_dir(config)))
+    # Imágenes de páginas escaneadas (cada uso renueva la fecha, así solo se borran las que no se usan)
+    deleted_files.extend(delete_old_files_in_dir(processed_dir / "cache" / "paginas"))
     
+    # Purgar entradas viejas (o excedentes) de la caché de extracción
+    cache = open_extraction_cache(config)
+    if cache is not None:
+        with cache:
+            purgadas = cache.purgar()
+        log.info("Caché de extracción: %s entradas purgadas.", purgadas)
+
     # Registrar la limpieza
     if deleted_files:
         log_path = processed_dir / 'cleanup_log.txt'
         timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
         
-        print(f"Generando log de limpieza: {log_path}")
+        log.info("Generando log de limpieza: %s", log_path)
         with open(log_path, 'a', encoding='utf-8') as log_file:
             log_file.write(f"\nLimpieza realizada el: {timestamp}\n")
             log_file.write(f"Se eliminaron {len(deleted_files)} archivos más antiguos de {cleanup_days} días:\n")
             for file in deleted_files:
                 log_file.write(f"- {file}\n")
         
-        print(f"Limpieza completada. Se eliminaron {len(deleted_files)} archivos.")
+        log.info("Limpieza completada. Se eliminaron %d archivos.", len(deleted_files))
         return str(log_path), len(deleted_files)
     
-    print("Limpieza completada. No se encontraron archivos para eliminar.")
+    log.info("Limpieza completada. No se encontraron archivos para eliminar.")
     return None, 0
 
+def run_streaming_pipeline(config):
+    """
+    Modo streaming: cada PDF pasa por copia -> validación -> extracción ->
+    escritura en Maestro -> backup/destino apenas está listo, con colas
+    acotadas entre etapas (stream_queue_size). La base de datos se escribe en
+    microlotes de hasta db_batch_size archivos o cada stream_flush_seconds,
+    así los primeros resultados llegan a Maestro en segundos y los archivos
+    salen de temp_dir a medida que terminan.
+    Devuelve (processed_files, invalid_files, registro_path).
+    """
+    tamano_cola = max(1, int(config.get("stream_queue_size", 64)))
+    espera_flush = float(config.get("stream_flush_seconds", 2))
+    batch_size = get_db_batch_size(config)
+    backup_dir = Path(config["backup_dir"])
+    processed_dir = Path(config["processed_dir"])
+    os.makedirs(Path(config["temp_dir"]), exist_ok=True)
+    os.makedirs(processed_dir, exist_ok=True)
+    os.makedirs(backup_dir, exist_ok=True)
+
+    FIN = object()
+    cola_validar = queue.Queue(tamano_cola)
+    cola_extraer = queue.Queue(tamano_cola)
+    cola_db = queue.Queue()
+    cola_mover = queue.Queue(tamano_cola)
+    # Limita los textos extraídos en memoria a la espera de la base de datos
+    cupo_extraccion = threading.BoundedSemaphore(tamano_cola)
+
+    processed_files = []
+    invalid_files = []
+    movidos = []
+    errores = []
+    abortar = threading.Event()
+
+    @metricas.etapa("copia")
+    def etapa_copia():
+        try:
+            if not Path(config["source_dir"]).exists():
+                log.warning("Advertencia: El directorio de origen no existe: %s", config['source_dir'])
+                return
+            for dest_file in iter_copied_files(config):
+                # Se comprueba antes de cada put: tras un error las demás etapas solo vacían sus colas
+                if abortar.is_set():
+                    break
+                cola_validar.put(dest_file)
+        except Exception as e:
+            errores.append(e)
+            abortar.set()
+        finally:
+            cola_validar.put(FIN)
+
+    def etapa_validacion():
+        current_year = datetime.now().year
+        try:
+            while (file_path := cola_validar.get()) is not FIN:
+                # Tras un error en otra etapa solo se vacía la cola, para no bloquear a la copia
+                if abortar.is_set():
+                    continue
+                registro, razon = validate_file(file_path, backup_dir, current_year)
+                if registro is not None:
+                    processed_files.append(registro)
+                    cola_extraer.put(registro)
+                elif razon is not None:
+                    invalid_files.append((file_path.name, razon))
+        except Exception as e:
+            log.error("Error en la validación de archivos: %s", e)
+            errores.append(e)
+            abortar.set()
+            while cola_validar.get() is not FIN:
+                pass
+        finally:
+            cola_extraer.put(FIN)
+
+    @metricas.etapa("extraccion")
+    def etapa_extraccion():
+        temp_dir = Path(config["temp_dir"])
+        max_chars = get_extract_max_chars(config)
+        cache = open_extraction_cache(config)
+        workers = get_extraction_workers(config)
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        ocr = open_ocr_pool(config)
+        con_cupo = False
+        enviados = set()
+        try:
+            while (registro := cola_extraer.get()) is not FIN:
+                if abortar.is_set():
+                    continue
+                cupo_extraccion.acquire()
+                con_cupo = True
+                pdf_path = temp_dir / registro[3]
+                sha256 = None
+                try:
+                    sha256, texto = _resolver_desde_cache(cache, pdf_path)
+                    if texto is not None:
+                        con_cupo = False
+                        cola_db.put((registro, texto, None))
+                        continue
+                    if executor is None:
+                        texto = extract_text_from_pdf(pdf_path, max_chars, ocr)
+                        con_cupo = False
+                        cola_db.put((registro, texto, sha256))
+                        continue
+                except Exception as e:
+                    log.error("Error al procesar %s: %s", pdf_path, e)
+                    con_cupo = False
+                    cola_db.put((registro, None, None))
+                    continue
+                # El resultado (un futuro) se resuelve en la etapa de base de datos
+                future = submit_pdf_extraction(executor, pdf_path, max_chars, get_page_split(pdf_path, config, workers), ocr)
+                con_cupo = False
+                enviados.add(future)
+                future.add_done_callback(enviados.discard)
+                future.add_done_callback(lambda f, r=registro, h=sha256: cola_db.put((r, f, h)))
+        except Exception as e:
+            # Por ejemplo BrokenProcessPool si un proceso del pool murió por falta de memoria
+            log.error("Error en la etapa de extracción: %s", e)
+            errores.append(e)
+            abortar.set()
+            if con_cupo:
+                cupo_extraccion.release()
+            # Vaciar la cola para no bloquear a la etapa de validación
+            while cola_extraer.get() is not FIN:
+                pass
+        finally:
+            if executor is not None:
+                # Un PDF grande envía sus rangos recién al contar las páginas: se esperan antes de cerrar el pool
+                wait(list(enviados))
+                executor.shutdown(wait=True)
+            # Después de la extracción: así las páginas enviadas a OCR terminan y llegan a la cola antes del FIN
+            if ocr is not None:
+                ocr.cerrar()
+            if cache is not None:
+                cache.cerrar()
+            cola_db.put(FIN)
+
+    def etapa_db():
+        conn = None
+        cache = open_extraction_cache(config)
+        lote = []
+        inicio_lote = None
+        terminado = False
+        try:
+            while not terminado:
+                try:
+                    item = cola_db.get(timeout=espera_flush)
+                    if item is FIN:
+                        terminado = True
+                    else:
+                        registro, resultado, sha256 = item
+                        cupo_extraccion.release()
+                        texto = _resultado_extraccion(registro, resultado, sha256, cache)
+                        lote.append((registro, texto))
+                        progreso.publicar("extraido" if texto is not None else "error_extraccion", archivos=(registro[3],))
+                        inicio_lote = inicio_lote or time.monotonic()
+                        if len(lote) < batch_size and time.monotonic() - inicio_lote < espera_flush:
+                            continue
+                except queue.Empty:
+                    pass
+                if not lote or abortar.is_set():
+                    lote, inicio_lote = [], None
+                    continue
+                if conn is None:
+                    log.info("Iniciando conexión con la base de datos...")
+                    conn = get_db_connection(config)
+                _escribir_microlote(lote, conn, batch_size, config)
+                for registro, _ in lote:
+                    cola_mover.put(registro)
+                lote, inicio_lote = [], None
+        except Exception as e:
+            log.error("Error al escribir en la base de datos: %s", e)
+            errores.append(e)
+            abortar.set()
+            # Vaciar la cola para no bloquear a la etapa de extracción
+            if not terminado:
+                while cola_db.get() is not FIN:
+                    cupo_extraccion.release()
+        finally:
+            if conn is not None:
+                conn.close()
+                log.info("Conexión con la base de datos cerrada.")
+            if cache is not None:
+                cache.cerrar()
+            cola_mover.put(FIN)
+
+    @metricas.etapa("movimiento")
+    def etapa_movimiento():
+        destinos = ListadoDestinos()
+        opciones = get_copy_options(config)
+        while (registro := cola_mover.get()) is not FIN:
+            movidos.append(_mover_procesado(registro, config, destinos, opciones))
+
+    hilos = [threading.Thread(target=etapa, name=etapa.__name__, daemon=True)
+             for etapa in (etapa_copia, etapa_validacion, etapa_extraccion, etapa_db, etapa_movimiento)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    registro_path = _cerrar_movimientos(movidos, invalid_files, config)
+
+    if errores:
+        raise errores[0]
+    return processed_files, invalid_files, registro_path
+
+def _write_movement_log(movidos, config):
+    """
+    Escribe registro_<timestamp>.txt a partir de tuplas (file, ruta_backup, ruta_destino, error).
+    Devuelve la ruta del registro, o None si no se movió ningún archivo.
+    """
+    if not movidos:
+        return None
+    timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+    registro_path = Path(config["processed_dir"]) / f'registro_{timestamp}.txt'
+    log.info("Creando archivo de registro: %s", registro_path)
+    with open(registro_path, 'w', encoding='utf-8') as registro_file:
+        registro_file.write(f"Proceso ejecutado el: {timestamp}\nArchivos procesados:\n")
+        for file, dest_backup_path, dest_path_year, error in movidos:
+            if error is None:
+                registro_file.write(f"{file} movido a BK -> {dest_backup_path.name} y copiado a {dest_path_year}\n")
+            else:
+                registro_file.write(f"ERROR: {file} no se pudo mover a backup/destino final: {error}\n")
+    return str(registro_path)
+
+def _resultado_extraccion(registro, resultado, sha256, cache):
+    """
+    Texto de un archivo en el modo streaming: resultado puede ser el texto, None
+    (error) o el futuro del pool de extracción. Los textos nuevos se guardan en caché.
+    """
+    if hasattr(resultado, "result"):
+        try:
+            resultado = resultado.result()
+        except Exception as e:
+            log.error("Error al procesar %s: %s", registro[3], e)
+            return None
+        log.info("Texto extraído correctamente de %s", registro[3])
+    _guardar_en_cache(cache, sha256, resultado)
+    return resultado
+
+async def ejecutar_proceso_completo_async(config=None):
+    """
+    Contraparte asyncio de ejecutar_proceso_completo. Cada archivo es una
+    corrutina que copia (hilos de E/S), valida, extrae (pool de procesos) y
+    entrega su texto al escritor de base de datos (un único hilo para pyodbc);
+    semáforos por recurso limitan la concurrencia de copias y extracciones.
+    async_timeout_seconds limita la duración total y extraction_timeout_seconds
+    la de cada extracción. Devuelve la misma tupla que la versión sincrónica.
+    """
+    log.info("=== INICIANDO PROCESO COMPLETO (asyncio) ===")
+    if config is None:
+        config = load_config()
+    processed_files = []
+    invalid_files = []
+    timeout = config.get("async_timeout_seconds", 0) or None
+
+    try:
+        log.info("Iniciando limpieza de archivos antiguos...")
+        cleanup_log, deleted_count = await asyncio.to_thread(cleanup_old_files, config)
+
+        registro_path = await asyncio.wait_for(
+            _run_async_pipeline(config, processed_files, invalid_files), timeout
+        )
+
+        log_path = None
+        if invalid_files:
+            log_path = await asyncio.to_thread(generate_invalid_files_log, invalid_files, config)
+        resumen = _construir_resumen(processed_files, invalid_files)
+        if processed_files:
+            log.info("Proceso completado con éxito. Registro generado en: %s", registro_path)
+            return True, registro_path, log_path, cleanup_log, deleted_count, resumen
+        log.info("No se encontraron archivos válidos para procesar.")
+        return False, None, log_path, cleanup_log, deleted_count, resumen
+    except asyncio.TimeoutError:
+        log.error("ERROR EN EL PROCESO: se superó el tiempo máximo de %s segundos. Proceso cancelado.", timeout)
+        metricas.sumar("ejecuciones_con_error")
+        resumen = _construir_resumen(processed_files, invalid_files)
+        return False, None, None, None, 0, resumen
+    except Exception as e:
+        log.error("ERROR EN EL PROCESO: %s", e, exc_info=True)
+        metricas.sumar("ejecuciones_con_error")
+        resumen = _construir_resumen(processed_files, invalid_files)
+        return False, None, None, None, 0, resumen
+    finally:
+        log.info("=== PROCESO FINALIZADO ===")
+
+async def _run_async_pipeline(config, processed_files, invalid_files):
+    """Orquesta copia, validación, extracción, base de datos y movimiento por archivo con asyncio."""
+    loop = asyncio.get_running_loop()
+    opciones = get_copy_options(config)
+    buffer_bytes = max(64, int(opciones["buffer_kb"])) * 1024
+    batch_size = get_db_batch_size(config)
+    espera_flush = float(config.get("stream_flush_seconds", 2))
+    timeout_extraccion = config.get("extraction_timeout_seconds", 0) or None
+    max_chars = get_extract_max_chars(config)
+    workers_extraccion = get_extraction_workers(config)
+    source_dir = Path(config["source_dir"])
+    temp_dir = Path(config["temp_dir"])
+    backup_dir = Path(config["backup_dir"])
+    processed_dir = Path(config["processed_dir"])
+    for directorio in (temp_dir, processed_dir, backup_dir):
+        os.makedirs(directorio, exist_ok=True)
+
+    if not source_dir.exists():
+        log.warning("Advertencia: El directorio de origen no existe: %s", source_dir)
+        return None
+
+    # pyodbc y sqlite3 se usan siempre desde el mismo hilo: un ejecutor de un hilo para cada uno
+    io_pool = ThreadPoolExecutor(max_workers=max(1, int(opciones["workers"])), thread_name_prefix="io")
+    cache_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cache")
+    db_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db")
+    cpu_pool = ProcessPoolExecutor(max_workers=workers_extraccion)
+    ocr_pool = open_ocr_pool(config)
+    sem_copia = asyncio.Semaphore(max(1, int(opciones["workers"])))
+    sem_extraccion = asyncio.Semaphore(workers_extraccion * 2)
+    cola_db = asyncio.Queue(max(1, int(config.get("stream_queue_size", 64))))
+    FIN = object()
+
+    estado = {"conn": None, "cache": None}
+    indice = get_source_index(config)
+    destinos = ListadoDestinos()
+    movidos = []
+    tareas_mover = []
+
+    # sqlite3 exige usar la caché desde el hilo que la abrió: se abre en cache_pool
+    def buscar_en_cache(pdf_path):
+        if estado["cache"] is None:
+            estado["cache"] = open_extraction_cache(config)
+        return _resolver_desde_cache(estado["cache"], pdf_path)
+
+    def guardar_en_cache(sha256, texto):
+        _guardar_en_cache(estado["cache"], sha256, texto)
+
+    def escribir_lote(lote):
+        if estado["conn"] is None:
+            log.info("Iniciando conexión con la base de datos...")
+            estado["conn"] = get_db_connection(config)
+        _escribir_microlote(lote, estado["conn"], batch_size, config)
+
+    def cerrar_conexion():
+        if estado["conn"] is not None:
+            estado["conn"].close()
+            log.info("Conexión con la base de datos cerrada.")
+
+    def cerrar_cache():
+        if estado["cache"] is not None:
+            estado["cache"].cerrar()
+
+    def escanear():
+        return [
+            (ruta, tamano, mtime_ns, indice.sin_cambios(ruta, tamano, mtime_ns, temp_dir / Path(ruta).name))
+            for ruta, tamano, mtime_ns in indice.escanear(source_dir)
+        ]
+
+    async def procesar_archivo(ruta, tamano, mtime_ns, sin_cambios):
+        dest_file = temp_dir / Path(ruta).name
+        if sin_cambios:
+            log.info("Sin cambios desde la última copia, se reutiliza: %s", dest_file)
+            metricas.sumar("archivos_reutilizados")
+            progreso.publicar("copiado", archivos=(dest_file.name,))
+        else:
+            async with sem_copia:
+                try:
+                    with metricas.etapa_concurrente("copia", "copia_archivo"):
+                        sha256 = await loop.run_in_executor(
+                            io_pool, copiar_con_reintentos, ruta, dest_file, buffer_bytes,
+                            opciones["verificacion"], opciones["reintentos"]
+                        )
+                except Exception as e:
+                    log.error("Error al copiar el archivo %s: %s", ruta, e)
+                    progreso.publicar("error_copia", archivos=(dest_file.name,))
+                    return
+            log.info("Copiado: %s -> %s", ruta, dest_file)
+            indice.registrar(ruta, tamano, mtime_ns, dest_file, sha256)
+            metricas.sumar("archivos_copiados")
+            metricas.sumar("bytes_copiados", tamano)
+            progreso.publicar("copiado", bytes_=tamano, archivos=(dest_file.name,))
+
+        registro, razon = validate_file(dest_file, backup_dir)
+        if registro is None:
+            if razon is not None:
+                invalid_files.append((dest_file.name, razon))
+            return
+        processed_files.append(registro)
+
+        texto = None
+        try:
+            sha256, texto = await loop.run_in_executor(cache_pool, buscar_en_cache, dest_file)
+            if texto is None:
+                reparto = get_page_split(dest_file, config, workers_extraccion)
+                async with sem_extraccion:
+                    with metricas.etapa_concurrente("extraccion"):
+                        texto = await asyncio.wait_for(
+                            asyncio.wrap_future(submit_pdf_extraction(cpu_pool, dest_file, max_chars, reparto, ocr_pool)),
+                            timeout_extraccion
+                        )
+                log.info("Texto extraído correctamente de %s", dest_file.name)
+                await loop.run_in_executor(cache_pool, guardar_en_cache, sha256, texto)
+        except asyncio.TimeoutError:
+            log.error("Error al procesar %s: la extracción superó %s segundos", dest_file, timeout_extraccion)
+            texto = None
+        except Exception as e:
+            log.error("Error al procesar %s: %s", dest_file, e)
+            texto = None
+        progreso.publicar("extraido" if texto is not None else "error_extraccion", archivos=(dest_file.name,))
+        await cola_db.put((registro, texto))
+
+    async def mover(registro):
+        async with sem_copia:
+            with metricas.etapa_concurrente("movimiento", "movimiento_archivo"):
+                movidos.append(
+                    await loop.run_in_executor(io_pool, _mover_procesado, registro, config, destinos, opciones)
+                )
+
+    async def productores(entradas):
+        await asyncio.gather(*(procesar_archivo(*entrada) for entrada in entradas))
+        await cola_db.put(FIN)
+
+    async def escritor_db():
+        lote = []
+        inicio_lote = None
+        terminado = False
+        while not terminado:
+            espera = espera_flush if inicio_lote is None else max(0.0, espera_flush - (loop.time() - inicio_lote))
+            try:
+                item = await asyncio.wait_for(cola_db.get(), espera)
+                if item is FIN:
+                    terminado = True
+                else:
+                    lote.append(item)
+                    inicio_lote = inicio_lote or loop.time()
+                    if len(lote) < batch_size and loop.time() - inicio_lote < espera_flush:
+                        continue
+            except asyncio.TimeoutError:
+                pass
+            if not lote:
+                continue
+            await loop.run_in_executor(db_pool, escribir_lote, lote)
+            # Los movimientos no forman parte del grupo de tareas: si otra etapa falla, los iniciados terminan igual
+            tareas_mover.extend(asyncio.create_task(mover(registro)) for registro, _ in lote)
+            lote, inicio_lote = [], None
+
+    registro_path = None
+    try:
+        log.info("Buscando archivos PDF en: %s", source_dir)
+        entradas = await loop.run_in_executor(io_pool, escanear)
+        log.info("Se encontraron %d archivos PDF en origen.", len(entradas))
+        progreso.publicar(
+            "descubierto", len(entradas), sum(tamano for _, tamano, _, sin_cambios in entradas if not sin_cambios)
+        )
+        try:
+            async with asyncio.TaskGroup() as grupo:
+                grupo.create_task(escritor_db())
+                grupo.create_task(productores(entradas))
+        except ExceptionGroup as eg:
+            # TaskGroup ya canceló el resto de las tareas; se propaga el primer error tal cual
+            raise eg.exceptions[0] from None
+    finally:
+        # Aun ante errores o cancelación se registran los archivos que llegaron a destino
+        await asyncio.shield(asyncio.gather(*tareas_mover, return_exceptions=True))
+        await loop.run_in_executor(io_pool, indice.guardar)
+        await loop.run_in_executor(db_pool, cerrar_conexion)
+        await loop.run_in_executor(cache_pool, cerrar_cache)
+        registro_path = await loop.run_in_executor(io_pool, _cerrar_movimientos, movidos, invalid_files, config)
+        cpu_pool.shutdown(wait=False, cancel_futures=True)
+        if ocr_pool is not None:
+            ocr_pool.cerrar(esperar=False)
+        for pool in (io_pool, cache_pool, db_pool):
+            pool.shutdown(wait=False)
+
+    return registro_path
+
 def _construir_resumen(processed_files, invalid_files):
     """Construye e imprime el bloque de resumen final del proceso."""
     n_validos = len(processed_files)
@@ -525,63 +1637,253 @@ def _construir_resumen(processed_files, invalid_files):
             lineas.append(f"    - {archivo}: {razon}")
     lineas.append(sep)
     resumen = "\n".join(lineas)
-    print(resumen)
+    log.info(resumen)
     return resumen
 
 
-def ejecutar_proceso_completo():
-    print("=== INICIANDO PROCESO COMPLETO ===")
-    config = load_config()
-    print(f"Configuración cargada: {config}")
+def procesar_lote(rutas_origen, config=None):
+    """
+    Procesa solo los PDFs de origen indicados (un microlote del vigilante de
+    source_dir) con las mismas etapas que el modo por etapas: copia, validación,
+    base de datos y movimiento. No hace la limpieza de archivos antiguos y solo
+    elimina del origen las rutas del lote. Cada lote es una ejecución para las
+    métricas. Devuelve la misma tupla que ejecutar_proceso_completo.
+    """
+    if config is None:
+        config = load_config()
     processed_files = []
     invalid_files = []
+    metricas.reiniciar("vigilancia")
+    log.info("=== PROCESANDO MICROLOTE DE %d ARCHIVOS ===", len(rutas_origen))
+    try:
+        with metricas.etapa("copia"):
+            for directorio in (config["temp_dir"], config["processed_dir"], config["backup_dir"]):
+                os.makedirs(directorio, exist_ok=True)
+            copiados = list(iter_copied_files(config, rutas_origen))
+        processed_files, invalid_files = process_files(copiados, config)
+        log_path = generate_invalid_files_log(invalid_files, config) if invalid_files else None
+
+        registro_path = None
+        if processed_files:
+            insert_and_update_db(processed_files, config)
+            registro_path = clean_and_move_files(processed_files, invalid_files, config, rutas_origen)
+        else:
+            remove_invalid_temp_copies({archivo for archivo, _ in invalid_files}, config)
+        resumen = _construir_resumen(processed_files, invalid_files)
+        return bool(processed_files), registro_path, log_path, None, 0, resumen
+    except Exception as e:
+        log.error("ERROR EN EL PROCESO: %s", e, exc_info=True)
+        metricas.sumar("ejecuciones_con_error")
+        resumen = _construir_resumen(processed_files, invalid_files)
+        return False, None, None, None, 0, resumen
+    finally:
+        export_run_metrics(config)
+        log.info("=== MICROLOTE FINALIZADO ===")
+
+def simular_proceso(config=None):
+    """
+    Ejecución en seco: escanea source_dir y valida la nomenclatura de cada PDF
+    sin copiar, escribir en la base de datos ni mover nada (el índice de origen
+    no se guarda). Devuelve un diccionario con lo que haría una ejecución real.
+    """
+    if config is None:
+        config = load_config()
+    source_dir = Path(config["source_dir"])
+    if not source_dir.exists():
+        log.warning("Advertencia: El directorio de origen no existe: %s", source_dir)
+        return {"source_dir": str(source_dir), "encontrados": 0, "a_copiar": 0, "sin_cambios": 0,
+                "mb_a_copiar": 0.0, "validos": [], "invalidos": []}
+
+    indice = get_source_index(config)
+    temp_dir = Path(config["temp_dir"])
+    backup_dir = Path(config["backup_dir"])
+    current_year = datetime.now().year
+    entradas = indice.escanear(source_dir)
+    a_copiar = [(ruta, tamano) for ruta, tamano, mtime_ns in entradas
+                if not indice.sin_cambios(ruta, tamano, mtime_ns, temp_dir / Path(ruta).name)]
+    validos = []
+    invalidos = []
+    for ruta, _, _ in entradas:
+        registro, razon = validate_file(Path(ruta), backup_dir, current_year)
+        if registro is not None:
+            validos.append(registro[3])
+        elif razon is not None:
+            invalidos.append({"archivo": Path(ruta).name, "razon": razon})
+
+    log.info("Simulación: %d PDFs en origen, %d a copiar, %d válidos y %d inválidos. No se modificó nada.",
+             len(entradas), len(a_copiar), len(validos), len(invalidos))
+    return {
+        "source_dir": str(source_dir),
+        "encontrados": len(entradas),
+        "a_copiar": len(a_copiar),
+        "sin_cambios": len(entradas) - len(a_copiar),
+        "mb_a_copiar": sum(tamano for _, tamano in a_copiar) / 1024 / 1024,
+        "validos": validos,
+        "invalidos": invalidos,
+    }
+
+def export_run_metrics(config):
+    """
+    Guarda las métricas de la ejecución (modules/metricas.py) en
+    processed_dir/metricas_<timestamp>.json y, si metrics_prometheus_file está
+    configurado, también en formato de texto de Prometheus.
+    """
+    if not config.get("metrics_export", True):
+        return None
+    try:
+        ruta = metricas.exportar_json(config["processed_dir"])
+        log.info("Métricas de la ejecución guardadas en: %s", ruta)
+        if config.get("metrics_prometheus_file"):
+            metricas.exportar_prometheus(config["metrics_prometheus_file"])
+        return ruta
+    except Exception as e:
+        log.warning("Advertencia: no se pudieron guardar las métricas de la ejecución: %s", e)
+        return None
+
+def ejecutar_proceso_completo(config=None, reanudar=None):
+    """
+    Ejecuta el proceso completo en el modo configurado y lo registra en el
+    diario de la ejecución. Con reanudar (por defecto journal_resume) se retoma
+    la última ejecución que no terminó: cada archivo saltea los pasos que ya
+    había completado. Devuelve (exito, registro, log_invalidos, log_limpieza,
+    eliminados, resumen).
+    """
+    if config is None:
+        config = load_config()
+    if not logging_configurado():
+        configurar_logging(config)
+    if reanudar is None:
+        reanudar = config.get("journal_resume", False)
+    diario, estados = abrir_diario(config, reanudar)
+    if diario is not None:
+        progreso.suscribir(diario)
+    try:
+        return _ejecutar_proceso(config, estados)
+    finally:
+        if diario is not None:
+            progreso.desuscribir(diario)
+            if metricas.contadores.get("ejecuciones_con_error"):
+                log.info("La ejecución no terminó bien; se puede retomar con el diario %s", diario.ruta)
+                diario.abandonar()
+            else:
+                diario.cerrar()
+
+def get_journal_dir(config):
+    return Path(config["processed_dir"]) / "diarios"
+
+def abrir_diario(config, reanudar=False):
+    """
+    Diario de la ejecución (modules/diario.py). Con reanudar se retoma el último
+    diario sin terminar y se devuelven los pasos ya hechos por archivo; si no,
+    los diarios pendientes se marcan como descartados y se empieza uno nuevo.
+    Devuelve (diario, {archivo: pasos}) o (None, {}) con journal_enabled en false.
+    """
+    if not config.get("journal_enabled", True):
+        return None, {}
+    directorio = get_journal_dir(config)
+    pendientes = DiarioEjecucion.pendientes(directorio) if directorio.exists() else []
+    if reanudar and pendientes:
+        ruta = pendientes.pop()
+        estados, _ = DiarioEjecucion.leer(ruta)
+        log.info("Reanudando la ejecución del diario %s: %d archivos con pasos ya terminados.", ruta, len(estados))
+        for anterior in pendientes:
+            DiarioEjecucion(anterior).cerrar("descartado")
+        return DiarioEjecucion.retomar(ruta), estados
+    if reanudar:
+        log.info("No hay ejecuciones pendientes de retomar; se procesa todo el origen.")
+    for ruta in pendientes:
+        log.warning("Advertencia: la ejecución del diario %s no terminó y se descarta; se procesa todo de nuevo "
+                    "(para retomar solo lo pendiente usar cli.py --reanudar o journal_resume).", ruta)
+        DiarioEjecucion(ruta).cerrar("descartado")
+    return DiarioEjecucion.nuevo(directorio, config.get("pipeline_mode", "etapas")), {}
+
+def _ejecutar_proceso(config, estados):
+    modo = config.get("pipeline_mode", "etapas")
+    if estados and modo != "etapas":
+        log.info("La reanudación se hace en modo por etapas (pipeline_mode configurado: %s).", modo)
+        modo = "etapas"
+    log.info("=== INICIANDO PROCESO COMPLETO ===")
+    log.debug("Configuración cargada: %s", config)
+    processed_files = []
+    invalid_files = []
+    metricas.reiniciar(modo)
+
+    if modo == "asyncio":
+        # La versión asyncio hace su propia limpieza inicial y su propio manejo de errores
+        try:
+            return asyncio.run(ejecutar_proceso_completo_async(config))
+        finally:
+            export_run_metrics(config)
 
     try:
         # Limpiar archivos antiguos antes de comenzar
-        print("Iniciando limpieza de archivos antiguos...")
+        log.info("Iniciando limpieza de archivos antiguos...")
         cleanup_log, deleted_count = cleanup_old_files(config)
         if cleanup_log:
-            print(f"Limpieza completada, log generado en: {cleanup_log}")
+            log.info("Limpieza completada, log generado en: %s", cleanup_log)
         
-        print("Copiando archivos desde origen y creando manifiesto...")
-        copy_files(config)
+        if modo == "streaming":
+            log.info("Modo streaming: copia, validación, extracción, base de datos y movimiento en paralelo...")
+            processed_files, invalid_files, registro_path = run_streaming_pipeline(config)
+            log_path = generate_invalid_files_log(invalid_files, config) if invalid_files else None
+            resumen = _construir_resumen(processed_files, invalid_files)
+            if processed_files:
+                log.info("Proceso completado con éxito. Registro generado en: %s", registro_path)
+                return True, registro_path, log_path, cleanup_log, deleted_count, resumen
+            log.info("No se encontraron archivos válidos para procesar.")
+            return False, None, log_path, cleanup_log, deleted_count, resumen
+
+        # Al reanudar, los archivos que ya llegaron a destino no se vuelven a copiar ni procesar
+        ya_movidos = {archivo for archivo, pasos in estados.items() if "movido" in pasos}
+        ya_escritos = {archivo for archivo, pasos in estados.items() if "escrito" in pasos} - ya_movidos
+        if ya_movidos:
+            log.info("Reanudación: %d archivos ya estaban en destino; solo falta borrarlos del origen.", len(ya_movidos))
+
+        log.info("Copiando archivos desde origen y creando manifiesto...")
+        copy_files(config, excluir=ya_movidos)
         
-        print("Cargando manifiesto para procesar...")
+        log.info("Cargando manifiesto para procesar...")
         files_to_process = load_manifest(config)
         
-        if not files_to_process:
-            print("Manifiesto vacío o no encontrado. 0 archivos a procesar.")
+        if not files_to_process and not ya_movidos:
+            log.info("Manifiesto vacío o no encontrado. 0 archivos a procesar.")
             resumen = _construir_resumen(processed_files, invalid_files)
             return False, None, None, cleanup_log, deleted_count, resumen
 
-        print("Procesando archivos desde manifiesto...")
+        log.info("Procesando archivos desde manifiesto...")
         processed_files, invalid_files = process_files(files_to_process, config)
-        print(f"Procesamiento completado: {len(processed_files)} válidos, {len(invalid_files)} inválidos")
+        log.info("Procesamiento completado: %d válidos, %d inválidos", len(processed_files), len(invalid_files))
         
         log_path = None
         if invalid_files:
-            print("Generando log de archivos inválidos...")
+            log.info("Generando log de archivos inválidos...")
             log_path = generate_invalid_files_log(invalid_files, config)
             
         registro_path = None
-        if processed_files:
-            print("Actualizando base de datos...")
-            insert_and_update_db(processed_files, config)
-            
-            print("Moviendo y copiando archivos procesados...")
-            registro_path = clean_and_move_files(processed_files, invalid_files, config)
-            print(f"Proceso completado con éxito. Registro generado en: {registro_path}")
+        if processed_files or ya_movidos:
+            pendientes_db = [registro for registro in processed_files if registro[3] not in ya_escritos]
+            if len(pendientes_db) < len(processed_files):
+                log.info("Reanudación: %s archivos ya estaban escritos en Maestro.", len(processed_files) - len(pendientes_db))
+                progreso.publicar("escrito", len(processed_files) - len(pendientes_db),
+                                  archivos=[registro[3] for registro in processed_files if registro[3] in ya_escritos])
+            if pendientes_db:
+                log.info("Actualizando base de datos...")
+                insert_and_update_db(pendientes_db, config)
+
+            log.info("Moviendo y copiando archivos procesados...")
+            registro_path = clean_and_move_files(processed_files, invalid_files, config, ya_movidos=ya_movidos)
+            log.info("Proceso completado con éxito. Registro generado en: %s", registro_path)
             resumen = _construir_resumen(processed_files, invalid_files)
             return True, registro_path, log_path, cleanup_log, deleted_count, resumen
         else:
-            print("No se encontraron archivos válidos para procesar en el manifiesto.")
+            log.info("No se encontraron archivos válidos para procesar en el manifiesto.")
             resumen = _construir_resumen(processed_files, invalid_files)
             return False, None, log_path, cleanup_log, deleted_count, resumen
     except Exception as e:
-        print(f"ERROR EN EL PROCESO: {e}")
-        import traceback
-        print(traceback.format_exc())
+        log.error("ERROR EN EL PROCESO: %s", e, exc_info=True)
+        metricas.sumar("ejecuciones_con_error")
         resumen = _construir_resumen(processed_files, invalid_files)
         return False, None, None, None, 0, resumen
     finally:
-        print("=== PROCESO FINALIZADO ===")    
+        export_run_metrics(config)
+        log.info("=== PROCESO FINALIZADO ===")    
@@ -0,0 +1,18 @@
+-- migraciones/001_WilsonOcrHash.sql
+-- Hash del último texto de OCR escrito en Maestro.extracto por expediente.
+-- Se ejecuta una sola vez contra Gestion (sql01), con un usuario con permiso
+-- de CREATE TABLE, antes de la primera ejecución del procesador:
+--   sqlcmd -S sql01 -d Gestion -E -i migraciones\001_WilsonOcrHash.sql
+-- El proceso no crea la tabla: si falta, la escritura de extractos se detiene
+-- con un error que remite a este script.
+
+IF OBJECT_ID('gestion..WilsonOcrHash') IS NULL
+    CREATE TABLE gestion..WilsonOcrHash (
+        letra VARCHAR(1) NOT NULL,
+        actuacion VARCHAR(6) NOT NULL,
+        ejercicio VARCHAR(4) NOT NULL,
+        hash CHAR(64) NOT NULL,
+        fecha DATETIME NOT NULL DEFAULT GETDATE(),
+        CONSTRAINT PK_WilsonOcrHash PRIMARY KEY (letra, actuacion, ejercicio)
+    );
+GO
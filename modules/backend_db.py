@@ -0,0 +1,422 @@
+# modules/backend_db.py
+import hashlib
+import os
+import sqlite3
+
+from modules.logs import get_logger
+
+log = get_logger("backend_db")
+
+BACKENDS = ("sqlserver", "sqlite")
+
+PREFIJO_OCR = "Reconocimiento optico de caracteres: "
+# Largo que se pasa a LEFT/substr cuando la columna extracto no tiene límite (MAX o TEXT)
+SIN_LIMITE = 2147483647
+
+
+class BackendGestion:
+    """
+    Operaciones del proceso sobre Wilson, Wilson2 y Maestro, independientes del
+    motor. Cada backend define las sentencias de su dialecto; la secuencia, los
+    lotes y el manejo de la transacción son los mismos para todos.
+    """
+
+    nombre = None
+
+    SQL_LIMPIAR = ()
+    SQL_INSERTAR_WILSON = None
+    SQL_CARGAR_WILSON2 = None
+    SQL_ALTA_MAESTRO = None
+    SQL_CREAR_TEXTOS = None
+    SQL_INSERTAR_TEXTOS = None
+    SQL_EXISTE_HASHES = None
+    SQL_LARGO_EXTRACTO = None
+    SQL_CONTAR_SIN_CAMBIOS = None
+    SQL_ACTUALIZAR_EXTRACTOS = None
+    SQL_GUARDAR_HASHES = None
+    SQL_BORRAR_TEXTOS = None
+
+    def __init__(self):
+        self._hashes_verificados = False
+        self._largo_extracto = None
+
+    def conectar(self):
+        """Devuelve una conexión con la interfaz DB-API (cursor, commit, rollback, close)."""
+        raise NotImplementedError
+
+    def _verificar_hashes(self, cursor):
+        """
+        Comprueba, una vez por backend, que exista WilsonOcrHash. El proceso no
+        crea tablas en Gestion: la crea migraciones/001_WilsonOcrHash.sql.
+        """
+        if self._hashes_verificados:
+            return
+        cursor.execute(self.SQL_EXISTE_HASHES)
+        fila = cursor.fetchone()
+        if not fila or fila[0] is None:
+            raise RuntimeError(
+                "No existe la tabla WilsonOcrHash en la base de datos. Ejecute una vez "
+                "migraciones/001_WilsonOcrHash.sql antes de procesar (ver README)."
+            )
+        self._hashes_verificados = True
+
+    def largo_extracto(self, cursor):
+        """
+        Largo de Maestro.extracto en caracteres (0 = sin límite), consultado una
+        vez por backend. El UPDATE recorta el extracto a ese largo para que una
+        fila larga no aborte el lote entero por truncamiento.
+        """
+        if self._largo_extracto is None:
+            largo = 0
+            if self.SQL_LARGO_EXTRACTO:
+                cursor.execute(self.SQL_LARGO_EXTRACTO)
+                fila = cursor.fetchone()
+                # CHARACTER_MAXIMUM_LENGTH es -1 para NVARCHAR(MAX)
+                if fila and fila[0] and fila[0] > 0:
+                    largo = int(fila[0])
+            self._largo_extracto = largo
+        return self._largo_extracto
+
+    def _preparar_carga(self, cursor):
+        """Ajustes del cursor antes de una carga masiva con executemany."""
+
+    def _preparar_carga_textos(self, cursor):
+        """Ajustes del cursor antes de cargar los textos extraídos."""
+        self._preparar_carga(cursor)
+
+    @staticmethod
+    def hash_texto(texto):
+        """SHA-256 del texto extraído, con el que se reconoce un extracto ya escrito."""
+        return hashlib.sha256((texto or '').encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _executemany_en_lotes(cursor, sql, filas, batch_size):
+        for inicio in range(0, len(filas), batch_size):
+            cursor.executemany(sql, filas[inicio:inicio + batch_size])
+
+    def registrar_en_maestro(self, connection, processed_files, batch_size=1000):
+        """
+        Carga los archivos en Wilson y Wilson2 y da de alta en Maestro los expedientes
+        que todavía no existen, todo en una única transacción: si algo falla no queda
+        nada a medias. Devuelve la cantidad de expedientes dados de alta.
+        """
+        cursor = connection.cursor()
+        try:
+            log.info("Limpiando tablas temporales...")
+            for sql in self.SQL_LIMPIAR:
+                cursor.execute(sql)
+
+            log.info(f"Insertando {len(processed_files)} registros en tabla Wilson (lotes de {batch_size})...")
+            self._preparar_carga(cursor)
+            archivos = [(f'{letra}-{actuacion}-{ejercicio}.pdf',) for letra, actuacion, ejercicio, _ in processed_files]
+            self._executemany_en_lotes(cursor, self.SQL_INSERTAR_WILSON, archivos, batch_size)
+
+            log.info("Procesando datos para tabla Wilson2...")
+            cursor.execute(self.SQL_CARGAR_WILSON2)
+
+            log.info("Actualizando tabla Maestro con nuevos registros...")
+            cursor.execute(self.SQL_ALTA_MAESTRO)
+            altas = cursor.rowcount
+            connection.commit()
+            log.info(f"Tablas Wilson, Wilson2 y Maestro actualizadas correctamente ({altas} expedientes nuevos en Maestro).")
+            return altas
+        except Exception:
+            log.error("Error al cargar Wilson/Wilson2/Maestro. Se revierte la transacción.")
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    def actualizar_extractos(self, connection, registros, batch_size=1000):
+        """
+        Actualiza el extracto de Maestro para una lista de tuplas
+        (letra, actuacion, ejercicio, texto) en una única transacción.
+
+        Los textos se cargan por lotes en una tabla temporal, junto con su hash,
+        y se aplican con un solo UPDATE ... FROM. La tabla WilsonOcrHash guarda
+        el hash del último texto escrito por expediente:
+        - mismo hash: la fila no se toca (reproceso del mismo PDF);
+        - otro hash o sin hash: si el extracto contiene el prefijo de OCR se
+          reemplaza lo que le sigue por el texto nuevo (lo anterior al prefijo
+          se conserva), si no se reemplaza por el prefijo y el texto; en ambos
+          casos se guarda el hash nuevo.
+        El extracto resultante se recorta al largo de la columna (largo_extracto).
+        La tabla WilsonOcrHash debe existir (migraciones/001_WilsonOcrHash.sql).
+        Devuelve la cantidad de filas actualizadas.
+        """
+        # Si un mismo expediente llega dos veces en el lote se conserva el último texto
+        por_clave = {(letra, actuacion, ejercicio): texto for letra, actuacion, ejercicio, texto in registros}
+        if not por_clave:
+            log.info("No hay textos para actualizar en Maestro.")
+            return 0
+
+        cursor = connection.cursor()
+        try:
+            self._verificar_hashes(cursor)
+            largo = self.largo_extracto(cursor)
+            cursor.execute(self.SQL_CREAR_TEXTOS)
+            self._preparar_carga_textos(cursor)
+            self._executemany_en_lotes(
+                cursor,
+                self.SQL_INSERTAR_TEXTOS,
+                [(*clave, texto, self.hash_texto(texto)) for clave, texto in por_clave.items()],
+                batch_size
+            )
+            log.info(f"Cargados {len(por_clave)} textos en tabla temporal")
+
+            cursor.execute(self.SQL_CONTAR_SIN_CAMBIOS)
+            sin_cambios = cursor.fetchone()[0]
+            # El largo va en la sentencia (es un entero leído de la base): el cursor de
+            # SQL Server conserva los setinputsizes de la carga de textos
+            cursor.execute(self.SQL_ACTUALIZAR_EXTRACTOS.format(largo=int(largo or SIN_LIMITE)))
+            actualizados = cursor.rowcount
+            cursor.execute(self.SQL_GUARDAR_HASHES)
+            cursor.execute(self.SQL_BORRAR_TEXTOS)
+            connection.commit()
+            recortados = sum(1 for texto in por_clave.values() if largo and len(PREFIJO_OCR) + len(texto or '') > largo)
+            if recortados:
+                log.warning("%d extractos superan los %d caracteres de Maestro.extracto y se guardaron recortados", recortados, largo)
+            if sin_cambios:
+                log.info(f"{sin_cambios} extractos sin cambios desde la última escritura (no se reescriben)")
+            log.info(f"Total de registros actualizados: {actualizados}")
+            return actualizados
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+
+
+class BackendSqlServer(BackendGestion):
+    """Gestion en SQL Server (sql01), con conexiones prestadas por un PoolConexiones."""
+
+    nombre = "sqlserver"
+
+    SQL_LIMPIAR = (
+        "TRUNCATE TABLE gestion..Wilson",
+        "TRUNCATE TABLE gestion..Wilson2",
+    )
+    SQL_INSERTAR_WILSON = "INSERT INTO gestion..Wilson (archivo) VALUES (?)"
+    SQL_CARGAR_WILSON2 = """
+        INSERT INTO Wilson2 (Letra, actuacion, ejercicio)
+        SELECT
+            SUBSTRING(archivo, 1, 1),
+            SUBSTRING(archivo, 3, 6),
+            SUBSTRING(archivo, 10, 4)
+        FROM Wilson
+    """
+    SQL_ALTA_MAESTRO = """
+        INSERT INTO [Gestion].[dbo].[Maestro]
+        ([Boca],[letra],[actuacion],[ejercicio],[apeynom],[extracto],[fech_alta],[estado],[folio],[origen_nomenc],[Subtramite])
+        SELECT
+            2, a.Letra, a.Actuacion, a.Ejercicio,
+            CASE
+                WHEN a.Letra = '1' THEN 'RESOLUCION DE PRESIDENCIA'
+                WHEN a.Letra = '2' THEN 'RESOLUCION DE DIRECTORIO'
+                ELSE 'DISPOSICION DE JUBILACIONES'
+            END,
+            'Reconocimiento optico de caracteres: ', GETDATE(), 'N', 1, 100180, 900999
+        FROM Wilson2 a
+        WHERE NOT EXISTS (
+            SELECT 1 FROM gestion..Maestro b
+            WHERE b.letra = a.letra AND b.actuacion = a.actuacion AND b.ejercicio = a.ejercicio
+        )
+    """
+    SQL_CREAR_TEXTOS = """
+        CREATE TABLE #TextoOCR (
+            letra VARCHAR(1) NOT NULL,
+            actuacion VARCHAR(6) NOT NULL,
+            ejercicio VARCHAR(4) NOT NULL,
+            texto NVARCHAR(MAX) NULL,
+            hash CHAR(64) NOT NULL
+        )
+    """
+    SQL_INSERTAR_TEXTOS = "INSERT INTO #TextoOCR (letra, actuacion, ejercicio, texto, hash) VALUES (?, ?, ?, ?, ?)"
+    SQL_EXISTE_HASHES = "SELECT OBJECT_ID('gestion..WilsonOcrHash')"
+    SQL_LARGO_EXTRACTO = """
+        SELECT CHARACTER_MAXIMUM_LENGTH
+        FROM gestion.INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_SCHEMA = 'dbo' AND TABLE_NAME = 'Maestro' AND COLUMN_NAME = 'extracto'
+    """
+    SQL_CONTAR_SIN_CAMBIOS = """
+        SELECT COUNT(*)
+        FROM #TextoOCR t
+        INNER JOIN gestion..WilsonOcrHash h
+            ON h.letra = t.letra AND h.actuacion = t.actuacion AND h.ejercicio = t.ejercicio
+        WHERE h.hash = t.hash
+    """
+    SQL_ACTUALIZAR_EXTRACTOS = """
+        UPDATE m SET extracto = LEFT(
+            CASE
+                WHEN CHARINDEX(N'Reconocimiento optico de caracteres:', m.extracto) > 0
+                    THEN LEFT(m.extracto, CHARINDEX(N'Reconocimiento optico de caracteres:', m.extracto) - 1)
+                         + N'Reconocimiento optico de caracteres: ' + t.texto
+                ELSE N'Reconocimiento optico de caracteres: ' + t.texto
+            END, {largo})
+        FROM Maestro m
+        INNER JOIN #TextoOCR t
+            ON m.letra = t.letra AND m.actuacion = t.actuacion AND m.ejercicio = t.ejercicio
+        LEFT JOIN gestion..WilsonOcrHash h
+            ON h.letra = t.letra AND h.actuacion = t.actuacion AND h.ejercicio = t.ejercicio
+        WHERE h.hash IS NULL OR h.hash <> t.hash
+    """
+    SQL_GUARDAR_HASHES = """
+        MERGE gestion..WilsonOcrHash AS h
+        USING (
+            SELECT t.letra, t.actuacion, t.ejercicio, t.hash
+            FROM #TextoOCR t
+            WHERE EXISTS (
+                SELECT 1 FROM Maestro m
+                WHERE m.letra = t.letra AND m.actuacion = t.actuacion AND m.ejercicio = t.ejercicio
+            )
+        ) AS t
+            ON h.letra = t.letra AND h.actuacion = t.actuacion AND h.ejercicio = t.ejercicio
+        WHEN MATCHED AND h.hash <> t.hash THEN
+            UPDATE SET hash = t.hash, fecha = GETDATE()
+        WHEN NOT MATCHED THEN
+            INSERT (letra, actuacion, ejercicio, hash) VALUES (t.letra, t.actuacion, t.ejercicio, t.hash);
+    """
+    SQL_BORRAR_TEXTOS = "DROP TABLE #TextoOCR"
+
+    def __init__(self, pool):
+        super().__init__()
+        self.pool = pool
+
+    def conectar(self):
+        return self.pool.obtener()
+
+    def _preparar_carga(self, cursor):
+        cursor.fast_executemany = True
+
+    def _preparar_carga_textos(self, cursor):
+        import pyodbc  # solo con SQL Server: el backend sqlite funciona sin el driver instalado
+
+        cursor.fast_executemany = True
+        # NVARCHAR(MAX) necesita tamaño 0 para que fast_executemany no trunque ni reserve buffers enormes
+        cursor.setinputsizes([
+            (pyodbc.SQL_VARCHAR, 1, 0),
+            (pyodbc.SQL_VARCHAR, 6, 0),
+            (pyodbc.SQL_VARCHAR, 4, 0),
+            (pyodbc.SQL_WVARCHAR, 0, 0),
+            (pyodbc.SQL_VARCHAR, 64, 0),
+        ])
+
+
+class BackendSqlite(BackendGestion):
+    """
+    Réplica local de Wilson, Wilson2 y Maestro en un archivo SQLite, con la
+    misma semántica que en Gestion: alta en Maestro solo de los expedientes
+    nuevos y la misma regla de escritura del extracto (con WilsonOcrHash). Sirve para probar
+    y medir el proceso en una notebook sin tocar sql01.
+    """
+
+    nombre = "sqlite"
+
+    ESQUEMA = """
+        CREATE TABLE IF NOT EXISTS Wilson (archivo TEXT);
+        CREATE TABLE IF NOT EXISTS Wilson2 (Letra TEXT, actuacion TEXT, ejercicio TEXT);
+        CREATE TABLE IF NOT EXISTS Maestro (
+            Boca INTEGER, letra TEXT, actuacion TEXT, ejercicio TEXT, apeynom TEXT,
+            extracto TEXT, fech_alta TEXT, estado TEXT, folio INTEGER,
+            origen_nomenc INTEGER, Subtramite INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS idx_maestro_clave ON Maestro (letra, actuacion, ejercicio);
+        CREATE TABLE IF NOT EXISTS WilsonOcrHash (
+            letra TEXT NOT NULL,
+            actuacion TEXT NOT NULL,
+            ejercicio TEXT NOT NULL,
+            hash TEXT NOT NULL,
+            fecha TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (letra, actuacion, ejercicio)
+        );
+    """
+
+    SQL_LIMPIAR = (
+        "DELETE FROM Wilson",
+        "DELETE FROM Wilson2",
+    )
+    SQL_INSERTAR_WILSON = "INSERT INTO Wilson (archivo) VALUES (?)"
+    SQL_CARGAR_WILSON2 = """
+        INSERT INTO Wilson2 (Letra, actuacion, ejercicio)
+        SELECT substr(archivo, 1, 1), substr(archivo, 3, 6), substr(archivo, 10, 4)
+        FROM Wilson
+    """
+    SQL_ALTA_MAESTRO = """
+        INSERT INTO Maestro
+        (Boca, letra, actuacion, ejercicio, apeynom, extracto, fech_alta, estado, folio, origen_nomenc, Subtramite)
+        SELECT
+            2, a.Letra, a.actuacion, a.ejercicio,
+            CASE
+                WHEN a.Letra = '1' THEN 'RESOLUCION DE PRESIDENCIA'
+                WHEN a.Letra = '2' THEN 'RESOLUCION DE DIRECTORIO'
+                ELSE 'DISPOSICION DE JUBILACIONES'
+            END,
+            'Reconocimiento optico de caracteres: ', CURRENT_TIMESTAMP, 'N', 1, 100180, 900999
+        FROM Wilson2 a
+        WHERE NOT EXISTS (
+            SELECT 1 FROM Maestro b
+            WHERE b.letra = a.Letra AND b.actuacion = a.actuacion AND b.ejercicio = a.ejercicio
+        )
+    """
+    SQL_CREAR_TEXTOS = """
+        CREATE TEMP TABLE TextoOCR (
+            letra TEXT NOT NULL,
+            actuacion TEXT NOT NULL,
+            ejercicio TEXT NOT NULL,
+            texto TEXT,
+            hash TEXT NOT NULL
+        )
+    """
+    SQL_INSERTAR_TEXTOS = "INSERT INTO TextoOCR (letra, actuacion, ejercicio, texto, hash) VALUES (?, ?, ?, ?, ?)"
+    SQL_EXISTE_HASHES = "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'WilsonOcrHash'"
+    SQL_CONTAR_SIN_CAMBIOS = """
+        SELECT COUNT(*)
+        FROM TextoOCR t
+        INNER JOIN WilsonOcrHash h
+            ON h.letra = t.letra AND h.actuacion = t.actuacion AND h.ejercicio = t.ejercicio
+        WHERE h.hash = t.hash
+    """
+    SQL_ACTUALIZAR_EXTRACTOS = """
+        UPDATE Maestro SET extracto = substr(
+            CASE
+                WHEN instr(Maestro.extracto, 'Reconocimiento optico de caracteres:') > 0
+                    THEN substr(Maestro.extracto, 1, instr(Maestro.extracto, 'Reconocimiento optico de caracteres:') - 1)
+                         || 'Reconocimiento optico de caracteres: ' || t.texto
+                ELSE 'Reconocimiento optico de caracteres: ' || t.texto
+            END, 1, {largo})
+        FROM TextoOCR t
+        LEFT JOIN WilsonOcrHash h
+            ON h.letra = t.letra AND h.actuacion = t.actuacion AND h.ejercicio = t.ejercicio
+        WHERE Maestro.letra = t.letra AND Maestro.actuacion = t.actuacion AND Maestro.ejercicio = t.ejercicio
+            AND (h.hash IS NULL OR h.hash <> t.hash)
+    """
+    SQL_GUARDAR_HASHES = """
+        INSERT INTO WilsonOcrHash (letra, actuacion, ejercicio, hash)
+        SELECT t.letra, t.actuacion, t.ejercicio, t.hash
+        FROM TextoOCR t
+        WHERE EXISTS (
+            SELECT 1 FROM Maestro m
+            WHERE m.letra = t.letra AND m.actuacion = t.actuacion AND m.ejercicio = t.ejercicio
+        )
+        ON CONFLICT (letra, actuacion, ejercicio) DO UPDATE
+            SET hash = excluded.hash, fecha = CURRENT_TIMESTAMP
+            WHERE WilsonOcrHash.hash <> excluded.hash
+    """
+    SQL_BORRAR_TEXTOS = "DROP TABLE TextoOCR"
+
+    def __init__(self, ruta_db):
+        super().__init__()
+        self.ruta_db = str(ruta_db)
+
+    def conectar(self):
+        # La carpeta se crea en cada conexión: el backend sobrevive entre ejecuciones
+        # y la carpeta puede haberse borrado entre una y otra
+        carpeta = os.path.dirname(self.ruta_db)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+        # El proceso puede abrir la conexión en un hilo y usarla en otro (modos streaming y asyncio)
+        conn = sqlite3.connect(self.ruta_db, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(self.ESQUEMA)
+        conn.commit()
+        return conn
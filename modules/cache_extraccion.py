@@ -0,0 +1,106 @@
+# modules/cache_extraccion.py
+import hashlib
+import os
+import sqlite3
+import time
+import zlib
+
+
+class CacheExtraccion:
+    """
+    Caché persistente del texto extraído de los PDFs, indexada por el
+    SHA-256 del contenido del archivo. Un PDF idéntico a uno ya procesado
+    (por ejemplo al reejecutar un lote que falló en la base de datos) se
+    resuelve con una consulta por clave primaria, sin volver a PyPDF2.
+    """
+
+    def __init__(self, ruta_db, dias_retencion=60, max_mb=0, variante=None):
+        self.ruta_db = str(ruta_db)
+        # Distingue textos del mismo archivo extraídos con otras opciones (p. ej. largo máximo)
+        self.variante = variante
+        self.dias_retencion = dias_retencion
+        self.max_bytes = int(max_mb or 0) * 1024 * 1024
+
+        os.makedirs(os.path.dirname(self.ruta_db), exist_ok=True)
+        self.conn = sqlite3.connect(self.ruta_db)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS textos (
+                sha256 TEXT PRIMARY KEY,
+                texto BLOB NOT NULL,
+                tamano INTEGER NOT NULL,
+                ultimo_uso REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_textos_ultimo_uso ON textos (ultimo_uso)")
+        self.conn.commit()
+
+    @staticmethod
+    def hash_archivo(ruta, tamano_bloque=1024 * 1024):
+        """Calcula el SHA-256 del contenido de un archivo leyendo por bloques."""
+        sha = hashlib.sha256()
+        with open(ruta, 'rb') as f:
+            for bloque in iter(lambda: f.read(tamano_bloque), b''):
+                sha.update(bloque)
+        return sha.hexdigest()
+
+    def _clave(self, sha256):
+        return f"{sha256}:{self.variante}" if self.variante else sha256
+
+    def obtener(self, sha256):
+        """Devuelve el texto guardado para el hash, o None si no está en caché."""
+        sha256 = self._clave(sha256)
+        fila = self.conn.execute("SELECT texto FROM textos WHERE sha256 = ?", (sha256,)).fetchone()
+        if fila is None:
+            return None
+        self.conn.execute("UPDATE textos SET ultimo_uso = ? WHERE sha256 = ?", (time.time(), sha256))
+        # Confirmar enseguida para no retener el bloqueo de escritura (otros hilos pueden usar la caché)
+        self.conn.commit()
+        return zlib.decompress(fila[0]).decode('utf-8')
+
+    def guardar(self, sha256, texto):
+        """Guarda (o reemplaza) el texto extraído para el hash."""
+        sha256 = self._clave(sha256)
+        comprimido = zlib.compress(texto.encode('utf-8'))
+        self.conn.execute(
+            "INSERT OR REPLACE INTO textos (sha256, texto, tamano, ultimo_uso) VALUES (?, ?, ?, ?)",
+            (sha256, comprimido, len(comprimido), time.time())
+        )
+        self.conn.commit()
+
+    def purgar(self):
+        """
+        Elimina las entradas sin uso en los últimos dias_retencion días y, si hay
+        un tamaño máximo configurado, las menos usadas hasta quedar por debajo.
+        Devuelve la cantidad de entradas eliminadas.
+        """
+        limite = time.time() - self.dias_retencion * 86400
+        eliminadas = self.conn.execute("DELETE FROM textos WHERE ultimo_uso < ?", (limite,)).rowcount
+
+        if self.max_bytes:
+            total = self.conn.execute("SELECT COALESCE(SUM(tamano), 0) FROM textos").fetchone()[0]
+            if total > self.max_bytes:
+                a_eliminar = []
+                for sha256, tamano in self.conn.execute("SELECT sha256, tamano FROM textos ORDER BY ultimo_uso"):
+                    if total <= self.max_bytes:
+                        break
+                    a_eliminar.append((sha256,))
+                    total -= tamano
+                self.conn.executemany("DELETE FROM textos WHERE sha256 = ?", a_eliminar)
+                eliminadas += len(a_eliminar)
+
+        self.conn.commit()
+        if eliminadas:
+            self.conn.execute("VACUUM")
+        return eliminadas
+
+    def cerrar(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cerrar()
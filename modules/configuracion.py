@@ -0,0 +1,70 @@
+# modules/configuracion.py
+import json
+import os
+
+from modules.logs import get_logger
+
+log = get_logger("configuracion")
+
+# Raíz del proyecto (donde están main.py y config.json), también dentro del ejecutable de PyInstaller
+DIRECTORIO_PROYECTO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_config(config_path=None):
+    """Carga la configuración desde el archivo JSON (por defecto, config.json junto a main.py)"""
+    try:
+        if config_path is None:
+            config_path = os.path.join(DIRECTORIO_PROYECTO, 'config.json')
+        with open(config_path, 'r') as f:
+            return json.load(f)
+    except Exception as e:
+        # Si hay un error, devuelve la configuración predeterminada
+        log.error(f"Error al cargar la configuración: {e}")
+        return {
+            "temp_dir": "C:\\Temp",
+            "processed_dir": "C:\\Temp\\Procesados",
+            "backup_dir": "C:\\Temp\\Procesados\\PDFs_BK",
+            "source_dir": "\\\\fs01\\Resoluciones_Temp",
+            "target_dir": "\\\\fs01\\Resoluciones",
+            "cleanup_days": 60,
+            "extraction_workers": 0,
+            "db_batch_size": 1000,
+            "extraction_cache": True,
+            "extraction_cache_max_mb": 512,
+            "copy_workers": 8,
+            "copy_buffer_kb": 1024,
+            "copy_verify": "tamano",
+            "copy_retries": 3,
+            "pipeline_mode": "etapas",
+            "stream_queue_size": 64,
+            "stream_flush_seconds": 2,
+            "async_timeout_seconds": 0,
+            "extraction_timeout_seconds": 0,
+            "extracto_max_chars": 0,
+            "page_split_threshold": 200,
+            "page_split_min_mb": 1,
+            "db_backend": "sqlserver",
+            "db_sqlite_path": "",
+            "db_server": "sql01",
+            "db_database": "Gestion",
+            "db_pool_size": 4,
+            "db_health_check_seconds": 30,
+            "metrics_export": True,
+            "metrics_prometheus_file": "",
+            "log_level": "INFO",
+            "log_format": "texto",
+            "log_file": "",
+            "journal_enabled": True,
+            "journal_resume": False,
+            "search_index": True,
+            "search_index_path": "",
+            "ocr_enabled": True,
+            "ocr_workers": 2,
+            "ocr_language": "spa",
+            "ocr_page_cache": True,
+            "watch_mode": "auto",
+            "watch_interval_seconds": 30,
+            "watch_stable_seconds": 5,
+            "watch_debounce_seconds": 2,
+            "watch_batch_size": 200
+        }
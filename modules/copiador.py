@@ -0,0 +1,91 @@
+# modules/copiador.py
+import hashlib
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from modules.logs import get_logger
+
+log = get_logger("copiador")
+
+VERIFICACIONES = ("ninguna", "tamano", "hash")
+
+
+def _hash_archivo(ruta, buffer_bytes):
+    sha = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(buffer_bytes), b''):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+def copiar_archivo(origen, destino, buffer_bytes=1024 * 1024, verificacion="tamano"):
+    """
+    Copia un archivo con un buffer grande (menos idas y vueltas sobre SMB),
+    conserva fechas y permisos como shutil.copy2 y opcionalmente verifica el
+    resultado. Devuelve el SHA-256 del contenido copiado, calculado al vuelo.
+    """
+    sha = hashlib.sha256()
+    with open(origen, 'rb') as fsrc, open(destino, 'wb') as fdst:
+        for bloque in iter(lambda: fsrc.read(buffer_bytes), b''):
+            sha.update(bloque)
+            fdst.write(bloque)
+    shutil.copystat(origen, destino)
+
+    if verificacion == "tamano":
+        tamano_origen = os.path.getsize(origen)
+        tamano_destino = os.path.getsize(destino)
+        if tamano_origen != tamano_destino:
+            raise IOError(f"La copia de {origen} quedó incompleta ({tamano_destino} de {tamano_origen} bytes)")
+    elif verificacion == "hash":
+        if _hash_archivo(destino, buffer_bytes) != sha.hexdigest():
+            raise IOError(f"El hash de la copia {destino} no coincide con el de {origen}")
+
+    return sha.hexdigest()
+
+
+def copiar_con_reintentos(origen, destino, buffer_bytes=1024 * 1024, verificacion="tamano", reintentos=3, espera=0.5):
+    """Copia un archivo reintentando ante errores de E/S con espera exponencial (0.5s, 1s, 2s, ...)."""
+    for intento in range(reintentos + 1):
+        try:
+            return copiar_archivo(origen, destino, buffer_bytes, verificacion)
+        except OSError as e:
+            if intento == reintentos:
+                # No dejar copias a medio escribir en el destino
+                try:
+                    os.unlink(destino)
+                except OSError:
+                    pass
+                raise
+            demora = espera * (2 ** intento)
+            log.warning(f"Error al copiar {origen} (intento {intento + 1}/{reintentos + 1}): {e}. Reintentando en {demora:.1f}s...")
+            time.sleep(demora)
+
+
+def copiar_en_paralelo(pares, workers=8, buffer_kb=1024, verificacion="tamano", reintentos=3):
+    """
+    Copia una lista de pares (origen, destino) con un pool acotado de hilos.
+    Genera tuplas (origen, destino, sha256, error) a medida que cada copia
+    termina; un error en un archivo no interrumpe las demás copias.
+    """
+    if verificacion not in VERIFICACIONES:
+        raise ValueError(f"Verificación de copia desconocida: '{verificacion}' (opciones: {', '.join(VERIFICACIONES)})")
+
+    pares = list(pares)
+    if not pares:
+        return
+    buffer_bytes = max(64, int(buffer_kb)) * 1024
+    workers = max(1, min(int(workers), len(pares)))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(copiar_con_reintentos, origen, destino, buffer_bytes, verificacion, reintentos): (origen, destino)
+            for origen, destino in pares
+        }
+        for future in as_completed(futures):
+            origen, destino = futures[future]
+            try:
+                yield origen, destino, future.result(), None
+            except Exception as e:
+                yield origen, destino, None, e
@@ -0,0 +1,171 @@
+# modules/db_conexion.py
+import json
+import os
+import queue
+import threading
+import time
+
+import pyodbc
+
+from modules.logs import get_logger
+
+log = get_logger("db_conexion")
+
+DRIVERS = [
+    "SQL Server Native Client 11.0",
+    "SQL Server",
+    "SQL Server Native Client 10.0"
+]
+
+
+class ConexionPool:
+    """
+    Conexión prestada por un PoolConexiones. Se usa igual que una conexión de
+    pyodbc; close() la devuelve al pool en lugar de cerrarla.
+    """
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def __getattr__(self, nombre):
+        if self._conn is None:
+            raise pyodbc.ProgrammingError("La conexión ya fue devuelta al pool.")
+        return getattr(self._conn, nombre)
+
+    def close(self):
+        if self._conn is not None:
+            self._pool.devolver(self._conn)
+            self._conn = None
+
+
+class PoolConexiones:
+    """
+    Pool de conexiones a SQL Server con caché del driver ODBC.
+
+    El último driver que funcionó se guarda en disco y se prueba primero, así
+    las máquinas sin Native Client 11.0 no pagan un intento fallido por cada
+    driver ausente en cada ejecución. Las conexiones ociosas se reutilizan; si
+    pasaron más de segundos_salud sin usarse se verifican con un SELECT 1 y se
+    reconectan si el servidor las cerró.
+    """
+
+    def __init__(self, server, database, ruta_cache_driver=None, tamano=4, segundos_salud=30, drivers=None):
+        self.server = server
+        self.database = database
+        self.ruta_cache_driver = str(ruta_cache_driver) if ruta_cache_driver else None
+        self.tamano = max(1, int(tamano))
+        self.segundos_salud = segundos_salud
+        self.drivers = list(drivers or DRIVERS)
+        self._libres = queue.LifoQueue()
+        self._creadas = 0
+        self._lock = threading.Lock()
+        self._driver = self._leer_driver_cacheado()
+
+    def _leer_driver_cacheado(self):
+        if not self.ruta_cache_driver or not os.path.exists(self.ruta_cache_driver):
+            return None
+        try:
+            with open(self.ruta_cache_driver, 'r', encoding='utf-8') as f:
+                return json.load(f).get("driver")
+        except Exception:
+            return None
+
+    def _guardar_driver(self, driver):
+        self._driver = driver
+        if not self.ruta_cache_driver:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.ruta_cache_driver), exist_ok=True)
+            with open(self.ruta_cache_driver, 'w', encoding='utf-8') as f:
+                json.dump({"driver": driver, "server": self.server}, f, indent=4)
+        except Exception as e:
+            log.warning(f"Advertencia: no se pudo guardar el driver ODBC en caché: {e}")
+
+    def _conectar(self):
+        # Primero el driver que funcionó la última vez, luego el resto en el orden habitual
+        candidatos = [self._driver] if self._driver in self.drivers else []
+        candidatos += [driver for driver in self.drivers if driver not in candidatos]
+        for driver in candidatos:
+            try:
+                conn = pyodbc.connect(
+                    f'DRIVER={{{driver}}};'
+                    f'SERVER={self.server};'
+                    f'DATABASE={self.database};'
+                    f'Trusted_Connection=yes;'
+                )
+                log.info(f"Conexión exitosa con el driver: {driver}")
+                if driver != self._driver:
+                    self._guardar_driver(driver)
+                return conn
+            except pyodbc.Error:
+                log.warning(f"No se pudo conectar con el driver: {driver}. Intentando con el siguiente...")
+                continue
+        raise Exception("No se pudo conectar a la base de datos con ninguno de los drivers disponibles.")
+
+    def _esta_sana(self, conn):
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            cursor.close()
+            return True
+        except pyodbc.Error:
+            return False
+
+    def _descartar(self, conn):
+        try:
+            conn.close()
+        except pyodbc.Error:
+            pass
+        with self._lock:
+            self._creadas -= 1
+
+    def obtener(self, timeout=None):
+        """
+        Presta una conexión: reutiliza una ociosa (verificándola si estuvo mucho
+        tiempo sin uso), crea una nueva si no se llegó al tamaño del pool, o
+        espera a que otro hilo devuelva una.
+        """
+        while True:
+            try:
+                conn, devuelta = self._libres.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    crear = self._creadas < self.tamano
+                    if crear:
+                        self._creadas += 1
+                if crear:
+                    try:
+                        return ConexionPool(self, self._conectar())
+                    except Exception:
+                        with self._lock:
+                            self._creadas -= 1
+                        raise
+                try:
+                    conn, devuelta = self._libres.get(timeout=timeout)
+                except queue.Empty:
+                    raise Exception(f"No hay conexiones libres en el pool después de {timeout} segundos.")
+
+            if time.monotonic() - devuelta < self.segundos_salud or self._esta_sana(conn):
+                return ConexionPool(self, conn)
+            log.warning("Conexión ociosa cerrada por el servidor. Reconectando...")
+            self._descartar(conn)
+
+    def devolver(self, conn):
+        """Devuelve una conexión al pool, descartando cualquier transacción pendiente."""
+        try:
+            conn.rollback()
+        except pyodbc.Error:
+            self._descartar(conn)
+            return
+        self._libres.put((conn, time.monotonic()))
+
+    def cerrar_todas(self):
+        """Cierra las conexiones ociosas del pool."""
+        while True:
+            try:
+                conn, _ = self._libres.get_nowait()
+            except queue.Empty:
+                break
+            self._descartar(conn)
@@ -0,0 +1,107 @@
+# modules/diario.py
+import glob
+import json
+import os
+import threading
+from datetime import datetime
+
+from modules.logs import get_logger
+
+log = get_logger("diario")
+
+# Pasos que se registran por archivo, en el orden en que los recorre
+ESTADOS = ("copiado", "validado", "extraido", "escrito", "movido")
+
+
+class DiarioEjecucion:
+    """
+    Diario de una ejecución en JSONL de solo agregado: una línea por archivo y
+    paso terminado (copiado, validado, extraido, escrito, movido), más una línea
+    de inicio y otra de fin. Se suscribe a los eventos de modules/progreso.py y
+    cada línea se vuelca al sistema operativo apenas se escribe, así un corte
+    del proceso no pierde lo ya registrado. Un diario sin línea de fin
+    corresponde a una ejecución que no terminó y se puede retomar.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = str(ruta)
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+        self._archivo = open(self.ruta, 'a', encoding='utf-8')
+
+    @classmethod
+    def nuevo(cls, directorio, modo=None):
+        ruta = os.path.join(directorio, f"diario_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.jsonl")
+        diario = cls(ruta)
+        diario._escribir({"evento": "inicio", "modo": modo})
+        return diario
+
+    @classmethod
+    def retomar(cls, ruta):
+        diario = cls(ruta)
+        diario._escribir({"evento": "reanudacion"})
+        return diario
+
+    @staticmethod
+    def pendientes(directorio):
+        """Diarios sin línea de fin (ejecuciones cortadas), del más viejo al más nuevo."""
+        return [ruta for ruta in sorted(glob.glob(os.path.join(directorio, "diario_*.jsonl")))
+                if not DiarioEjecucion.leer(ruta)[1]]
+
+    @staticmethod
+    def leer(ruta):
+        """
+        Devuelve ({archivo: pasos terminados}, terminado). Una última línea a
+        medio escribir (corte durante la escritura) se ignora.
+        """
+        estados = {}
+        terminado = False
+        with open(ruta, 'r', encoding='utf-8') as f:
+            for linea in f:
+                try:
+                    datos = json.loads(linea)
+                except ValueError:
+                    continue
+                if datos.get("evento") == "fin":
+                    terminado = True
+                elif datos.get("estado") in ESTADOS:
+                    estados.setdefault(datos["archivo"], set()).add(datos["estado"])
+        return estados, terminado
+
+    def _escribir(self, datos):
+        datos = {"fecha": datetime.now().isoformat(timespec="seconds"), **datos}
+        with self._lock:
+            if self._archivo is None:
+                return
+            self._archivo.write(json.dumps(datos, ensure_ascii=False) + "\n")
+            self._archivo.flush()
+
+    def __call__(self, evento, cantidad=1, bytes_=0, archivos=()):
+        if evento not in ESTADOS or not archivos:
+            return
+        fecha = datetime.now().isoformat(timespec="seconds")
+        lineas = "".join(
+            json.dumps({"fecha": fecha, "archivo": archivo, "estado": evento}, ensure_ascii=False) + "\n"
+            for archivo in archivos
+        )
+        with self._lock:
+            if self._archivo is None:
+                return
+            self._archivo.write(lineas)
+            self._archivo.flush()
+
+    def cerrar(self, estado="completo"):
+        """Escribe la línea de fin (estado: completo o descartado) y cierra el archivo."""
+        self._escribir({"evento": "fin", "estado": estado})
+        self._cerrar_archivo()
+
+    def abandonar(self):
+        """Cierra el archivo sin línea de fin: la ejecución queda pendiente de retomar."""
+        self._cerrar_archivo()
+
+    def _cerrar_archivo(self):
+        with self._lock:
+            if self._archivo is not None:
+                os.fsync(self._archivo.fileno())
+                self._archivo.close()
+                self._archivo = None
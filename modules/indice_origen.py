@@ -0,0 +1,115 @@
+# modules/indice_origen.py
+import json
+import os
+from datetime import datetime
+
+from modules.logs import get_logger
+
+log = get_logger("indice_origen")
+
+
+class IndiceOrigen:
+    """
+    Índice persistente del directorio de origen (source_dir).
+
+    Guarda por cada PDF encontrado su tamaño, fecha de modificación, hash y
+    copia temporal, de modo que copy_files solo copie los archivos nuevos o
+    modificados y clean_and_move_files reutilice el mismo escaneo en lugar
+    de volver a recorrer el recurso de red.
+    """
+
+    def __init__(self, ruta_json):
+        self.ruta_json = str(ruta_json)
+        self.archivos = {}
+        self.directorios_vacios = []
+        self.fecha_escaneo = None
+        self.cargar()
+
+    def cargar(self):
+        if not os.path.exists(self.ruta_json):
+            return
+        try:
+            with open(self.ruta_json, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+            self.archivos = datos.get("archivos", {})
+            self.directorios_vacios = datos.get("directorios_vacios", [])
+            self.fecha_escaneo = datos.get("fecha_escaneo")
+        except Exception as e:
+            # Un índice dañado no debe frenar el proceso: se reconstruye en el próximo escaneo
+            log.warning(f"Advertencia: no se pudo leer el índice de origen {self.ruta_json}: {e}")
+            self.archivos = {}
+            self.directorios_vacios = []
+
+    def guardar(self):
+        os.makedirs(os.path.dirname(self.ruta_json), exist_ok=True)
+        tmp_path = f"{self.ruta_json}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "fecha_escaneo": self.fecha_escaneo,
+                "archivos": self.archivos,
+                "directorios_vacios": self.directorios_vacios,
+            }, f, indent=4)
+        os.replace(tmp_path, self.ruta_json)
+
+    def escanear(self, source_dir):
+        """
+        Recorre source_dir una sola vez con os.scandir (en Windows el tamaño y la
+        fecha vienen en el mismo listado, sin un stat extra por archivo).
+        Devuelve la lista de (ruta, tamano, mtime_ns) de los PDFs encontrados y
+        descarta del índice los archivos que ya no están en el origen.
+        """
+        encontrados = []
+        vacios = []
+        pendientes = [str(source_dir)]
+        while pendientes:
+            directorio = pendientes.pop()
+            try:
+                with os.scandir(directorio) as entradas:
+                    hay_contenido = False
+                    for entrada in entradas:
+                        hay_contenido = True
+                        if entrada.is_dir(follow_symlinks=False):
+                            pendientes.append(entrada.path)
+                        elif entrada.is_file() and entrada.name.lower().endswith('.pdf'):
+                            st = entrada.stat()
+                            encontrados.append((entrada.path, st.st_size, st.st_mtime_ns))
+                    if not hay_contenido and directorio != str(source_dir):
+                        vacios.append(directorio)
+            except OSError as e:
+                log.error(f"Error al listar el directorio {directorio}: {e}")
+
+        # Se conservan los datos de copia de los archivos que siguen en el origen
+        self.archivos = {ruta: self.archivos.get(ruta, {}) for ruta, _, _ in encontrados}
+        self.directorios_vacios = vacios
+        self.fecha_escaneo = datetime.now().isoformat(timespec='seconds')
+        return encontrados
+
+    def sin_cambios(self, ruta, tamano, mtime_ns, destino):
+        """
+        Indica si el archivo de origen es el mismo que se copió en una ejecución
+        anterior y su copia temporal sigue intacta en destino.
+        """
+        datos = self.archivos.get(ruta)
+        if not datos or datos.get("tamano") != tamano or datos.get("mtime_ns") != mtime_ns:
+            return False
+        if datos.get("copia") != str(destino):
+            return False
+        try:
+            st = os.stat(destino)
+        except OSError:
+            return False
+        return st.st_size == tamano and st.st_mtime_ns == datos.get("copia_mtime_ns")
+
+    def registrar(self, ruta, tamano, mtime_ns, destino, sha256):
+        """Registra la copia temporal de un archivo de origen."""
+        self.archivos[ruta] = {
+            "tamano": tamano,
+            "mtime_ns": mtime_ns,
+            "sha256": sha256,
+            "copia": str(destino),
+            "copia_mtime_ns": os.stat(destino).st_mtime_ns,
+        }
+
+    def rutas(self):
+        """Rutas de los PDFs de origen según el último escaneo."""
+        return list(self.archivos)
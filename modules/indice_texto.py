@@ -0,0 +1,148 @@
+# modules/indice_texto.py
+import hashlib
+import os
+import sqlite3
+from datetime import datetime
+
+from modules.logs import get_logger
+
+log = get_logger("indice_texto")
+
+
+def consulta_frase(texto):
+    """Arma una consulta FTS5 que busca el texto como frase exacta (sin operadores)."""
+    return '"' + texto.replace('"', '""') + '"'
+
+
+class IndiceTexto:
+    """
+    Índice local de búsqueda de texto completo (SQLite FTS5) sobre el texto
+    extraído de cada resolución, por expediente (letra, actuacion, ejercicio).
+
+    El proceso lo actualiza de forma incremental al escribir los extractos en
+    Maestro: un expediente con el mismo texto que la vez anterior no se toca y
+    uno con texto nuevo reemplaza al anterior. Las búsquedas se resuelven en
+    este archivo, ordenadas por relevancia (bm25) y con un fragmento del texto
+    alrededor de las coincidencias, sin recorrer Maestro.extracto en sql01.
+    """
+
+    ESQUEMA = """
+        CREATE TABLE IF NOT EXISTS expedientes (
+            id INTEGER PRIMARY KEY,
+            letra TEXT NOT NULL,
+            actuacion TEXT NOT NULL,
+            ejercicio TEXT NOT NULL,
+            hash TEXT NOT NULL,
+            actualizado TEXT NOT NULL,
+            UNIQUE (letra, actuacion, ejercicio)
+        );
+        CREATE VIRTUAL TABLE IF NOT EXISTS resoluciones USING fts5(
+            letra UNINDEXED,
+            actuacion UNINDEXED,
+            ejercicio UNINDEXED,
+            texto,
+            tokenize = 'unicode61 remove_diacritics 2'
+        );
+    """
+
+    def __init__(self, ruta_db):
+        self.ruta_db = str(ruta_db)
+        carpeta = os.path.dirname(self.ruta_db)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+        self.conn = sqlite3.connect(self.ruta_db)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.ESQUEMA)
+        self.conn.commit()
+
+    def actualizar(self, registros):
+        """
+        Indexa una lista de tuplas (letra, actuacion, ejercicio, texto) en una
+        transacción. Devuelve la cantidad de expedientes agregados o reemplazados.
+        """
+        # Si un mismo expediente llega dos veces se conserva el último texto, como en Maestro
+        por_clave = {(letra, actuacion, ejercicio): texto for letra, actuacion, ejercicio, texto in registros
+                     if texto is not None}
+        actualizado = datetime.now().isoformat(timespec="seconds")
+        cambios = 0
+        with self.conn:
+            for (letra, actuacion, ejercicio), texto in por_clave.items():
+                sha256 = hashlib.sha256(texto.encode('utf-8')).hexdigest()
+                fila = self.conn.execute(
+                    "SELECT id, hash FROM expedientes WHERE letra = ? AND actuacion = ? AND ejercicio = ?",
+                    (letra, actuacion, ejercicio)
+                ).fetchone()
+                if fila is not None and fila[1] == sha256:
+                    continue
+                if fila is None:
+                    id_ = self.conn.execute(
+                        "INSERT INTO expedientes (letra, actuacion, ejercicio, hash, actualizado) VALUES (?, ?, ?, ?, ?)",
+                        (letra, actuacion, ejercicio, sha256, actualizado)
+                    ).lastrowid
+                else:
+                    id_ = fila[0]
+                    self.conn.execute("UPDATE expedientes SET hash = ?, actualizado = ? WHERE id = ?",
+                                      (sha256, actualizado, id_))
+                    self.conn.execute("DELETE FROM resoluciones WHERE rowid = ?", (id_,))
+                self.conn.execute(
+                    "INSERT INTO resoluciones (rowid, letra, actuacion, ejercicio, texto) VALUES (?, ?, ?, ?, ?)",
+                    (id_, letra, actuacion, ejercicio, texto)
+                )
+                cambios += 1
+        return cambios
+
+    def buscar(self, consulta, limite=20, ejercicio=None, letra=None):
+        """
+        Busca con la sintaxis de FTS5 (palabras, "frases exactas", OR, NOT,
+        prefijo*; ver consulta_frase) y devuelve hasta limite resultados, del
+        más relevante al menos relevante, como diccionarios con letra,
+        actuacion, ejercicio, archivo, puntaje y fragmento. Los acentos y las
+        mayúsculas no cuentan. Una consulta mal formada lanza ValueError.
+        """
+        filtros = ""
+        parametros = [consulta]
+        if ejercicio:
+            filtros += " AND ejercicio = ?"
+            parametros.append(str(ejercicio))
+        if letra:
+            filtros += " AND letra = ?"
+            parametros.append(str(letra))
+        parametros.append(max(1, int(limite)))
+        try:
+            filas = self.conn.execute(f"""
+                SELECT letra, actuacion, ejercicio, bm25(resoluciones),
+                       snippet(resoluciones, 3, '[', ']', '…', 16)
+                FROM resoluciones
+                WHERE resoluciones MATCH ?{filtros}
+                ORDER BY rank
+                LIMIT ?
+            """, parametros).fetchall()
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Consulta de búsqueda inválida: {consulta!r} ({e})") from e
+        return [
+            {
+                "letra": letra_,
+                "actuacion": actuacion,
+                "ejercicio": ejercicio_,
+                "archivo": f"{letra_}-{actuacion}-{ejercicio_}.pdf",
+                # bm25 da valores negativos: cuanto más bajo, más relevante
+                "puntaje": round(-puntaje, 4),
+                "fragmento": fragmento,
+            }
+            for letra_, actuacion, ejercicio_, puntaje, fragmento in filas
+        ]
+
+    def cantidad(self):
+        """Cantidad de expedientes indexados."""
+        return self.conn.execute("SELECT COUNT(*) FROM expedientes").fetchone()[0]
+
+    def cerrar(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cerrar()
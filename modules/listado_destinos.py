@@ -0,0 +1,83 @@
+# modules/listado_destinos.py
+import os
+import threading
+
+from modules.logs import get_logger
+
+log = get_logger("listado_destinos")
+
+
+class ListadoDestinos:
+    """
+    Listado en memoria de las carpetas de destino (backup_dir y cada
+    target_dir/<ejercicio>) durante una ejecución.
+
+    Cada carpeta se crea y se lista una sola vez con os.scandir; después los
+    nombres ocupados se resuelven contra ese listado en lugar de preguntar
+    exists() por cada candidato (_1, _2, ...) sobre el recurso de red. Cada
+    nombre que se entrega queda reservado, así dos archivos de la misma
+    ejecución nunca reciben el mismo destino. La comparación no distingue
+    mayúsculas, como el sistema de archivos de Windows.
+    Es seguro entre hilos. Lo que otro proceso escriba en esas carpetas
+    mientras dura la ejecución no se ve: el listado vale para una ejecución.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._nombres = {}          # carpeta -> nombres ocupados o reservados (en minúsculas)
+        self._sin_listado = set()   # carpetas que no se pudieron listar
+        self._locks_carpeta = {}    # carpeta -> lock de su primer listado
+
+    def _listar(self, directorio):
+        """
+        Crea y lista la carpeta la primera vez que se la pide. El disco se
+        consulta fuera del lock general: mientras se lista una carpeta solo
+        esperan los hilos que piden esa misma carpeta. Devuelve (nombres, listada).
+        """
+        clave = os.path.normcase(os.path.abspath(directorio))
+        with self._lock:
+            if clave in self._nombres:
+                return self._nombres[clave], clave not in self._sin_listado
+            lock_carpeta = self._locks_carpeta.setdefault(clave, threading.Lock())
+        with lock_carpeta:
+            with self._lock:
+                if clave in self._nombres:
+                    return self._nombres[clave], clave not in self._sin_listado
+            os.makedirs(directorio, exist_ok=True)
+            try:
+                with os.scandir(directorio) as entradas:
+                    nombres = {entrada.name.casefold() for entrada in entradas}
+                listada = True
+                log.debug("Carpeta de destino listada: %s (%d entradas)", directorio, len(nombres))
+            except OSError as e:
+                # Sin listado se vuelve a preguntar al sistema de archivos por cada nombre
+                log.warning(f"Advertencia: no se pudo listar {directorio}, se verifica cada nombre en disco: {e}")
+                nombres, listada = set(), False
+            with self._lock:
+                if not listada:
+                    self._sin_listado.add(clave)
+                self._nombres[clave] = nombres
+        return nombres, listada
+
+    def ruta_libre(self, destino):
+        """
+        Devuelve destino o, si ya está ocupado, la primera alternativa libre
+        (<nombre>_1, <nombre>_2, ...) y la reserva para esta ejecución. El lock
+        solo se toma para reservar el nombre, nunca durante un acceso al disco.
+        """
+        parent, stem, ext = destino.parent, destino.stem, destino.suffix
+        nombres, listada = self._listar(parent)
+        candidato = destino
+        counter = 0
+        while True:
+            # Sin listado de la carpeta se pregunta al disco (fuera del lock)
+            if listada or not candidato.exists():
+                with self._lock:
+                    if candidato.name.casefold() not in nombres:
+                        nombres.add(candidato.name.casefold())
+                        break
+            counter += 1
+            candidato = parent / f"{stem}_{counter}{ext}"
+        if counter:
+            log.warning(f"Destino ocupado → usando nombre alternativo para el archivo nuevo: {candidato.name}")
+        return candidato
@@ -0,0 +1,155 @@
+# modules/logs.py
+import collections
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+
+# Logger raíz del proceso; cada módulo usa un hijo (procesador.main, procesador.copiador, ...)
+LOGGER_RAIZ = "procesador"
+NIVELES = ("DEBUG", "INFO", "WARNING", "ERROR")
+FORMATO_TEXTO = "%(asctime)s %(levelname)-7s %(message)s"
+
+_lock = threading.Lock()
+_listener = None
+_manejador_cola = None
+
+
+class FormatoJson(logging.Formatter):
+    """Un objeto JSON por línea con fecha, nivel, logger, mensaje y los campos de extra=."""
+
+    CAMPOS_ESTANDAR = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+    def format(self, record):
+        datos = {
+            "fecha": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "mensaje": record.getMessage(),
+        }
+        datos.update({clave: valor for clave, valor in vars(record).items() if clave not in self.CAMPOS_ESTANDAR})
+        if record.exc_info:
+            datos["excepcion"] = self.formatException(record.exc_info)
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+class ManejadorEnLotes(logging.Handler):
+    """
+    Acumula los mensajes ya formateados en memoria para que una interfaz los
+    tome de a lotes (por ejemplo con un temporizador) en lugar de repintar por
+    cada línea. Guarda como máximo max_pendientes mensajes: si la interfaz se
+    atrasa se descartan los más viejos, nunca se frena el proceso. Cada mensaje
+    conserva record.created para que la interfaz lo ordene junto con los suyos.
+    """
+
+    def __init__(self, nivel=logging.NOTSET, max_pendientes=10000):
+        super().__init__(nivel)
+        self.pendientes = collections.deque(maxlen=max_pendientes)
+        self.setFormatter(logging.Formatter("%(message)s"))
+
+    def emit(self, record):
+        try:
+            self.pendientes.append((record.created, record.levelno, self.format(record)))
+        except Exception:
+            self.handleError(record)
+
+    def vaciar(self):
+        """Devuelve y quita los mensajes pendientes como lista de (creado, nivel, texto)."""
+        lote = []
+        while True:
+            try:
+                lote.append(self.pendientes.popleft())
+            except IndexError:
+                return lote
+
+
+class _ManejadorCola(logging.handlers.QueueHandler):
+    """
+    QueueHandler que solo encola desde el proceso que configuró el logging. Los
+    procesos de extracción heredan el handler al hacer fork pero nadie lee su
+    copia de la cola: ahí los mensajes van directo a stderr.
+    """
+
+    def __init__(self, cola):
+        super().__init__(cola)
+        self.pid = os.getpid()
+        self._respaldo = logging.StreamHandler(sys.stderr)
+        self._respaldo.setFormatter(logging.Formatter(FORMATO_TEXTO))
+
+    def emit(self, record):
+        if os.getpid() != self.pid:
+            self._respaldo.handle(record)
+            return
+        super().emit(record)
+
+
+def get_logger(nombre):
+    """Logger hijo del logger del proceso (procesador.<nombre>)."""
+    return logging.getLogger(f"{LOGGER_RAIZ}.{nombre}")
+
+
+def configurar_logging(config=None, manejadores_extra=(), consola=None):
+    """
+    Configura el logging del proceso: el código solo encola cada registro
+    (QueueHandler) y un hilo aparte (QueueListener) lo formatea y lo escribe en
+    la consola (stdout, o el flujo indicado en consola), en log_file si está
+    configurado (texto o JSON por línea según log_format) y en los manejadores
+    extra (p. ej. el de la interfaz).
+    log_level define el detalle: DEBUG incluye las líneas por página.
+    Reconfigurar detiene el listener anterior.
+    """
+    global _listener, _manejador_cola
+    config = config or {}
+    nivel = str(config.get("log_level", "INFO")).upper()
+    if nivel not in NIVELES:
+        nivel = "INFO"
+
+    manejadores = []
+    manejador_consola = logging.StreamHandler(consola or sys.__stdout__ or sys.stderr)
+    manejador_consola.setFormatter(logging.Formatter(FORMATO_TEXTO, "%H:%M:%S"))
+    manejadores.append(manejador_consola)
+
+    if config.get("log_file"):
+        os.makedirs(os.path.dirname(os.path.abspath(config["log_file"])), exist_ok=True)
+        archivo = logging.handlers.RotatingFileHandler(
+            config["log_file"], maxBytes=10 * 1024 * 1024, backupCount=5, encoding="utf-8"
+        )
+        if config.get("log_format", "texto") == "json":
+            archivo.setFormatter(FormatoJson())
+        else:
+            archivo.setFormatter(logging.Formatter(FORMATO_TEXTO))
+        manejadores.append(archivo)
+
+    manejadores.extend(manejadores_extra)
+
+    with _lock:
+        detener_logging()
+        logger = logging.getLogger(LOGGER_RAIZ)
+        logger.setLevel(nivel)
+        logger.propagate = False
+        cola = queue.SimpleQueue()
+        _manejador_cola = _ManejadorCola(cola)
+        logger.addHandler(_manejador_cola)
+        _listener = logging.handlers.QueueListener(cola, *manejadores, respect_handler_level=True)
+        _listener.start()
+    return logger
+
+
+def logging_configurado():
+    return _listener is not None
+
+
+def detener_logging():
+    """Escribe lo que quede en la cola y detiene el listener."""
+    global _listener, _manejador_cola
+    if _listener is not None:
+        _listener.stop()
+        for manejador in _listener.handlers:
+            manejador.flush()
+        _listener = None
+    if _manejador_cola is not None:
+        logging.getLogger(LOGGER_RAIZ).removeHandler(_manejador_cola)
+        _manejador_cola = None
@@ -0,0 +1,168 @@
+# modules/metricas.py
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+
+def percentil(valores, p):
+    """Percentil por rango más cercano sobre una lista ya ordenada."""
+    if not valores:
+        return None
+    # Rango más cercano: el menor valor que deja al menos el p % de la muestra a su izquierda
+    indice = max(0, math.ceil(p / 100 * len(valores)) - 1)
+    return valores[indice]
+
+
+class Metricas:
+    """
+    Métricas de una ejecución del proceso: tiempo acumulado por etapa,
+    contadores (bytes copiados, páginas extraídas, filas insertadas, ...) y
+    duraciones individuales por archivo. Es segura entre hilos; los procesos
+    de extracción no la comparten, por eso sus tiempos se registran en el
+    proceso principal al recibir cada resultado.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self, modo=None):
+        """Descarta lo medido y empieza una ejecución nueva."""
+        with self._lock:
+            self.modo = modo
+            self.inicio = datetime.now()
+            self._inicio_monotonic = time.monotonic()
+            self.etapas = {}
+            self.contadores = {}
+            self.observaciones = {}
+            self._en_curso = {}
+
+    @contextmanager
+    def etapa(self, nombre):
+        """
+        Mide el tiempo de un bloque y lo acumula en la etapa indicada. También
+        sirve como decorador: @metricas.etapa("copia").
+        """
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            segundos = time.perf_counter() - inicio
+            with self._lock:
+                datos = self.etapas.setdefault(nombre, {"segundos": 0.0, "veces": 0})
+                datos["segundos"] += segundos
+                datos["veces"] += 1
+
+    @contextmanager
+    def etapa_concurrente(self, nombre, observacion=None):
+        """
+        Como etapa, para bloques de la misma etapa que corren a la vez (un
+        archivo por tarea en modo asyncio): la etapa acumula el tiempo de reloj
+        con al menos un bloque en curso, no la suma de todos. Con observacion se
+        registra además la duración de cada bloque.
+        """
+        inicio = time.perf_counter()
+        with self._lock:
+            activos, desde = self._en_curso.get(nombre, (0, inicio))
+            self._en_curso[nombre] = (activos + 1, desde)
+        try:
+            yield
+        finally:
+            fin = time.perf_counter()
+            with self._lock:
+                activos, desde = self._en_curso.pop(nombre, (1, inicio))
+                if activos > 1:
+                    self._en_curso[nombre] = (activos - 1, desde)
+                else:
+                    datos = self.etapas.setdefault(nombre, {"segundos": 0.0, "veces": 0})
+                    datos["segundos"] += fin - desde
+                    datos["veces"] += 1
+                if observacion:
+                    self.observaciones.setdefault(observacion, []).append(fin - inicio)
+
+    def sumar(self, contador, cantidad=1):
+        with self._lock:
+            self.contadores[contador] = self.contadores.get(contador, 0) + cantidad
+
+    def observar(self, nombre, segundos):
+        """Registra una duración individual (por ejemplo, la extracción de un PDF)."""
+        with self._lock:
+            self.observaciones.setdefault(nombre, []).append(segundos)
+
+    def resumen(self):
+        with self._lock:
+            observaciones = {}
+            for nombre, valores in self.observaciones.items():
+                ordenados = sorted(valores)
+                observaciones[nombre] = {
+                    "cantidad": len(ordenados),
+                    "segundos_total": sum(ordenados),
+                    "p50": percentil(ordenados, 50),
+                    "p95": percentil(ordenados, 95),
+                    "max": ordenados[-1],
+                }
+            return {
+                "modo": self.modo,
+                "inicio": self.inicio.isoformat(timespec="seconds"),
+                "fin": datetime.now().isoformat(timespec="seconds"),
+                "duracion_segundos": time.monotonic() - self._inicio_monotonic,
+                "etapas": {nombre: dict(datos) for nombre, datos in self.etapas.items()},
+                "contadores": dict(self.contadores),
+                "observaciones": observaciones,
+            }
+
+    def exportar_json(self, directorio):
+        """Guarda el resumen en metricas_<timestamp>.json dentro de directorio. Devuelve la ruta."""
+        os.makedirs(directorio, exist_ok=True)
+        ruta = os.path.join(directorio, f"metricas_{self.inicio.strftime('%Y-%m-%d_%H-%M-%S')}.json")
+        with open(ruta, 'w', encoding='utf-8') as f:
+            json.dump(self.resumen(), f, indent=4, ensure_ascii=False)
+        return ruta
+
+    def exportar_prometheus(self, ruta):
+        """
+        Escribe el resumen en el formato de texto de Prometheus (apto para el
+        textfile collector de node_exporter). El archivo se reemplaza de forma
+        atómica para que el colector nunca lea uno a medio escribir.
+        """
+        datos = self.resumen()
+        lineas = [
+            "# HELP procesador_duracion_segundos Duración de la última ejecución.",
+            "# TYPE procesador_duracion_segundos gauge",
+            f"procesador_duracion_segundos {datos['duracion_segundos']:.6f}",
+            "# HELP procesador_ultima_ejecucion_timestamp_segundos Inicio de la última ejecución (epoch).",
+            "# TYPE procesador_ultima_ejecucion_timestamp_segundos gauge",
+            f"procesador_ultima_ejecucion_timestamp_segundos {self.inicio.timestamp():.0f}",
+            "# HELP procesador_etapa_segundos Tiempo acumulado por etapa en la última ejecución.",
+            "# TYPE procesador_etapa_segundos gauge",
+        ]
+        lineas += [f'procesador_etapa_segundos{{etapa="{nombre}"}} {etapa["segundos"]:.6f}'
+                   for nombre, etapa in sorted(datos["etapas"].items())]
+        for contador, valor in sorted(datos["contadores"].items()):
+            lineas += [
+                f"# TYPE procesador_{contador} gauge",
+                f"procesador_{contador} {valor}",
+            ]
+        for nombre, obs in sorted(datos["observaciones"].items()):
+            lineas += [
+                f"# TYPE procesador_{nombre}_segundos summary",
+                f'procesador_{nombre}_segundos{{quantile="0.5"}} {obs["p50"]:.6f}',
+                f'procesador_{nombre}_segundos{{quantile="0.95"}} {obs["p95"]:.6f}',
+                f"procesador_{nombre}_segundos_sum {obs['segundos_total']:.6f}",
+                f"procesador_{nombre}_segundos_count {obs['cantidad']}",
+            ]
+
+        os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+        temporal = f"{ruta}.tmp"
+        with open(temporal, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lineas) + "\n")
+        os.replace(temporal, ruta)
+        return ruta
+
+
+# Métricas de la ejecución en curso, compartidas por todas las etapas del proceso
+metricas = Metricas()
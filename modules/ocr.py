@@ -0,0 +1,177 @@
+# modules/ocr.py
+import hashlib
+import io
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from modules.logs import get_logger
+
+log = get_logger("ocr")
+
+# Resolución con la que se renderiza una página que no tiene imágenes que Pillow pueda abrir
+RESOLUCION_RENDER = 300
+
+_disponible = None
+_disponible_lock = threading.Lock()
+
+
+def disponible():
+    """
+    Indica si el OCR se puede usar: pytesseract y Pillow instalados y el
+    ejecutable de Tesseract accesible. Se verifica una sola vez por proceso;
+    los módulos se importan recién acá, no al cargar main.
+    """
+    global _disponible
+    with _disponible_lock:
+        if _disponible is None:
+            try:
+                import pytesseract
+                from PIL import Image  # noqa: F401
+
+                version = pytesseract.get_tesseract_version()
+                log.debug("Tesseract %s disponible para OCR", version)
+                _disponible = True
+            except Exception as e:
+                log.info(f"OCR no disponible (se requieren pytesseract, Pillow y Tesseract instalados): {e}")
+                _disponible = False
+        return _disponible
+
+
+def clave_pagina(pdf_path):
+    """
+    Prefijo de las imágenes de un PDF en la caché de páginas: nombre, tamaño y
+    fecha de modificación (las copias conservan la fecha), sin leer el archivo.
+    """
+    st = os.stat(pdf_path)
+    return hashlib.sha1(f"{Path(pdf_path).name}|{st.st_size}|{st.st_mtime_ns}".encode('utf-8')).hexdigest()[:20]
+
+
+def _renderizar_pagina(pdf_path, indice):
+    """
+    Página completa renderizada con pypdfium2 (opcional), en escala de grises.
+    Devuelve None si pypdfium2 no está instalado.
+    """
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        return None
+
+    pdf = pdfium.PdfDocument(str(pdf_path))
+    try:
+        return pdf[indice].render(scale=RESOLUCION_RENDER / 72).to_pil().convert("L")
+    finally:
+        pdf.close()
+
+
+def imagenes_de_pagina(pdf_path, indice, dir_cache=None):
+    """
+    Imágenes de una página escaneada (en escala de grises), tomadas de la caché
+    de páginas o de las imágenes embebidas en la página. Un escáner guarda cada
+    página como una imagen (a veces en franjas), que es lo que lee el OCR.
+    Si alguna imagen no se puede decodificar (CCITT o JBIG2, que Pillow no abre)
+    o la página no tiene imágenes sueltas, se renderiza la página entera con
+    pypdfium2; sin pypdfium2 instalado queda sin imágenes.
+    """
+    from PIL import Image
+
+    prefijo = None
+    if dir_cache:
+        prefijo = Path(dir_cache) / f"{clave_pagina(pdf_path)}_p{indice + 1}"
+        guardadas = sorted(Path(dir_cache).glob(f"{prefijo.name}_*.png"))
+        if guardadas:
+            imagenes = []
+            for ruta in guardadas:
+                os.utime(ruta)  # la limpieza por antigüedad conserva las páginas en uso
+                with Image.open(ruta) as imagen:
+                    imagenes.append(imagen.copy())
+            return imagenes
+
+    import PyPDF2
+
+    imagenes = []
+    completa = True
+    with open(pdf_path, 'rb') as f:
+        pagina = PyPDF2.PdfReader(f).pages[indice]
+        try:
+            for imagen in pagina.images:
+                try:
+                    imagenes.append(Image.open(io.BytesIO(imagen.data)).convert("L"))
+                except Exception:
+                    completa = False
+        except Exception:
+            # PyPDF2 no sabe decodificar el filtro de alguna imagen
+            completa = False
+
+    if not completa or not imagenes:
+        renderizada = _renderizar_pagina(pdf_path, indice)
+        if renderizada is not None:
+            imagenes = [renderizada]
+
+    if prefijo is not None and imagenes:
+        os.makedirs(dir_cache, exist_ok=True)
+        for numero, imagen in enumerate(imagenes, 1):
+            # Se escribe con otro nombre y se renombra: otro proceso nunca lee un PNG a medias
+            tmp_path = f"{prefijo}_{numero}.png.{os.getpid()}.tmp"
+            imagen.save(tmp_path, format="PNG")
+            os.replace(tmp_path, f"{prefijo}_{numero}.png")
+    return imagenes
+
+
+def reconocer_pagina(pdf_path, indice, idioma="spa", dir_cache=None):
+    """
+    OCR de una página (índice desde 0) con Tesseract. Pensada para el pool de
+    procesos de OCR: devuelve (texto, segundos, omitida) para registrar las
+    métricas y el aviso en el proceso principal (los procesos del pool no
+    escriben en el log). omitida indica que no hubo ninguna imagen para leer.
+    """
+    import pytesseract
+
+    inicio = time.perf_counter()
+    imagenes = imagenes_de_pagina(pdf_path, indice, dir_cache)
+    partes = [pytesseract.image_to_string(imagen, lang=idioma) for imagen in imagenes]
+    texto = '\n'.join(parte.strip() for parte in partes if parte.strip())
+    return texto, time.perf_counter() - inicio, not imagenes
+
+
+class PoolOcr:
+    """
+    Pool de procesos dedicado al OCR de las páginas sin capa de texto, con su
+    propio límite de procesos (ocr_workers) para no frenar la extracción del
+    resto de los PDFs. Los procesos se crean con la primera página que lo
+    necesita: una ejecución sin páginas escaneadas no paga nada.
+    """
+
+    def __init__(self, workers=2, idioma="spa", dir_cache=None):
+        self.workers = max(1, int(workers))
+        self.idioma = idioma
+        self.dir_cache = str(dir_cache) if dir_cache else None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def enviar(self, pdf_path, indice):
+        """Envía el OCR de una página al pool. El futuro se resuelve con (texto, segundos, omitida)."""
+        with self._lock:
+            if self._executor is None:
+                log.info(f"Iniciando pool de OCR con {self.workers} procesos (idioma {self.idioma})...")
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor.submit(reconocer_pagina, str(pdf_path), indice, self.idioma, self.dir_cache)
+
+    def cerrar(self, esperar=True):
+        """
+        Cierra el pool. Con esperar se terminan las páginas pendientes (y sus
+        callbacks); si no, se cancelan las que todavía no empezaron.
+        """
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=esperar, cancel_futures=not esperar)
+                self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cerrar()
+
@@ -0,0 +1,122 @@
+# modules/progreso.py
+import threading
+import time
+
+from modules.logs import get_logger
+
+log = get_logger("progreso")
+
+# Cada archivo válido recorre cinco pasos: copia, validación, extracción,
+# escritura en Maestro y movimiento a backup/destino. Los que quedan en el
+# camino (copia fallida, nomenclatura inválida) completan de una vez los pasos
+# que ya no van a recorrer, así el porcentaje siempre puede llegar a 100. Un
+# error de extracción, de escritura del extracto o de movimiento cuenta como
+# paso terminado.
+PASOS_POR_ARCHIVO = 5
+UNIDADES = {
+    "copiado": 1,
+    "error_copia": 5,
+    "validado": 1,
+    "invalido": 4,
+    "extraido": 1,
+    "error_extraccion": 1,
+    "escrito": 1,
+    "error_escritura": 1,
+    "movido": 1,
+    "error_movimiento": 1,
+}
+EVENTOS = ("descubierto", *UNIDADES)
+# Eventos con los que un archivo termina su recorrido
+FINALES = ("error_copia", "invalido", "movido", "error_movimiento")
+
+
+class Progreso:
+    """
+    Publica los eventos de avance del proceso (archivos descubiertos, copiados,
+    validados, extraídos, escritos y movidos) a quien se suscriba, con los
+    nombres de los archivos involucrados cuando se conocen. Los suscriptores se
+    llaman en el hilo que publica: tienen que ser rápidos y seguros entre hilos
+    (por ejemplo, EstimadorProgreso o el diario de la ejecución).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._suscriptores = ()
+
+    def suscribir(self, callback):
+        """callback(evento, cantidad, bytes_, archivos) se llama por cada evento publicado."""
+        with self._lock:
+            self._suscriptores = (*self._suscriptores, callback)
+
+    def desuscribir(self, callback):
+        with self._lock:
+            self._suscriptores = tuple(s for s in self._suscriptores if s is not callback)
+
+    def publicar(self, evento, cantidad=1, bytes_=0, archivos=()):
+        # Sin suscriptores (proceso por consola, benchmark) publicar no cuesta nada
+        for callback in self._suscriptores:
+            try:
+                callback(evento, cantidad, bytes_, archivos)
+            except Exception:
+                log.warning(f"Advertencia: falló un suscriptor de progreso con el evento {evento}", exc_info=True)
+
+
+class EstimadorProgreso:
+    """
+    Suscriptor que acumula los eventos y calcula el avance real: porcentaje
+    sobre los pasos de los archivos descubiertos, archivos terminados por
+    segundo, MB copiados por segundo y tiempo restante estimado con el ritmo
+    observado hasta el momento. Es seguro entre hilos; la interfaz lo consulta
+    con estado() desde un temporizador.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self._inicio = time.monotonic()
+            self.conteos = dict.fromkeys(EVENTOS, 0)
+            self.bytes_descubiertos = 0
+            self.bytes_copiados = 0
+            self.unidades = 0
+
+    def __call__(self, evento, cantidad=1, bytes_=0, archivos=()):
+        with self._lock:
+            self.conteos[evento] = self.conteos.get(evento, 0) + cantidad
+            if evento == "descubierto":
+                self.bytes_descubiertos += bytes_
+            else:
+                self.unidades += UNIDADES.get(evento, 0) * cantidad
+            if evento == "copiado":
+                self.bytes_copiados += bytes_
+
+    def estado(self):
+        """Avance actual como diccionario (porcentaje, archivos, velocidades y ETA en segundos o None)."""
+        with self._lock:
+            transcurrido = max(1e-6, time.monotonic() - self._inicio)
+            total = self.conteos["descubierto"]
+            unidades_totales = total * PASOS_POR_ARCHIVO
+            unidades = min(self.unidades, unidades_totales)
+            terminados = sum(self.conteos[evento] for evento in FINALES)
+            eta = None
+            if 0 < unidades < unidades_totales:
+                eta = transcurrido * (unidades_totales - unidades) / unidades
+            elif unidades_totales and unidades == unidades_totales:
+                eta = 0.0
+            return {
+                "porcentaje": 100.0 * unidades / unidades_totales if unidades_totales else 0.0,
+                "descubiertos": total,
+                "terminados": min(terminados, total),
+                "mb_descubiertos": self.bytes_descubiertos / 1024 / 1024,
+                "transcurrido_segundos": transcurrido,
+                "archivos_por_segundo": terminados / transcurrido,
+                "mb_por_segundo": self.bytes_copiados / 1024 / 1024 / transcurrido,
+                "eta_segundos": eta,
+                "eventos": dict(self.conteos),
+            }
+
+
+# Canal de eventos de la ejecución en curso, compartido por todas las etapas del proceso
+progreso = Progreso()
@@ -0,0 +1,202 @@
+# modules/vigilante.py
+import os
+import threading
+import time
+
+from modules.logs import get_logger
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    # watchdog es opcional: sin él el origen se revisa por sondeo
+    Observer = None
+    FileSystemEventHandler = object
+
+log = get_logger("vigilante")
+
+MODOS = ("auto", "watchdog", "sondeo")
+# Un PDF sin marca de fin se sigue esperando hasta este límite; después se entrega
+# igual y, si está dañado, falla en la extracción como cualquier otro
+ESPERA_MAXIMA_FIN_PDF = 300
+# Tope de la espera entre reintentos de un lote que falló (se duplica en cada fallo desde el intervalo)
+ESPERA_MAXIMA_REINTENTO = 900
+
+
+def es_pdf_completo(ruta):
+    """Busca la marca %%EOF al final del archivo: un PDF a medio escribir normalmente no la tiene."""
+    try:
+        with open(ruta, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - 1024))
+            return b"%%EOF" in f.read()
+    except OSError:
+        return False  # en Windows, bloqueado por quien lo está escribiendo
+
+
+def es_recurso_de_red(ruta):
+    """Rutas UNC (\\\\servidor\\recurso): ahí las notificaciones del sistema de archivos no son confiables."""
+    return str(ruta).startswith(("\\\\", "//"))
+
+
+class _AvisoCambios(FileSystemEventHandler):
+    """Despierta al vigilante ante cualquier cambio de archivos en el origen."""
+
+    def __init__(self, aviso):
+        super().__init__()
+        self.aviso = aviso
+
+    def on_any_event(self, event):
+        if not event.is_directory:
+            self.aviso.set()
+
+
+class VigilanteOrigen:
+    """
+    Detecta PDFs nuevos o modificados en source_dir y los entrega en microlotes.
+
+    Un archivo entra en un lote cuando su tamaño y fecha de modificación no
+    cambiaron durante estable_segundos y termina con la marca de fin de PDF
+    (quien lo deposita terminó de copiarlo).
+    El lote se cierra cuando pasan espera_segundos sin que aparezcan archivos
+    nuevos o al juntar max_lote archivos. Con watchdog los eventos del sistema
+    de archivos adelantan la revisión; en recursos de red o sin watchdog se
+    revisa cada intervalo segundos. Un archivo entregado no se vuelve a entregar
+    mientras no cambie (por ejemplo, uno inválido que queda en el origen hasta
+    que lo renombran), salvo que su lote se devuelva con reintentar().
+    """
+
+    def __init__(self, source_dir, intervalo=30, estable_segundos=5, espera_segundos=2, max_lote=200, modo="auto"):
+        if modo not in MODOS:
+            raise ValueError(f"Modo de vigilancia desconocido: '{modo}' (opciones: {', '.join(MODOS)})")
+        self.source_dir = str(source_dir)
+        self.intervalo = max(0.5, float(intervalo))
+        self.estable_segundos = max(0.0, float(estable_segundos))
+        self.espera_segundos = max(0.0, float(espera_segundos))
+        self.max_lote = max(1, int(max_lote))
+        self.modo = modo
+        self._aviso = threading.Event()
+        self._detenido = threading.Event()
+        self._candidatos = {}   # ruta -> ((tamaño, mtime_ns), visto sin cambios desde)
+        self._entregados = {}   # ruta -> (tamaño, mtime_ns) con que se entregó
+        self._reintentos = {}   # ruta -> (fallos seguidos, no reintentar antes de)
+        self._ultimo_cambio = 0.0
+
+    @classmethod
+    def desde_config(cls, config):
+        return cls(
+            config["source_dir"],
+            intervalo=config.get("watch_interval_seconds", 30),
+            estable_segundos=config.get("watch_stable_seconds", 5),
+            espera_segundos=config.get("watch_debounce_seconds", 2),
+            max_lote=config.get("watch_batch_size", 200),
+            modo=config.get("watch_mode", "auto"),
+        )
+
+    def usa_watchdog(self):
+        if self.modo == "sondeo":
+            return False
+        if Observer is None:
+            if self.modo == "watchdog":
+                log.warning("Advertencia: watchdog no está instalado, se revisa el origen por sondeo.")
+            return False
+        return self.modo == "watchdog" or not es_recurso_de_red(self.source_dir)
+
+    def detener(self):
+        """Termina la vigilancia; el lote en curso, si lo hay, se completa igual."""
+        self._detenido.set()
+        self._aviso.set()
+
+    def reintentar(self, lote, ahora=None):
+        """
+        Devuelve un lote cuyo proceso falló (por ejemplo, sin conexión con sql01):
+        los archivos que sigan en el origen se vuelven a entregar sin esperar a
+        que cambien, pero no antes de una espera que arranca en el intervalo y se
+        duplica con cada fallo seguido del mismo archivo, hasta
+        ESPERA_MAXIMA_REINTENTO.
+        """
+        ahora = time.monotonic() if ahora is None else ahora
+        espera_lote = 0.0
+        fallos_lote = 0
+        for ruta in lote:
+            self._entregados.pop(ruta, None)
+            fallos = self._reintentos.get(ruta, (0, 0.0))[0] + 1
+            espera = min(self.intervalo * 2 ** (fallos - 1), ESPERA_MAXIMA_REINTENTO)
+            self._reintentos[ruta] = (fallos, ahora + espera)
+            espera_lote = max(espera_lote, espera)
+            fallos_lote = max(fallos_lote, fallos)
+        log.warning("Microlote de %d PDFs devuelto tras un error (fallo %d seguido): se reintenta en %.0f s.",
+                    len(lote), fallos_lote, espera_lote)
+
+    def escanear(self):
+        """Estado de los PDFs del origen como {ruta: (tamaño, mtime_ns)}."""
+        estado = {}
+        for directorio, _, archivos in os.walk(self.source_dir):
+            for nombre in archivos:
+                if nombre.lower().endswith('.pdf'):
+                    ruta = os.path.join(directorio, nombre)
+                    try:
+                        st = os.stat(ruta)
+                    except OSError:
+                        continue  # borrado entre el listado y el stat
+                    estado[ruta] = (st.st_size, st.st_mtime_ns)
+        return estado
+
+    def revisar(self, ahora=None):
+        """Actualiza los candidatos con un escaneo del origen. Devuelve las rutas ya estables."""
+        ahora = time.monotonic() if ahora is None else ahora
+        actual = self.escanear()
+        # Lo que ya no está en el origen (procesado o borrado) se olvida
+        self._entregados = {ruta: datos for ruta, datos in self._entregados.items() if ruta in actual}
+        self._candidatos = {ruta: candidato for ruta, candidato in self._candidatos.items() if ruta in actual}
+        self._reintentos = {ruta: reintento for ruta, reintento in self._reintentos.items() if ruta in actual}
+        for ruta, datos in actual.items():
+            if self._entregados.get(ruta) == datos:
+                continue
+            reintento = self._reintentos.get(ruta)
+            if reintento is not None and ahora < reintento[1]:
+                continue
+            candidato = self._candidatos.get(ruta)
+            if candidato is None or candidato[0] != datos:
+                self._candidatos[ruta] = (datos, ahora)
+                self._ultimo_cambio = ahora
+        return sorted(
+            ruta for ruta, (_, desde) in self._candidatos.items()
+            if ahora - desde >= self.estable_segundos
+            and (ahora - desde >= ESPERA_MAXIMA_FIN_PDF or es_pdf_completo(ruta))
+        )
+
+    def lotes(self):
+        """Genera listas de rutas de origen estables, de a lo sumo max_lote, hasta que se llame a detener()."""
+        observador = None
+        if self.usa_watchdog() and os.path.isdir(self.source_dir):
+            observador = Observer()
+            observador.schedule(_AvisoCambios(self._aviso), self.source_dir, recursive=True)
+            observador.start()
+        log.info(f"Vigilando {self.source_dir} ({'watchdog' if observador else f'sondeo cada {self.intervalo:g} s'}, "
+                 f"estables tras {self.estable_segundos:g} s, lotes de hasta {self.max_lote})...")
+        # Mientras haya archivos por estabilizarse se revisa seguido (sin reaccionar a cada evento
+        # de escritura); si no, cada intervalo o ante el primer evento de watchdog
+        paso_corto = min(self.intervalo, max(0.5, min(self.estable_segundos, self.espera_segundos)))
+        try:
+            while not self._detenido.is_set():
+                self._aviso.clear()
+                ahora = time.monotonic()
+                estables = self.revisar(ahora)
+                listo = len(estables) >= self.max_lote or ahora - self._ultimo_cambio >= self.espera_segundos
+                if estables and listo:
+                    lote = estables[:self.max_lote]
+                    for ruta in lote:
+                        self._entregados[ruta] = self._candidatos.pop(ruta)[0]
+                    log.info(f"Microlote listo: {len(lote)} PDFs estables en origen.")
+                    yield lote
+                    continue
+                if self._candidatos:
+                    self._detenido.wait(paso_corto)
+                else:
+                    self._aviso.wait(self.intervalo)
+        finally:
+            if observador is not None:
+                observador.stop()
+                observador.join()
+        log.info("Vigilancia de source_dir finalizada.")
@@ -0,0 +1,80 @@
+# tests/test_backend_db.py
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.backend_db import BackendSqlite  # noqa: E402
+
+PREFIJO = "Reconocimiento optico de caracteres: "
+
+
+class TestActualizarExtractos(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.backend = BackendSqlite(os.path.join(self.tmp.name, "gestion.sqlite3"))
+        self.conn = self.backend.conectar()
+
+    def tearDown(self):
+        self.conn.close()
+        self.tmp.cleanup()
+
+    def _maestro(self, extracto):
+        self.conn.execute(
+            "INSERT INTO Maestro (letra, actuacion, ejercicio, extracto) VALUES ('1', '000001', '2024', ?)",
+            (extracto,)
+        )
+        self.conn.commit()
+
+    def _extracto(self):
+        return self.conn.execute("SELECT extracto FROM Maestro").fetchone()[0]
+
+    def test_prefijo_sin_hash_reemplaza_lo_que_sigue(self):
+        # Fila escrita antes de que existiera WilsonOcrHash: no se acumula el texto viejo
+        self._maestro("Nota manual. " + PREFIJO + "texto viejo")
+        self.backend.actualizar_extractos(self.conn, [("1", "000001", "2024", "texto nuevo")])
+        self.assertEqual(self._extracto(), "Nota manual. " + PREFIJO + "texto nuevo")
+        hash_guardado = self.conn.execute("SELECT hash FROM WilsonOcrHash").fetchone()[0]
+        self.assertEqual(hash_guardado, BackendSqlite.hash_texto("texto nuevo"))
+
+    def test_sin_prefijo_reemplaza_el_extracto(self):
+        self._maestro("otro extracto")
+        self.backend.actualizar_extractos(self.conn, [("1", "000001", "2024", "texto")])
+        self.assertEqual(self._extracto(), PREFIJO + "texto")
+
+    def test_mismo_hash_no_reescribe(self):
+        self._maestro(PREFIJO)
+        self.backend.actualizar_extractos(self.conn, [("1", "000001", "2024", "texto")])
+        self.conn.execute("UPDATE Maestro SET extracto = 'editado a mano'")
+        self.conn.commit()
+        self.assertEqual(self.backend.actualizar_extractos(self.conn, [("1", "000001", "2024", "texto")]), 0)
+        self.assertEqual(self._extracto(), "editado a mano")
+
+    def test_extracto_largo_se_recorta_al_largo_de_la_columna(self):
+        # La réplica no tiene límite: se simula una columna de 60 caracteres
+        self.backend._largo_extracto = 60
+        self._maestro(PREFIJO)
+        self.conn.execute(
+            "INSERT INTO Maestro (letra, actuacion, ejercicio, extracto) VALUES ('1', '000002', '2024', ?)",
+            (PREFIJO,)
+        )
+        self.conn.commit()
+        actualizados = self.backend.actualizar_extractos(
+            self.conn, [("1", "000001", "2024", "x" * 500), ("1", "000002", "2024", "corto")]
+        )
+        self.assertEqual(actualizados, 2)
+        filas = dict(self.conn.execute("SELECT actuacion, extracto FROM Maestro"))
+        self.assertEqual(filas["000001"], (PREFIJO + "x" * 500)[:60])
+        self.assertEqual(filas["000002"], PREFIJO + "corto")
+
+    def test_sin_tabla_de_hashes_falla_con_mensaje_claro(self):
+        self.conn.execute("DROP TABLE WilsonOcrHash")
+        self.conn.commit()
+        with self.assertRaisesRegex(RuntimeError, "001_WilsonOcrHash.sql"):
+            self.backend.actualizar_extractos(self.conn, [("1", "000001", "2024", "texto")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+# tests/test_extraccion.py
+import os
+import sys
+import tempfile
+import unittest
+from concurrent.futures import Future, ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+
+def crear_pdf(ruta, textos):
+    """PDF mínimo con una página por texto (texto vacío = página sin capa de texto)."""
+    paginas = len(textos)
+    fuente = 3 + paginas * 2
+    objetos = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{' '.join(f'{3 + i * 2} 0 R' for i in range(paginas))}] /Count {paginas} >>",
+    ]
+    for i, texto in enumerate(textos):
+        objetos.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + i * 2} 0 R "
+                       f"/Resources << /Font << /F1 {fuente} 0 R >> >> >>")
+        contenido = f"BT /F1 12 Tf 72 720 Td ({texto}) Tj ET" if texto else ""
+        objetos.append(f"<< /Length {len(contenido)} >>\nstream\n{contenido}\nendstream")
+    objetos.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    salida = b"%PDF-1.4\n"
+    posiciones = []
+    for numero, objeto in enumerate(objetos, 1):
+        posiciones.append(len(salida))
+        salida += f"{numero} 0 obj\n{objeto}\nendobj\n".encode()
+    xref = len(salida)
+    salida += f"xref\n0 {len(objetos) + 1}\n0000000000 65535 f \n".encode()
+    for posicion in posiciones:
+        salida += f"{posicion:010d} 00000 n \n".encode()
+    salida += f"trailer\n<< /Size {len(objetos) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(ruta, "wb") as f:
+        f.write(salida)
+
+
+class OcrFalso:
+    """Reemplazo de PoolOcr: reconoce cada página al instante y recuerda cuáles se enviaron."""
+
+    def __init__(self):
+        self.enviadas = []
+
+    def enviar(self, pdf_path, indice):
+        self.enviadas.append(indice)
+        futuro = Future()
+        futuro.set_result((f"ocr {indice + 1}", 0.0, False))
+        return futuro
+
+
+class TestExtraccionRepartidaConMaximo(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.pdf = os.path.join(self.tmp.name, "1-000001-2024.pdf")
+        self.executor = ThreadPoolExecutor(max_workers=4)
+
+    def tearDown(self):
+        self.executor.shutdown()
+        self.tmp.cleanup()
+
+    def _extraer(self, max_chars, ocr=None):
+        # Umbral de 2 páginas y 4 procesos: el PDF se reparte en rangos
+        futuro = main.submit_pdf_extraction(self.executor, self.pdf, max_chars, (2, 4), ocr)
+        return futuro.result(timeout=30)
+
+    def test_el_texto_repartido_respeta_el_maximo(self):
+        crear_pdf(self.pdf, [f"pagina {i} " + "x" * 40 for i in range(1, 9)])
+        max_chars = 120
+        texto = self._extraer(max_chars)
+        self.assertLessEqual(len(texto), max_chars)
+        self.assertEqual(texto, main.extract_text_from_pdf(self.pdf, max_chars))
+        self.assertTrue(texto.startswith("pagina 1 "))
+
+    def test_sin_maximo_se_leen_todas_las_paginas(self):
+        crear_pdf(self.pdf, [f"pagina {i}" for i in range(1, 9)])
+        texto = self._extraer(0)
+        self.assertIn("pagina 1", texto)
+        self.assertIn("pagina 8", texto)
+
+    def test_paginas_despues_del_maximo_no_pasan_por_ocr(self):
+        # Páginas pares escaneadas: solo las anteriores al máximo se reconocen
+        crear_pdf(self.pdf, ["" if i % 2 == 0 else f"pagina {i} " + "x" * 40 for i in range(1, 9)])
+        ocr = OcrFalso()
+        texto = self._extraer(60, ocr)
+        self.assertLessEqual(len(texto), 60)
+        self.assertEqual(ocr.enviadas, [1])
+        secuencial = OcrFalso()
+        self.assertEqual(texto, main.extract_text_from_pdf(self.pdf, 60, secuencial))
+        self.assertEqual(secuencial.enviadas, ocr.enviadas)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+# tests/test_limpieza.py
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+
+class TestCleanupOldFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        base = Path(self.tmp.name)
+        self.config = {
+            "temp_dir": str(base / "temp"),
+            "processed_dir": str(base / "procesados"),
+            "backup_dir": str(base / "procesados" / "PDFs_BK"),
+            "cleanup_days": 60,
+            "db_backend": "sqlite",
+            "extraction_cache": False,
+        }
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _antiguo(self, ruta):
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        ruta.touch()
+        hace_un_anio = time.time() - 365 * 86400
+        os.utime(ruta, (hace_un_anio, hace_un_anio))
+        return ruta
+
+    def test_la_replica_sqlite_no_se_borra(self):
+        replica = self._antiguo(Path(main.get_sqlite_path(self.config)))
+        registro = self._antiguo(Path(self.config["processed_dir"]) / "registro_2020-01-01_00-00-00.txt")
+        main.cleanup_old_files(self.config)
+        self.assertTrue(replica.exists())
+        self.assertFalse(registro.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+# tests/test_listado_destinos.py
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.listado_destinos import ListadoDestinos  # noqa: E402
+
+
+class TestRutaLibre(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.carpeta = Path(self.tmp.name) / "2024"
+        self.carpeta.mkdir()
+        (self.carpeta / "1-000001-2024.pdf").touch()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_hilos_concurrentes_reciben_nombres_distintos(self):
+        listado = ListadoDestinos()
+        rutas = []
+        hilos = [threading.Thread(target=lambda: rutas.append(listado.ruta_libre(self.carpeta / "1-000001-2024.pdf")))
+                 for _ in range(16)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        self.assertEqual(len({ruta.name for ruta in rutas}), 16)
+        self.assertNotIn("1-000001-2024.pdf", {ruta.name for ruta in rutas})
+
+    def test_carpeta_nueva_se_crea(self):
+        listado = ListadoDestinos()
+        destino = Path(self.tmp.name) / "2025" / "1-000002-2025.pdf"
+        self.assertEqual(listado.ruta_libre(destino), destino)
+        self.assertTrue(destino.parent.is_dir())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+# tests/test_metricas.py
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.metricas import Metricas, percentil  # noqa: E402
+
+
+class TestPercentil(unittest.TestCase):
+    def test_rango_mas_cercano(self):
+        casos = [
+            (2, 50, 1),
+            (10, 50, 5),
+            (20, 95, 19),
+            (100, 95, 95),
+            (100, 50, 50),
+            (1, 95, 1),
+            (10, 100, 10),
+        ]
+        for n, p, esperado in casos:
+            with self.subTest(n=n, p=p):
+                self.assertEqual(percentil(list(range(1, n + 1)), p), esperado)
+
+    def test_vacio(self):
+        self.assertIsNone(percentil([], 50))
+
+    def test_p0_devuelve_el_minimo(self):
+        self.assertEqual(percentil([3, 7, 9], 0), 3)
+
+
+class TestResumen(unittest.TestCase):
+    def test_observaciones(self):
+        metricas = Metricas()
+        for segundos in (0.4, 0.1, 0.3, 0.2):
+            metricas.observar("extraccion_pdf", segundos)
+        obs = metricas.resumen()["observaciones"]["extraccion_pdf"]
+        self.assertEqual(obs["cantidad"], 4)
+        self.assertEqual(obs["p50"], 0.2)
+        self.assertEqual(obs["p95"], 0.4)
+        self.assertEqual(obs["max"], 0.4)
+
+
+if __name__ == "__main__":
+    unittest.main()
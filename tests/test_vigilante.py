@@ -0,0 +1,53 @@
+# tests/test_vigilante.py
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.vigilante import ESPERA_MAXIMA_REINTENTO, VigilanteOrigen  # noqa: E402
+
+
+class TestReintentos(unittest.TestCase):
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.directorio.name, "1-000001-2024.pdf")
+        with open(self.ruta, 'wb') as f:
+            f.write(b"%PDF-1.4\n%%EOF\n")
+        self.vigilante = VigilanteOrigen(self.directorio.name, intervalo=30, estable_segundos=0, modo="sondeo")
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def entregar(self, ahora):
+        """Simula la entrega de lotes(): el archivo estable pasa a entregado."""
+        estables = self.vigilante.revisar(ahora)
+        for ruta in estables:
+            self.vigilante._entregados[ruta] = self.vigilante._candidatos.pop(ruta)[0]
+        return estables
+
+    def test_espera_exponencial_con_tope(self):
+        ahora = 1000.0
+        self.assertEqual(self.entregar(ahora), [self.ruta])
+        esperas = []
+        for _ in range(8):
+            self.vigilante.reintentar([self.ruta], ahora)
+            desde = ahora
+            # Antes de que venza la espera no se vuelve a entregar, aunque se revise seguido
+            while not self.entregar(ahora):
+                ahora += 1
+            esperas.append(ahora - desde)
+        self.assertEqual(esperas[:5], [30, 60, 120, 240, 480])
+        self.assertEqual(esperas[-1], ESPERA_MAXIMA_REINTENTO)
+
+    def test_archivo_procesado_se_olvida(self):
+        self.entregar(0.0)
+        self.vigilante.reintentar([self.ruta], 0.0)
+        os.remove(self.ruta)
+        self.vigilante.revisar(1.0)
+        self.assertEqual(self.vigilante._reintentos, {})
+
+
+if __name__ == "__main__":
+    unittest.main()